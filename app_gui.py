@@ -1,20 +1,20 @@
+import logging
+
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import PhotoImage
-import cv2
-import numpy as np
 from PIL import Image, ImageTk
-import queue
-import io
-import base64
+
+from recognizers import recognizer_names
+
+logger = logging.getLogger(__name__)
 
 class AppGUI(ctk.CTk):
     def __init__(self, app_logic):
         super().__init__()
         self.app_logic = app_logic
         self.config_manager = app_logic.config_manager
-        self.frame_queue = queue.Queue(maxsize=2)
         self.current_photo = None
+        self.preview_seq = 0
 
         self.title("PalmControl Settings")
         self.geometry("600x700")
@@ -24,6 +24,7 @@ class AppGUI(ctk.CTk):
         self.create_widgets()
         self.load_settings()
         self.update_video_feed()
+        self.update_performance_stats()
 
     def create_widgets(self):
         self.grid_columnconfigure(0, weight=1)
@@ -54,73 +55,36 @@ class AppGUI(ctk.CTk):
         self.tab_view.add("General")
         self.tab_view.add("Advanced")
         self.tab_view.add("Scroll")
+        self.tab_view.add("Performance")
 
         self.create_general_tab(self.tab_view.tab("General"))
         self.create_advanced_tab(self.tab_view.tab("Advanced"))
         self.create_scroll_tab(self.tab_view.tab("Scroll"))
+        self.create_performance_tab(self.tab_view.tab("Performance"))
 
     def update_video_feed(self):
+        # None until the camera thread delivers its first preview frame
+        preview = self.app_logic.preview_buffer
         try:
-            # Process the most recent frame from the queue
-            latest_frame = None
-            while True:
-                try:
-                    latest_frame = self.frame_queue.get_nowait()
-                except queue.Empty:
-                    break
-            
-            if latest_frame is not None:
-                # Validate frame format
-                if not isinstance(latest_frame, np.ndarray) or len(latest_frame.shape) != 3 or latest_frame.shape[2] != 3:
-                    print(f"Warning: Invalid frame format received.")
-                    return
-                
-                if latest_frame.size == 0:
-                    print("Warning: Empty frame received")
-                    return
-                
-                # Ensure correct data type
-                if latest_frame.dtype != np.uint8:
-                    latest_frame = latest_frame.astype(np.uint8)
-                
-                try:
-                    # Convert BGR to RGB
-                    rgb_frame = cv2.cvtColor(latest_frame, cv2.COLOR_BGR2RGB)
-                except cv2.error as e:
-                    print(f"Warning: OpenCV color conversion failed: {e}")
-                    return
-                
-                # Resize frame for display
-                height, width = rgb_frame.shape[:2]
-                max_width, max_height = 560, 300
-                
-                scale = min(max_width / width, max_height / height)
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                
-                try:
-                    resized_frame = cv2.resize(rgb_frame, (new_width, new_height))
-                    pil_image = Image.fromarray(resized_frame)
-                    
-                    # Convert to PhotoImage for Tkinter
-                    img_buffer = io.BytesIO()
-                    pil_image.save(img_buffer, format='PNG')
-                    img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-                    
-                    photo = tk.PhotoImage(data=img_base64)
-                    
-                    self.video_label.config(image=photo, text="")
-                    self.current_photo = photo
-                    
-                except Exception as e:
-                    print(f"Warning: Image processing failed: {e}")
-                    return
-                
+            if self.app_logic.is_camera_view_visible and preview is not None:
+                self.preview_seq = preview.read_into(self.preview_seq, self._paste_preview)
         except Exception as e:
-            print(f"Warning: Error in video feed update: {e}")
+            logger.warning("Error in video feed update: %s", e)
             self.video_label.config(image='', text="Video processing active")
+            self.current_photo = None
         finally:
-            self.after(100, self.update_video_feed)
+            interval = preview.interval if preview is not None else 1.0 / 15
+            self.after(int(interval * 1000), self.update_video_feed)
+
+    def _paste_preview(self, rgb_frame):
+        """Copy the preview buffer into a persistent PhotoImage (recreated only when the size changes)."""
+        height, width = rgb_frame.shape[:2]
+        image = Image.frombuffer("RGB", (width, height), rgb_frame, "raw", "RGB", 0, 1)
+        if self.current_photo is None or (self.current_photo.width(), self.current_photo.height()) != (width, height):
+            self.current_photo = ImageTk.PhotoImage(image)
+            self.video_label.config(image=self.current_photo, text="")
+        else:
+            self.current_photo.paste(image)
 
     def toggle_video_visibility(self, show):
         if show:
@@ -156,7 +120,7 @@ class AppGUI(ctk.CTk):
 
         # Recognizer Model Selection
         ctk.CTkLabel(tab, text="Recognizer Model:").grid(row=0, column=0, padx=20, pady=15, sticky="w")
-        self.recognizer_menu = ctk.CTkOptionMenu(tab, values=["mediapipe", "gpu"], command=self.on_recognizer_change)
+        self.recognizer_menu = ctk.CTkOptionMenu(tab, values=list(recognizer_names()), command=self.on_recognizer_change)
         self.recognizer_menu.grid(row=0, column=1, padx=20, pady=15, sticky="ew")
 
         # Camera Selection
@@ -204,6 +168,17 @@ class AppGUI(ctk.CTk):
         self.stability_label = ctk.CTkLabel(stability_frame, text="0.02")
         self.stability_label.grid(row=0, column=2, padx=10)
 
+        # Smoothing Filter
+        ctk.CTkLabel(tab, text="Smoothing Filter:").grid(row=6, column=0, padx=20, pady=15, sticky="w")
+        self.smoothing_filter_menu = ctk.CTkOptionMenu(tab, values=["weighted_average", "one_euro", "kalman"],
+                                                       command=self.on_smoothing_filter_change)
+        self.smoothing_filter_menu.grid(row=6, column=1, padx=20, pady=15, sticky="ew")
+
+        # ROI Tracking
+        self.roi_tracking_switch = ctk.CTkSwitch(tab, text="Track hand region (faster on high-resolution cameras)",
+                                                 command=self.on_roi_tracking_toggle)
+        self.roi_tracking_switch.grid(row=7, column=0, columnspan=2, padx=20, pady=15, sticky="w")
+
     def create_scroll_tab(self, tab):
         tab.grid_columnconfigure(1, weight=1)
 
@@ -249,6 +224,61 @@ class AppGUI(ctk.CTk):
                                  font=ctk.CTkFont(size=12), text_color="gray60", justify="left", wraplength=500)
         info_label.grid(row=4, column=0, columnspan=2, padx=20, pady=20, sticky="ew")
 
+    def create_performance_tab(self, tab):
+        tab.grid_columnconfigure(0, weight=1)
+
+        self.fps_stats_label = ctk.CTkLabel(tab, text="Processed FPS: -", anchor="w")
+        self.fps_stats_label.grid(row=0, column=0, padx=20, pady=(15, 5), sticky="ew")
+
+        self.capture_mode_label = ctk.CTkLabel(tab, text="Camera mode: -", anchor="w")
+        self.capture_mode_label.grid(row=1, column=0, padx=20, pady=5, sticky="ew")
+
+        self.input_stats_label = ctk.CTkLabel(tab, text="Input events: -", anchor="w")
+        self.input_stats_label.grid(row=2, column=0, padx=20, pady=5, sticky="ew")
+
+        # 各阶段延迟（从摄像头采集到鼠标移动）
+        self.latency_stats_label = ctk.CTkLabel(tab, text="No samples yet.", anchor="w", justify="left",
+                                                font=ctk.CTkFont(family="Courier", size=12))
+        self.latency_stats_label.grid(row=3, column=0, padx=20, pady=(5, 15), sticky="ew")
+
+    def update_performance_stats(self):
+        try:
+            # 仅在窗口可见且性能页处于激活状态时刷新，避免无谓开销
+            if self.winfo_viewable() and self.tab_view.get() == "Performance":
+                stats = self.app_logic.get_performance_stats()
+                recognizer_stats = stats.get("recognizer") or {}
+                capture_stats = stats.get("capture") or {}
+                governor_stats = recognizer_stats.get("governor")
+                governor_text = f" ({governor_stats['state']})" if governor_stats else ""
+                tracking_stats = recognizer_stats.get("tracking")
+                detector_text = f"    Detector: {tracking_stats['detector_calls_per_s']:.1f}/s" if tracking_stats else ""
+                if "tracking" in recognizer_stats and not tracking_stats:
+                    detector_text = "    Detector: n/a"  # MediaPipe without ROI tracking
+                self.fps_stats_label.configure(
+                    text=f"Processed FPS: {recognizer_stats.get('processed_fps', 0.0):.1f}{governor_text}    "
+                         f"Captured: {capture_stats.get('frames_captured', 0)}    "
+                         f"Dropped: {capture_stats.get('frames_dropped', 0)}{detector_text}")
+                mode = capture_stats.get("mode")
+                health = capture_stats.get("health") or {}
+                if mode:
+                    health_text = f"    Camera {health['state']}" if health.get("state", "ok") != "ok" else ""
+                    if health.get("reconnects"):
+                        health_text += f"    Reconnects: {health['reconnects']}"
+                    self.capture_mode_label.configure(
+                        text=f"Camera mode: {mode['width']}x{mode['height']} @ {mode['fps']:.0f} fps "
+                             f"({mode['fourcc'] or 'default format'}){health_text}")
+                input_stats = stats.get("input")
+                if input_stats:
+                    self.input_stats_label.configure(
+                        text=f"Input events: {input_stats['dispatched']} dispatched    "
+                             f"{input_stats['coalesced_moves']} moves coalesced    "
+                             f"{input_stats['dropped']} dropped")
+                self.latency_stats_label.configure(text=self.app_logic.latency_tracker.format_stats())
+        except Exception as e:
+            logger.warning("Error updating performance stats: %s", e)
+        finally:
+            self.after(1000, self.update_performance_stats)
+
     def load_settings(self):
         self.autostart_switch.select() if self.config_manager.get("autostart") else self.autostart_switch.deselect()
         self.silent_start_switch.select() if self.config_manager.get("start_silently") else self.silent_start_switch.deselect()
@@ -258,6 +288,8 @@ class AppGUI(ctk.CTk):
         self.sensitivity_label.configure(text=f"{sensitivity:.1f}")
 
         self.recognizer_menu.set(self.config_manager.get("recognizer"))
+        self.smoothing_filter_menu.set(self.config_manager.get("smoothing_filter"))
+        self.roi_tracking_switch.select() if self.config_manager.get("roi_tracking") else self.roi_tracking_switch.deselect()
         self.camera_menu.set(str(self.config_manager.get("camera_id")))
         
         # 加载平滑设置
@@ -315,62 +347,57 @@ class AppGUI(ctk.CTk):
     def on_silent_start_toggle(self):
         self.config_manager.set("start_silently", self.silent_start_switch.get() == 1)
 
+    # 以下设置只写入配置；各组件订阅配置变化并在自己的线程中应用
     def on_sensitivity_change(self, value):
         sensitivity = round(float(value), 1)
         self.sensitivity_label.configure(text=f"{sensitivity:.1f}")
-        self.app_logic.set_sensitivity(sensitivity)
+        self.config_manager.set("sensitivity", sensitivity)
 
     def on_recognizer_change(self, choice):
-        self.app_logic.set_recognizer(choice)
+        self.config_manager.set("recognizer", choice)
 
     def on_camera_change(self, choice):
-        self.app_logic.set_camera(int(choice))
+        self.config_manager.set("camera_id", int(choice))
+
+    def on_roi_tracking_toggle(self):
+        self.config_manager.set("roi_tracking", self.roi_tracking_switch.get() == 1)
+
+    def on_smoothing_filter_change(self, choice):
+        self.config_manager.set("smoothing_filter", choice)
 
     def on_smoothing_change(self, value):
         # 将0-100的值转换为0.1-1.0
         smoothing = 0.1 + (float(value) / 100) * 0.9
         self.smoothing_label.configure(text=f"{smoothing:.2f}")
         self.config_manager.set("smoothing_factor", smoothing)
-        if self.app_logic.input_controller:
-            self.app_logic.input_controller.set_smoothing_factor(smoothing)
 
     def on_fps_change(self, value):
         fps = int(float(value))
         self.fps_label.configure(text=str(fps))
         self.config_manager.set("max_fps", fps)
-        if self.app_logic.input_controller:
-            self.app_logic.input_controller.set_max_fps(fps)
 
     def on_hold_change(self, value):
         # 将50-300的值转换为0.5-3.0秒
         hold_threshold = 0.5 + (float(value) - 50) / 250 * 2.5
         self.hold_label.configure(text=f"{hold_threshold:.1f}")
         self.config_manager.set("hold_threshold", hold_threshold)
-        if self.app_logic.recognizer and hasattr(self.app_logic.recognizer, 'set_hold_threshold'):
-            self.app_logic.recognizer.set_hold_threshold(hold_threshold)
 
     def on_stability_change(self, value):
         # 将10-50的值转换为0.01-0.05
         stability_zone = 0.01 + (float(value) - 10) / 40 * 0.04
         self.stability_label.configure(text=f"{stability_zone:.3f}")
         self.config_manager.set("click_stability_zone", stability_zone)
-        if self.app_logic.input_controller:
-            self.app_logic.input_controller.set_click_stability_zone(stability_zone)
 
     def on_quick_scroll_toggle(self):
         """快速滚动开关回调"""
         is_enabled = self.quick_scroll_switch.get() == 1
         self.config_manager.set("quick_scroll_enabled", is_enabled)
-        if self.app_logic.input_controller:
-            self.app_logic.input_controller.update_quick_scroll_settings(enabled=is_enabled)
 
     def on_scroll_amount_change(self, value):
         """滚动量滑块回调"""
         scroll_amount = int(float(value))
         self.scroll_amount_label.configure(text=str(scroll_amount))
         self.config_manager.set("quick_scroll_amount", scroll_amount)
-        if self.app_logic.input_controller:
-            self.app_logic.input_controller.update_quick_scroll_settings(scroll_amount=scroll_amount)
 
     def on_up_sensitivity_change(self, value):
         """上挥灵敏度滑块回调"""
@@ -378,8 +405,6 @@ class AppGUI(ctk.CTk):
         sensitivity = 0.5 + (float(value) - 50) / 250 * 2.5
         self.up_sensitivity_label.configure(text=f"{sensitivity:.1f}")
         self.config_manager.set("quick_scroll_up_sensitivity", sensitivity)
-        if self.app_logic.input_controller:
-            self.app_logic.input_controller.update_quick_scroll_settings(up_sensitivity=sensitivity)
 
     def on_down_sensitivity_change(self, value):
         """下挥灵敏度滑块回调"""
@@ -387,5 +412,3 @@ class AppGUI(ctk.CTk):
         sensitivity = 0.5 + (float(value) - 50) / 250 * 2.5
         self.down_sensitivity_label.configure(text=f"{sensitivity:.1f}")
         self.config_manager.set("quick_scroll_down_sensitivity", sensitivity)
-        if self.app_logic.input_controller:
-            self.app_logic.input_controller.update_quick_scroll_settings(down_sensitivity=sensitivity)
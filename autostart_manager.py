@@ -1,6 +1,9 @@
+import logging
 import sys
 import os
 
+logger = logging.getLogger(__name__)
+
 class AutostartManager:
     def __init__(self):
         self.platform = sys.platform
@@ -54,7 +57,7 @@ class AutostartManager:
             winreg.SetValueEx(key, self.app_name, 0, winreg.REG_SZ, bat_path)
             winreg.CloseKey(key)
         except Exception as e:
-            print(f"Error enabling autostart: {e}")
+            logger.error("Error enabling autostart: %s", e)
 
     def _disable_windows(self):
         import winreg
@@ -69,7 +72,7 @@ class AutostartManager:
         except FileNotFoundError:
             pass # Key or value doesn't exist, ignore
         except Exception as e:
-            print(f"Error disabling autostart: {e}")
+            logger.error("Error disabling autostart: %s", e)
 
     # --- macOS Specific ---
     def _get_plist_path(self):
@@ -102,7 +105,7 @@ class AutostartManager:
             with open(plist_path, "w") as f:
                 f.write(plist_content)
         except Exception as e:
-            print(f"Error enabling autostart: {e}")
+            logger.error("Error enabling autostart: %s", e)
 
     def _disable_macos(self):
         plist_path = self._get_plist_path()
@@ -110,7 +113,7 @@ class AutostartManager:
             if os.path.exists(plist_path):
                 os.remove(plist_path)
         except Exception as e:
-            print(f"Error disabling autostart: {e}")
+            logger.error("Error disabling autostart: %s", e)
 
     # --- Linux Specific ---
     def _get_desktop_file_path(self):
@@ -138,7 +141,7 @@ Comment=Start {self.app_name}
             with open(desktop_file_path, "w") as f:
                 f.write(desktop_content)
         except Exception as e:
-            print(f"Error enabling autostart: {e}")
+            logger.error("Error enabling autostart: %s", e)
 
     def _disable_linux(self):
         desktop_file_path = self._get_desktop_file_path()
@@ -146,7 +149,7 @@ Comment=Start {self.app_name}
             if os.path.exists(desktop_file_path):
                 os.remove(desktop_file_path)
         except Exception as e:
-            print(f"Error disabling autostart: {e}")
+            logger.error("Error disabling autostart: %s", e)
 
     # --- Windows Specific --- (using pywin32)
     def _is_enabled_windows(self):
@@ -170,7 +173,7 @@ Comment=Start {self.app_name}
             winreg.SetValueEx(key, self.app_name, 0, winreg.REG_SZ, bat_path)
             winreg.CloseKey(key)
         except Exception as e:
-            print(f"Error enabling autostart: {e}")
+            logger.error("Error enabling autostart: %s", e)
 
     def _disable_windows(self):
         import winreg
@@ -185,7 +188,7 @@ Comment=Start {self.app_name}
         except FileNotFoundError:
             pass # Key or value doesn't exist
         except Exception as e:
-            print(f"Error disabling autostart: {e}")
+            logger.error("Error disabling autostart: %s", e)
 
     # --- macOS Specific --- (using launchd)
     def _get_plist_path(self):
@@ -0,0 +1,409 @@
+"""
+Headless benchmark for the recognition and input pipeline.
+
+Feeds a recorded video file (or a directory of frames) through a recognizer and an
+InputController whose OS backend records calls instead of executing them, then
+reports throughput, per-stage latency and the emitted input events. Needs neither
+a webcam nor a display, and runs on a virtual clock driven by the frame
+timestamps, so gesture output is deterministic for a given recording.
+
+Landmark recordings (see landmark_recording.py, `python main.py --record-landmarks DIR`)
+are replayed straight into the gesture logic, skipping inference entirely.
+
+Usage:
+    python benchmark.py path/to/video.mp4
+    python benchmark.py path/to/frames/ --fps 30 --events events.jsonl
+    python benchmark.py path/to/video.mp4 --json
+    python benchmark.py path/to/landmark_recording/ --speed 0
+    python benchmark.py path/to/landmark_recording/ --compare-filters
+    python benchmark.py path/to/landmark_recording/ --gesture-engine
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from gesture_engine import CURSOR_HANDS, HAND_ROLES, GestureEngine
+from input_controller import InputController
+from landmark_recording import LandmarkRecording, replay
+from latency_tracker import LatencyTracker
+from logging_setup import LOG_LEVELS, setup_logging, shutdown_logging
+import recognizers
+from recognizers.base import LandmarkRecognizer, RecognitionResult
+from recognizers.hand_landmarks import INDEX_FINGER_TIP
+from smoothing_filters import FILTERS, create_filter, measure_filter
+
+logger = logging.getLogger(__name__)
+
+FRAME_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class VirtualClock:
+    """Replacement for time.time() that only advances when told to."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingInputBackend:
+    """Stands in for pyautogui: records every mouse call instead of touching the OS."""
+
+    def __init__(self, screen_size=(1920, 1080), clock=None):
+        self.screen_size = screen_size
+        self.clock = clock
+        self.events = []
+
+    def _record(self, action, **fields):
+        event = {"time": self.clock() if self.clock else time.time(), "action": action}
+        event.update(fields)
+        self.events.append(event)
+
+    def size(self):
+        return self.screen_size
+
+    def moveTo(self, x, y):
+        self._record("move", x=x, y=y)
+
+    def click(self, button='left'):
+        self._record("click", button=button)
+
+    def mouseDown(self, button='left'):
+        self._record("mouse_down", button=button)
+
+    def mouseUp(self, button='left'):
+        self._record("mouse_up", button=button)
+
+    def scroll(self, clicks):
+        self._record("scroll", clicks=clicks)
+
+
+class LandmarkReplayRecognizer(LandmarkRecognizer):
+    """Gesture handling only: hands come from a landmark recording, not from a camera."""
+
+    def process_frame(self, frame, capture_time=None):
+        return RecognitionResult(frame)
+
+
+def iter_frames(source, fps=None):
+    """
+    Yield (timestamp, frame) pairs from a video file or a directory of images.
+
+    Timestamps are derived from the frame index and the frame rate (the video's own
+    rate, `fps`, or 30), so replays do not depend on decode speed.
+    """
+    if os.path.isdir(source):
+        fps = fps or 30.0
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith(FRAME_EXTENSIONS))
+        for index, name in enumerate(names):
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is None:
+                logger.warning("Could not read frame %s. Skipping.", name)
+                continue
+            yield index / fps, frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video source: {source}")
+    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index / fps, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def create_recognizer(name, input_controller, latency_tracker, clock, device="cpu", max_num_hands=1):
+    recognizer_class = recognizers.get_recognizer_class(name)
+    options = {"device": device} if recognizer_class.supports_devices else {}
+    recognizer = recognizer_class.from_config(input_controller, latency_tracker=latency_tracker, clock=clock,
+                                              max_num_hands=max_num_hands, **options)
+    _disable_governor(recognizer)
+    return recognizer
+
+
+def _disable_governor(recognizer):
+    """
+    Process frames at a fixed rate: the adaptive governor backs off by inference cost
+    measured in wall-clock time, so on the virtual clock the frames it skips (and the
+    gestures that result) would depend on how fast the host is.
+    """
+    governor = getattr(recognizer, "governor", None)
+    if governor is not None:
+        governor.configure(enabled=False)
+
+
+def run_benchmark(source, recognizer_name="mediapipe", fps=None, max_frames=None,
+                  screen_size=(1920, 1080), device="cpu", max_num_hands=1, hand_roles=None,
+                  temporal_tracking=True, roi_tracking=False):
+    """
+    Run a recording through the pipeline and return a report dict with throughput,
+    latency statistics, event counts, detector usage and the full event stream.
+
+    Args:
+        hand_roles (tuple): (hand_roles, cursor_hand) settings, or None for the defaults.
+        temporal_tracking (bool): Track hands between frames instead of detecting on every frame.
+        roi_tracking (bool): Run inference on a crop around the hands (backends that support it;
+            MediaPipe needs it for temporal tracking and detector statistics).
+    """
+    clock = VirtualClock()
+    # Keep every sample of an offline run instead of a rolling window
+    latency_tracker = LatencyTracker(window=1_000_000)
+    backend = RecordingInputBackend(screen_size, clock=clock)
+    input_controller = InputController(latency_tracker=latency_tracker, backend=backend, clock=clock)
+    recognizer = create_recognizer(recognizer_name, input_controller, latency_tracker, clock, device,
+                                   max_num_hands)
+    if hand_roles:
+        recognizer.gesture_engine.hand_roles, recognizer.gesture_engine.cursor_hand = hand_roles
+    if roi_tracking and recognizer.supports_roi_tracking:
+        recognizer.set_roi_tracking(True)
+    if not temporal_tracking and hasattr(recognizer, "set_temporal_tracking"):
+        recognizer.set_temporal_tracking(False)
+
+    frames = 0
+    processing_time = 0.0
+    tracking_stats = None
+    started = time.perf_counter()
+    frame_source = iter_frames(source, fps)
+    try:
+        while max_frames is None or frames < max_frames:
+            decode_start = time.perf_counter()
+            try:
+                timestamp, frame = next(frame_source)
+            except StopIteration:
+                break
+            capture_time = time.perf_counter()
+            latency_tracker.record("decode", capture_time - decode_start)
+
+            clock.now = timestamp
+            recognizer.process_frame(frame, capture_time=capture_time)
+            processing_time += time.perf_counter() - capture_time
+            frames += 1
+        tracking_stats = recognizer.get_performance_stats().get("tracking")
+    finally:
+        frame_source.close()
+        recognizer.close()
+    wall_time = time.perf_counter() - started
+
+    return {
+        "source": source,
+        "recognizer": recognizer_name,
+        "frames": frames,
+        "wall_time_s": wall_time,
+        "overall_fps": frames / wall_time if wall_time > 0 else 0.0,
+        "processing_fps": frames / processing_time if processing_time > 0 else 0.0,
+        "latency": latency_tracker.get_stats(),
+        "tracking": tracking_stats,
+        "event_counts": dict(Counter(event["action"] for event in backend.events)),
+        "events": backend.events
+    }
+
+
+def run_landmark_replay(path, speed=0.0, screen_size=(1920, 1080), hand_roles=None):
+    """
+    Replay a landmark recording through the gesture logic and a recording input backend.
+
+    Args:
+        speed (float): 1.0 for real time, 0 to replay as fast as possible.
+        hand_roles (tuple): (hand_roles, cursor_hand) settings, or None for the defaults.
+    """
+    recording = LandmarkRecording(path)
+    clock = VirtualClock()
+    latency_tracker = LatencyTracker(window=1_000_000)
+    backend = RecordingInputBackend(screen_size, clock=clock)
+    input_controller = InputController(latency_tracker=latency_tracker, backend=backend, clock=clock)
+    recognizer = LandmarkReplayRecognizer(input_controller, latency_tracker=latency_tracker, clock=clock,
+                                          max_num_hands=recording.meta.get("max_hands", 1))
+    _disable_governor(recognizer)
+    if hand_roles:
+        recognizer.gesture_engine.hand_roles, recognizer.gesture_engine.cursor_hand = hand_roles
+
+    started = time.perf_counter()
+    try:
+        frames = replay(recording, recognizer, clock=clock, speed=speed)
+    finally:
+        recognizer.close()
+    wall_time = time.perf_counter() - started
+
+    return {
+        "source": path,
+        "recognizer": "landmark replay",
+        "frames": frames,
+        "wall_time_s": wall_time,
+        "overall_fps": frames / wall_time if wall_time > 0 else 0.0,
+        "processing_fps": frames / wall_time if wall_time > 0 else 0.0,
+        "latency": latency_tracker.get_stats(),
+        "event_counts": dict(Counter(event["action"] for event in backend.events)),
+        "events": backend.events
+    }
+
+
+def run_gesture_engine(path, hand_roles=None):
+    """
+    Throughput of the GestureEngine alone on a landmark recording: no input controller,
+    smoothing or dispatch, and the recording is loaded before timing starts.
+    """
+    recording = LandmarkRecording(path, mmap=False)
+    frames = list(recording)
+    engine = GestureEngine(max_hands=recording.meta.get("max_hands", 1))
+    if hand_roles:
+        engine.hand_roles, engine.cursor_hand = hand_roles
+    events = []
+    started = time.perf_counter()
+    for timestamp, hands in frames:
+        events.extend(engine.process(timestamp, hands))
+    wall_time = time.perf_counter() - started
+
+    event_dicts = []
+    for event in events:
+        fields = {"time": event.timestamp, "action": event.type, "x": event.x, "y": event.y,
+                  "button": event.button, "direction": event.direction, "hand": event.hand}
+        event_dicts.append({key: value for key, value in fields.items() if value is not None})
+    return {
+        "source": path,
+        "recognizer": "gesture engine",
+        "frames": len(frames),
+        "wall_time_s": wall_time,
+        "overall_fps": len(frames) / wall_time if wall_time > 0 else 0.0,
+        "processing_fps": len(frames) / wall_time if wall_time > 0 else 0.0,
+        "latency": {},
+        "event_counts": dict(Counter(event.type for event in events)),
+        "events": event_dicts
+    }
+
+
+def compare_filters(path, smoothing_factor=0.3, screen_size=(1920, 1080)):
+    """
+    Measure the lag and jitter of every smoothing filter on the cursor trace of a
+    landmark recording (index finger tip of the first hand, mapped to screen pixels).
+    """
+    recording = LandmarkRecording(path)
+    input_controller = InputController(backend=RecordingInputBackend(screen_size))
+    has_hand = np.asarray(recording.hand_counts) > 0
+    timestamps = np.asarray(recording.timestamps)[has_hand]
+    tips = np.asarray(recording.landmarks[has_hand, 0, INDEX_FINGER_TIP, :2])
+    positions = np.array([input_controller.to_screen(float(x), float(y)) for x, y in tips])
+
+    return {name: measure_filter(create_filter(name, smoothing_factor), timestamps, positions)
+            for name in FILTERS}
+
+
+def is_landmark_recording(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, "meta.json"))
+
+
+def print_report(report):
+    print(f"Source:          {report['source']} ({report['recognizer']})")
+    print(f"Frames:          {report['frames']} in {report['wall_time_s']:.2f} s")
+    print(f"Overall FPS:     {report['overall_fps']:.1f} (including decode)")
+    print(f"Processing FPS:  {report['processing_fps']:.1f}")
+    print("Latency (ms):")
+    for stage, s in report["latency"].items():
+        print(f"  {stage:<15} mean {s['mean_ms']:7.2f}  p50 {s['p50_ms']:7.2f}  "
+              f"p95 {s['p95_ms']:7.2f}  p99 {s['p99_ms']:7.2f}  (n={s['count']})")
+    tracking = report.get("tracking")
+    if tracking:
+        print(f"Detector:        {tracking['detector_calls']} calls ({tracking['detector_calls_per_s']:.1f}/s), "
+              f"{tracking['tracked_frames']} frames tracked, {tracking['losses']} losses")
+    elif "tracking" in report:
+        print("Detector:        n/a (not measured by this backend; mediapipe needs --roi-tracking)")
+    print("Events:")
+    for action, count in sorted(report["event_counts"].items()):
+        print(f"  {action:<15} {count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless PalmControl pipeline benchmark.")
+    parser.add_argument("source", help="Video file, directory of frame images or landmark recording")
+    parser.add_argument("--recognizer", default="mediapipe", choices=recognizers.recognizer_names(),
+                        help="Recognizer backend (default: mediapipe)")
+    parser.add_argument("--device", default="cpu", help="Device passed to the recognizer")
+    parser.add_argument("--fps", type=float, help="Frame rate of the recording (default: from video, or 30)")
+    parser.add_argument("--max-frames", type=int, help="Stop after this many frames")
+    parser.add_argument("--max-hands", type=int, default=1,
+                        help="Hands to detect in a video (landmark recordings use their own count)")
+    parser.add_argument("--hand-roles", choices=HAND_ROLES, default="shared",
+                        help="shared: every hand clicks and scrolls; split: the cursor hand only moves the cursor")
+    parser.add_argument("--cursor-hand", choices=CURSOR_HANDS, default="right",
+                        help="Hand that moves the cursor when several are visible (default: right)")
+    parser.add_argument("--roi-tracking", action="store_true",
+                        help="Run inference on a crop around the hands (mediapipe)")
+    parser.add_argument("--no-temporal-tracking", action="store_true",
+                        help="Run the hand detector on every frame instead of tracking between frames")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Landmark replay speed: 1.0 real time, 0 as fast as possible (default)")
+    parser.add_argument("--compare-filters", action="store_true",
+                        help="Report lag and jitter of each smoothing filter on a landmark recording")
+    parser.add_argument("--smoothing-factor", type=float, default=0.3,
+                        help="Smoothing factor used with --compare-filters (default: 0.3)")
+    parser.add_argument("--gesture-engine", action="store_true",
+                        help="Measure the gesture engine alone on a landmark recording")
+    parser.add_argument("--events", help="Write the emitted event stream to this JSONL file")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, default="WARNING",
+                        help="Messages from the pipeline printed to stderr (default: WARNING)")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_level, stream=sys.stderr)
+    try:
+        return _run(parser, args)
+    finally:
+        shutdown_logging()
+
+
+def _run(parser, args):
+    if args.compare_filters:
+        if not is_landmark_recording(args.source):
+            parser.error("--compare-filters needs a landmark recording")
+        results = compare_filters(args.source, smoothing_factor=args.smoothing_factor)
+        if args.json:
+            print(json.dumps(results, indent=4))
+        else:
+            print(f"{'filter':<18} {'lag (ms)':>9} {'error (px)':>11} {'jitter (px)':>12}")
+            for name, result in results.items():
+                print(f"{name:<18} {result['lag_ms']:9.1f} {result['mean_error_px']:11.1f} {result['jitter_px']:12.2f}")
+        return 0
+
+    hand_roles = (args.hand_roles, args.cursor_hand)
+    if args.gesture_engine:
+        if not is_landmark_recording(args.source):
+            parser.error("--gesture-engine needs a landmark recording")
+        report = run_gesture_engine(args.source, hand_roles=hand_roles)
+    elif is_landmark_recording(args.source):
+        report = run_landmark_replay(args.source, speed=args.speed, hand_roles=hand_roles)
+    else:
+        report = run_benchmark(args.source, recognizer_name=args.recognizer, fps=args.fps,
+                               max_frames=args.max_frames, device=args.device,
+                               max_num_hands=args.max_hands, hand_roles=hand_roles,
+                               temporal_tracking=not args.no_temporal_tracking,
+                               roi_tracking=args.roi_tracking)
+
+    if args.events:
+        with open(args.events, 'w') as f:
+            for event in report["events"]:
+                f.write(json.dumps(event) + "\n")
+
+    if args.json:
+        summary = {key: value for key, value in report.items() if key != "events"}
+        print(json.dumps(summary, indent=4))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,372 @@
+import atexit
 import json
+import logging
 import os
+import stat
+import tempfile
+import threading
+import time
+
+from logging_setup import LOG_LEVELS
+from recognizers import RECOGNIZERS
+
+logger = logging.getLogger(__name__)
+
+# 配置项的类型与取值范围：数值为 (type, min, max)，字符串为 (str, 可选值或 None)，布尔为 (bool,)
+# Numbers are clamped into range; unknown choices and unconvertible values are rejected.
+CONFIG_SCHEMA = {
+    "recognizer": (str, RECOGNIZERS),  # Registered backends
+    "device": (str, None),
+    "onnx_palm_model": (str, None),
+    "onnx_landmark_model": (str, None),
+    "onnx_threads": (int, 0, 64),
+    "camera_id": (int, 0, 63),
+    "camera_path": (str, None),
+    "capture_width": (int, 0, 7680),
+    "capture_height": (int, 0, 4320),
+    "capture_fps": (int, 0, 240),
+    "capture_fourcc": (str, None),
+    "capture_buffer_size": (int, 0, 16),
+    "capture_auto_probe": (bool,),
+    "capture_stall_timeout": (float, 0.5, 30.0),
+    "capture_max_backoff": (float, 1.0, 300.0),
+    "sensitivity": (float, 0.5, 5.0),
+    "autostart": (bool,),
+    "start_silently": (bool,),
+    "smoothing_factor": (float, 0.1, 1.0),
+    "smoothing_filter": (str, ("weighted_average", "one_euro", "kalman")),
+    "one_euro_beta": (float, 0.0, 1.0),
+    "kalman_measurement_noise": (float, 0.1, 10000.0),
+    "max_fps": (int, 30, 240),
+    "preview_fps": (int, 1, 30),
+    "hold_threshold": (float, 0.5, 3.0),
+    "max_num_hands": (int, 1, 4),
+    "hand_roles": (str, ("shared", "split")),
+    "cursor_hand": (str, ("first", "left", "right")),
+    "click_stability_zone": (float, 0.01, 0.05),
+    "adaptive_frame_rate": (bool,),
+    "inference_max_fps": (int, 5, 240),
+    "idle_fps": (float, 1.0, 30.0),
+    "idle_after": (float, 0.1, 60.0),
+    "idle_scale": (float, 0.25, 1.0),
+    "inference_cpu_budget": (float, 0.05, 1.0),
+    "inference_workers": (int, 0, 8),
+    "roi_tracking": (bool,),
+    "roi_padding": (float, 0.1, 2.0),
+    "temporal_tracking": (bool,),
+    "telemetry_buffer_size": (int, 1024, 1048576),
+    "metrics_port": (int, 0, 65535),
+    "metrics_host": (str, None),
+    "log_level": (str, LOG_LEVELS),
+    "log_file": (str, None),
+    "warm_idle_timeout": (float, 0.0, 3600.0),
+    "prewarm_modules": (bool,),
+    "async_input_dispatch": (bool,),
+    "cursor_render_loop": (bool,),
+    "quick_scroll_enabled": (bool,),
+    "quick_scroll_up_sensitivity": (float, 0.5, 3.0),
+    "quick_scroll_down_sensitivity": (float, 0.5, 3.0),
+    "quick_scroll_amount": (int, 10, 500),
+}
+
+
+def validate_config_value(key, value):
+    """
+    Convert `value` to the declared type of `key` and clamp it into range.
+
+    Raises:
+        ValueError: If the value cannot be converted or is not one of the allowed choices.
+    """
+    spec = CONFIG_SCHEMA.get(key)
+    if spec is None:
+        return value
+    value_type = spec[0]
+    if value_type is bool:
+        if isinstance(value, str):
+            if value.lower() not in ("true", "false", "1", "0"):
+                raise ValueError(f"{key} must be a boolean, got {value!r}")
+            return value.lower() in ("true", "1")
+        return bool(value)
+    if value_type is str:
+        value = str(value)
+        if spec[1] is not None and value not in spec[1]:
+            raise ValueError(f"{key} must be one of {', '.join(spec[1])}, got {value!r}")
+        return value
+    try:
+        value = value_type(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number, got {value!r}")
+    return max(spec[1], min(spec[2], value))
+
+
+class ConfigSubscription:
+    """
+    Collects config changes for one component until it applies them on its own thread.
+
+    Changes are merged per key (latest value wins) and `drain()` hands them over as a
+    single batch, so a component never observes half of an `update()`.
+    """
+
+    def __init__(self, config_manager, keys):
+        self.config_manager = config_manager
+        self.keys = frozenset(keys)
+        self._lock = threading.Lock()
+        self._pending = {}
+        config_manager.subscribe(self._on_change, self.keys)
+
+    def _on_change(self, changes):
+        with self._lock:
+            self._pending.update(changes)
+
+    def drain(self):
+        """Return the changes received since the last call (empty dict if none)."""
+        if not self._pending:
+            return {}
+        with self._lock:
+            changes, self._pending = self._pending, {}
+        return changes
+
+    def close(self):
+        self.config_manager.unsubscribe(self._on_change)
+
+
+def _file_mode(path):
+    """Permission bits of `path`, or those a new file gets under the current umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
 
 class ConfigManager:
-    def __init__(self, file_path='config.json'):
+    """
+    In-memory configuration backed by config.json.
+
+    `set()` / `update()` only touch memory and mark the config dirty; a background
+    thread writes the file once changes have settled for `flush_delay` seconds (and
+    at least every `max_flush_delay` seconds while they keep coming, e.g. during a
+    slider drag). Writes go to a temporary file that is renamed over config.json,
+    so the file is never left half-written. A failed write is retried with a delay
+    that doubles up to `MAX_RETRY_DELAY` seconds.
+    """
+
+    MAX_RETRY_DELAY = 5.0
+
+    def __init__(self, file_path='config.json', flush_delay: float = 0.5, max_flush_delay: float = 2.0):
         self.file_path = file_path
+        self.flush_delay = flush_delay
+        self.max_flush_delay = max_flush_delay
         self.defaults = {
             "recognizer": "mediapipe",
             "device": "cpu",
+            "onnx_palm_model": "models/palm_detection.onnx",
+            "onnx_landmark_model": "models/hand_landmark.onnx",
+            "onnx_threads": 0,
             "camera_id": 0,
+            "camera_path": "",
+            "capture_width": 640,
+            "capture_height": 480,
+            "capture_fps": 30,
+            "capture_fourcc": "",
+            "capture_buffer_size": 1,
+            "capture_auto_probe": False,
+            "capture_stall_timeout": 2.0,
+            "capture_max_backoff": 30.0,
             "sensitivity": 2.0,
             "autostart": False,
             "start_silently": True,
             "smoothing_factor": 0.3,
+            "smoothing_filter": "weighted_average",
+            "one_euro_beta": 0.005,
+            "kalman_measurement_noise": 25.0,
             "max_fps": 120,
+            "preview_fps": 15,
+            "hold_threshold": 1.0,
+            "max_num_hands": 1,
+            "hand_roles": "shared",
+            "cursor_hand": "right",
+            "click_stability_zone": 0.02,
+            "adaptive_frame_rate": True,
+            "inference_max_fps": 60,
+            "idle_fps": 8.0,
+            "idle_after": 2.0,
+            "idle_scale": 0.5,
+            "inference_cpu_budget": 0.8,
+            "inference_workers": 0,
+            "roi_tracking": False,
+            "roi_padding": 0.6,
+            "temporal_tracking": True,
+            "telemetry_buffer_size": 16384,
+            "metrics_port": 0,
+            "metrics_host": "127.0.0.1",
+            "log_level": "INFO",
+            "log_file": "",
+            "warm_idle_timeout": 120.0,
+            "prewarm_modules": True,
+            "async_input_dispatch": True,
+            "cursor_render_loop": True,
             "quick_scroll_enabled": True,
             "quick_scroll_up_sensitivity": 1.5,
             "quick_scroll_down_sensitivity": 1.5,
             "quick_scroll_amount": 100
         }
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._dirty = False
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._failed_writes = 0  # Consecutive failed writes
+        self._retry_at = 0.0  # No write attempt before this time (after a failure)
+        self._flush_thread = None
+        self._subscribers = []
+
         self.config = self.load_config()
+        atexit.register(self.flush)
 
     def load_config(self):
         if not os.path.exists(self.file_path):
-            self.save_config(self.defaults)
-            return self.defaults
+            self.save_config(self.defaults.copy())
+            return self.config
         try:
             with open(self.file_path, 'r') as f:
                 user_config = json.load(f)
                 # Merge user config with defaults to ensure all keys are present
                 config = self.defaults.copy()
-                config.update(user_config)
+                for key, value in user_config.items():
+                    try:
+                        config[key] = validate_config_value(key, value)
+                    except ValueError as e:
+                        logger.warning("Ignoring invalid config value: %s", e)
                 return config
         except (json.JSONDecodeError, TypeError):
             # If config is corrupted, reset to defaults
-            self.save_config(self.defaults)
-            return self.defaults
+            self.save_config(self.defaults.copy())
+            return self.config
 
     def save_config(self, config_data):
-        self.config = config_data
-        with open(self.file_path, 'w') as f:
-            json.dump(self.config, f, indent=4)
+        """Replace the whole configuration and write it immediately."""
+        with self._lock:
+            self.config = config_data
+            self._dirty = True
+        self.flush()
 
     def get(self, key):
         return self.config.get(key, self.defaults.get(key))
 
     def set(self, key, value):
-        self.config[key] = value
-        self.save_config(self.config)
+        self.update({key: value})
+
+    def update(self, values):
+        """
+        Validate and set several keys at once, then notify subscribers with one batch.
+
+        The file is written later by the background flush.
+
+        Raises:
+            ValueError: If any value is invalid; nothing is changed in that case.
+        """
+        validated = {key: validate_config_value(key, value) for key, value in values.items()}
+        with self._lock:
+            changes = {key: value for key, value in validated.items()
+                       if key not in self.config or self.config[key] != value}
+            if not changes:
+                return
+            self.config.update(changes)
+            self._mark_dirty()
+            subscribers = list(self._subscribers)
+
+        for callback, keys in subscribers:
+            relevant = changes if keys is None else {k: v for k, v in changes.items() if k in keys}
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    logger.warning("Config subscriber failed: %s", e)
+
+    def subscribe(self, callback, keys=None):
+        """
+        Call `callback(changes)` after every update touching `keys` (all keys if None).
+
+        The callback runs on the thread that changed the config, so it should only
+        record the change (see ConfigSubscription) and let its component apply it.
+        """
+        with self._lock:
+            self._subscribers.append((callback, None if keys is None else frozenset(keys)))
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [(cb, keys) for cb, keys in self._subscribers if cb != callback]
+
+    def _mark_dirty(self):
+        now = time.monotonic()
+        if not self._dirty:
+            self._dirty = True
+            self._first_change = now
+        self._last_change = now
+        if self._flush_thread is None:
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="ConfigFlush", daemon=True)
+            self._flush_thread.start()
+        self._changed.notify()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                self._changed.wait_for(lambda: self._dirty)
+                # Debounce: wait until changes settle, but don't postpone the write forever
+                while self._dirty:
+                    deadline = max(min(self._last_change + self.flush_delay,
+                                       self._first_change + self.max_flush_delay), self._retry_at)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(remaining)
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to disk now (called on exit)."""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps(self.config, indent=4)
+                self._dirty = False
+
+            directory = os.path.dirname(os.path.abspath(self.file_path))
+            temp_path = None
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # mkstemp creates the file as 0600: keep the mode the config file had
+                os.chmod(temp_path, _file_mode(self.file_path))
+                os.replace(temp_path, self.file_path)
+            except OSError as e:
+                if temp_path is not None:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+                self._failed_writes += 1
+                retry_delay = min(self.flush_delay * 2 ** self._failed_writes, self.MAX_RETRY_DELAY)
+                if self._failed_writes == 1:
+                    logger.warning("Failed to save config: %s. Retrying in the background.", e)
+                else:
+                    logger.debug("Failed to save config (attempt %d): %s", self._failed_writes, e)
+                with self._lock:
+                    self._retry_at = time.monotonic() + retry_delay
+                    if not self._dirty:
+                        self._dirty = True
+                        self._first_change = self._last_change = time.monotonic()
+                return
+            if self._failed_writes:
+                logger.info("Saved config after %d failed attempt(s).", self._failed_writes)
+                self._failed_writes = 0
 
     def get_quick_scroll_settings(self):
         """获取快速滚动的所有相关设置"""
@@ -60,14 +380,16 @@ class ConfigManager:
     def set_quick_scroll_settings(self, enabled=None, up_sensitivity=None, 
                                  down_sensitivity=None, scroll_amount=None):
         """设置快速滚动的相关参数"""
+        values = {}
         if enabled is not None:
-            self.set("quick_scroll_enabled", enabled)
+            values["quick_scroll_enabled"] = enabled
         if up_sensitivity is not None:
-            self.set("quick_scroll_up_sensitivity", up_sensitivity)
+            values["quick_scroll_up_sensitivity"] = up_sensitivity
         if down_sensitivity is not None:
-            self.set("quick_scroll_down_sensitivity", down_sensitivity)
+            values["quick_scroll_down_sensitivity"] = down_sensitivity
         if scroll_amount is not None:
-            self.set("quick_scroll_amount", scroll_amount)
+            values["quick_scroll_amount"] = scroll_amount
+        self.update(values)
 
     def is_quick_scroll_enabled(self):
         """检查快速滚动是否启用"""
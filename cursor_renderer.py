@@ -0,0 +1,55 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CursorRenderer:
+    """
+    Advances the cursor at a fixed rate, independent of the camera frame rate.
+
+    The recognizer only delivers a new hand position every ~33 ms at 30 fps. This
+    thread calls `InputController.render_tick()` at the configured `max_fps`, which
+    interpolates towards (and briefly extrapolates past) the latest sample, so the
+    cursor moves at display rate while inference stays at camera rate.
+    """
+
+    def __init__(self, input_controller):
+        self.input_controller = input_controller
+        self.ticks = 0
+        self.missed_ticks = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="CursorRenderer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                self.input_controller.render_tick()
+            except Exception as e:
+                logger.warning("Error in cursor render loop: %s", e)
+            self.ticks += 1
+
+            # Re-read the interval every tick so set_max_fps() applies immediately
+            next_tick += self.input_controller.min_move_interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind: skip the missed ticks instead of bursting to catch up
+                self.missed_ticks += 1
+                next_tick = time.perf_counter()
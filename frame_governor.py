@@ -0,0 +1,104 @@
+class FrameGovernor:
+    """
+    Decides which camera frames get inference, based on hand presence and measured cost.
+
+    - active: up to `max_fps`, as long as inference stays within `cpu_budget` of one core
+      (a frame costing 20 ms with a 0.5 budget limits the rate to 25 fps).
+    - idle: after `idle_after` seconds without a hand, drop to `idle_fps` and ask the
+      recognizer to run on a frame downscaled by `idle_scale`.
+
+    A detected hand switches back to active immediately, so only the first frame
+    of a new interaction is processed at the idle rate.
+    """
+
+    ACTIVE = "active"
+    IDLE = "idle"
+
+    def __init__(self, max_fps: float = 60, idle_fps: float = 8, idle_after: float = 2.0,
+                 idle_scale: float = 0.5, cpu_budget: float = 0.8, enabled: bool = True):
+        self.configure(max_fps=max_fps, idle_fps=idle_fps, idle_after=idle_after,
+                       idle_scale=idle_scale, cpu_budget=cpu_budget, enabled=enabled)
+        self.state = self.ACTIVE
+        self.last_process_time = None
+        self.last_hand_time = None
+        self.inference_cost = 0.0  # Exponential moving average, seconds per processed frame
+        self.cost_smoothing = 0.1
+
+    def configure(self, max_fps=None, idle_fps=None, idle_after=None, idle_scale=None,
+                  cpu_budget=None, enabled=None):
+        """Update any subset of the parameters (values are clamped)."""
+        if max_fps is not None:
+            self.max_fps = max(5.0, min(240.0, float(max_fps)))
+        if idle_fps is not None:
+            self.idle_fps = max(1.0, min(30.0, float(idle_fps)))
+        if idle_after is not None:
+            self.idle_after = max(0.1, float(idle_after))
+        if idle_scale is not None:
+            self.idle_scale = max(0.25, min(1.0, float(idle_scale)))
+        if cpu_budget is not None:
+            self.cpu_budget = max(0.05, min(1.0, float(cpu_budget)))
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    @property
+    def target_interval(self):
+        """Seconds between processed frames in the current state."""
+        if self.enabled and self.state == self.IDLE:
+            return 1.0 / self.idle_fps
+        interval = 1.0 / self.max_fps
+        if self.enabled:
+            # Back off when inference would use more than cpu_budget of a core
+            interval = max(interval, self.inference_cost / self.cpu_budget)
+        return interval
+
+    @property
+    def scale(self):
+        """Downscale factor the recognizer should apply to the frame (1.0 = full size)."""
+        return self.idle_scale if self.enabled and self.state == self.IDLE else 1.0
+
+    def should_process(self, now: float) -> bool:
+        if self.last_process_time is None:
+            return True
+        # 10% slack so camera timestamp jitter does not skip every other frame
+        return now - self.last_process_time >= 0.9 * self.target_interval
+
+    def record(self, now: float, hand_present: bool, inference_time: float):
+        """Report a processed frame: whether a hand was found and what inference cost."""
+        self.mark_processed(now)
+        self.record_result(now, hand_present, inference_time)
+
+    def mark_processed(self, now: float):
+        """A frame was handed to inference (by the thread that calls should_process())."""
+        self.last_process_time = now
+
+    def record_result(self, frame_time: float, hand_present: bool, inference_time: float):
+        """
+        Report the outcome of the frame taken at `frame_time`. When inference runs elsewhere,
+        results may arrive late and out of order; an older result never undoes a newer one.
+        """
+        if self.inference_cost == 0.0:
+            self.inference_cost = inference_time
+        else:
+            self.inference_cost += self.cost_smoothing * (inference_time - self.inference_cost)
+
+        if hand_present:
+            if self.last_hand_time is None or frame_time > self.last_hand_time:
+                self.last_hand_time = frame_time
+            self.state = self.ACTIVE
+        elif self.last_hand_time is None:
+            self.last_hand_time = frame_time  # Start the idle countdown from the first frame
+        elif frame_time - self.last_hand_time >= self.idle_after:
+            self.state = self.IDLE
+
+    def reset(self):
+        """Back to active, e.g. when control resumes."""
+        self.state = self.ACTIVE
+        self.last_process_time = None
+        self.last_hand_time = None
+
+    def get_stats(self):
+        return {
+            "state": self.state if self.enabled else "disabled",
+            "target_fps": 1.0 / self.target_interval,
+            "inference_ms": self.inference_cost * 1000
+        }
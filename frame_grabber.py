@@ -0,0 +1,483 @@
+import cv2
+import logging
+import os
+import re
+import threading
+import time
+
+# Candidate modes for auto-probing, cheapest first. At equal resolution uncompressed
+# YUYV costs no decode, so it is tried before MJPG.
+PROBE_RESOLUTIONS = ((640, 360), (640, 480), (800, 600), (960, 540), (1280, 720))
+PROBE_FOURCCS = ("YUYV", "MJPG")
+
+# Stable device names on Linux (they survive USB resets and re-enumeration, unlike indices)
+V4L_BY_ID_DIR = "/dev/v4l/by-id"
+
+# Capture supervision: consecutive failed reads before the camera is reopened, and the
+# reopen backoff (doubling from RECONNECT_INITIAL_DELAY up to max_backoff seconds)
+READ_FAILURES_BEFORE_REOPEN = 5
+READ_RETRY_DELAY = 0.1
+RECONNECT_INITIAL_DELAY = 0.5
+# How long stop() waits for the capture thread to finish its current read
+STOP_JOIN_TIMEOUT = 2.0
+
+# Capture health states
+CAMERA_OK = "ok"
+CAMERA_STALLED = "stalled"            # No frame for stall_timeout seconds (as seen by the consumer)
+CAMERA_RECONNECTING = "reconnecting"
+CAMERA_STOPPED = "stopped"
+
+logger = logging.getLogger(__name__)
+
+
+def decode_fourcc(value) -> str:
+    """Turn the CAP_PROP_FOURCC integer into its four-letter code."""
+    value = int(value)
+    code = "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+    return code if code.isprintable() else ""
+
+
+def resolve_camera_source(camera_id, camera_path=""):
+    """
+    The OpenCV source for a camera: `camera_id`, or the device `camera_path` names.
+
+    Args:
+        camera_path (str): A device path (e.g. /dev/v4l/by-id/usb-...-video-index0), or
+            part of a /dev/v4l/by-id name such as the camera's serial number.
+
+    Returns:
+        The camera index or device path to open, or None if `camera_path` matches no
+        connected device (e.g. while it is unplugged).
+    """
+    if not camera_path:
+        return camera_id
+    if os.path.exists(camera_path):
+        device = os.path.realpath(camera_path)
+    elif os.path.isdir(V4L_BY_ID_DIR):
+        # Capture nodes end in -video-index0; further indices are metadata nodes
+        matches = sorted((name for name in os.listdir(V4L_BY_ID_DIR) if camera_path in name),
+                         key=lambda name: (not name.endswith("-index0"), name))
+        if not matches:
+            return None
+        device = os.path.realpath(os.path.join(V4L_BY_ID_DIR, matches[0]))
+    elif os.path.isabs(camera_path):
+        return None
+    else:
+        return camera_id  # No stable device names on this platform
+    # /dev/videoN opens with any backend as index N
+    match = re.fullmatch(r"/dev/video(\d+)", device)
+    return int(match.group(1)) if match else device
+
+
+def apply_capture_profile(cap, profile):
+    """
+    Request a capture mode from the driver.
+
+    Args:
+        profile (dict): Optional keys "width", "height", "fps", "fourcc" and "buffer_size";
+            missing or zero/empty values keep the driver default.
+    """
+    # Some backends (V4L2) only honour the pixel format if it is set before the resolution
+    fourcc = profile.get("fourcc")
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc[:4].ljust(4)))
+    if profile.get("width"):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile["width"])
+    if profile.get("height"):
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile["height"])
+    if profile.get("fps"):
+        cap.set(cv2.CAP_PROP_FPS, profile["fps"])
+    if profile.get("buffer_size"):
+        # Keep the driver queue short so cap.read() returns a fresh frame
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, profile["buffer_size"])
+
+
+def read_capture_mode(cap):
+    """Return the mode the driver actually negotiated."""
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": float(cap.get(cv2.CAP_PROP_FPS)),
+        "fourcc": decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC))
+    }
+
+
+def measure_capture_fps(cap, frames: int = 15, warmup: int = 3):
+    """Read a few frames and return the delivered frame rate (0 if reads fail)."""
+    for _ in range(warmup):
+        if not cap.read()[0]:
+            return 0.0
+    start = time.perf_counter()
+    for _ in range(frames):
+        if not cap.read()[0]:
+            return 0.0
+    elapsed = time.perf_counter() - start
+    return frames / elapsed if elapsed > 0 else 0.0
+
+
+def probe_capture_mode(cap, target_fps: float, buffer_size: int = 1):
+    """
+    Try candidate modes from cheapest to most expensive and keep the first one the
+    camera actually delivers at (close to) `target_fps`.
+
+    Returns:
+        dict: The chosen profile, or None if no candidate met the target.
+    """
+    for width, height in PROBE_RESOLUTIONS:
+        for fourcc in PROBE_FOURCCS:
+            profile = {"width": width, "height": height, "fps": target_fps,
+                       "fourcc": fourcc, "buffer_size": buffer_size}
+            apply_capture_profile(cap, profile)
+            mode = read_capture_mode(cap)
+            if (mode["width"], mode["height"]) != (width, height) or mode["fourcc"] != fourcc:
+                continue  # Driver substituted another mode
+            measured = measure_capture_fps(cap)
+            logger.info("Probed %dx%d %s: %.1f fps", width, height, fourcc, measured)
+            if measured >= 0.9 * target_fps:
+                return profile
+    return None
+
+
+class FrameGrabber:
+    """
+    Continuously drains a camera on its own thread into a single-slot buffer.
+
+    Only the most recent frame is kept: a consumer that is slower than the
+    camera always picks up the freshest frame instead of working through a
+    backlog of stale ones, so capture-to-cursor latency stays bounded by one
+    inference pass regardless of how long that pass takes.
+
+    The capture thread also supervises the camera: after repeated read failures,
+    or a read that blocked for longer than `stall_timeout`, it releases the camera
+    and reopens it with exponential backoff (looking the device up again by
+    `camera_path`, so a camera that comes back under another index after a USB
+    reset is found), then carries on with the same frame numbering. A read that
+    never returns is caught by a watchdog thread, which abandons the blocked
+    capture thread and starts a fresh one that reopens the camera.
+    """
+
+    def __init__(self, camera_id: int = 0, profile=None, auto_probe: bool = False, target_fps: float = 30,
+                 telemetry=None, camera_path: str = "", stall_timeout: float = 2.0, max_backoff: float = 30.0):
+        """
+        Args:
+            camera_id (int): OpenCV camera index.
+            profile (dict): Requested capture mode, see apply_capture_profile().
+            auto_probe (bool): Ignore the requested resolution/format and pick the cheapest
+                mode that delivers `target_fps`.
+            telemetry: Telemetry store that receives frame intervals, drops and read failures.
+            camera_path (str): Stable device path or serial, used instead of `camera_id`
+                (see resolve_camera_source()).
+            stall_timeout (float): Seconds without a frame after which the camera counts as stalled.
+            max_backoff (float): Longest wait between reopen attempts in seconds.
+        """
+        self.camera_id = camera_id
+        self.camera_path = camera_path
+        self.profile = dict(profile or {})
+        self.auto_probe = auto_probe
+        self.target_fps = target_fps
+        self.telemetry = telemetry
+        self.stall_timeout = stall_timeout
+        self.max_backoff = max_backoff
+        self.negotiated_mode = None
+        self.source = None
+        self.cap = None
+
+        # Supervision state, written by the capture thread
+        self.state = CAMERA_STOPPED
+        self.reconnects = 0
+        self.reconnect_attempts = 0  # Failed attempts of the reconnect in progress
+        self.stalls = 0
+        self._last_frame_time = None
+        self._next_retry = None
+        # Watchdog handshake, guarded by the lock: when the current read started (None when
+        # not reading), and the generation of the capture thread that owns the camera
+        self._watchdog_lock = threading.Lock()
+        self._read_started = None
+        self._generation = 0
+
+        # Latest-frame slot, guarded by the condition
+        self._condition = threading.Condition()
+        self._frame = None
+        self._frame_time = 0.0
+        self._frame_seq = 0
+        self._consumed_seq = 0
+
+        # Counters
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+
+        self._thread = None
+        self._watchdog = None
+        self._stop_event = threading.Event()
+        # Cleared while paused: the camera stays open but no frames are read
+        self._active = threading.Event()
+        self._active.set()
+        self._discard_frames = 0
+
+    def start(self) -> bool:
+        """Open the camera and start the capture thread. Returns False if the camera cannot be opened."""
+        if not self._open():
+            return False
+        if self.auto_probe:
+            probed = probe_capture_mode(self.cap, self.target_fps, self.profile.get("buffer_size", 1))
+            if probed:
+                # Reopening after a failure applies the probed mode directly
+                self.profile = probed
+                apply_capture_profile(self.cap, probed)
+                self.negotiated_mode = read_capture_mode(self.cap)
+            else:
+                logger.warning("No capture mode reached %s fps, using the configured profile.", self.target_fps)
+        mode = self.negotiated_mode
+        logger.info("Camera %s capturing %dx%d @ %.0f fps (%s)", self.source, mode['width'], mode['height'],
+                    mode['fps'], mode['fourcc'] or 'default format')
+
+        self.state = CAMERA_OK
+        self._stop_event.clear()
+        self._start_capture_thread()
+        self._watchdog = threading.Thread(target=self._watchdog_loop, name="FrameGrabberWatchdog", daemon=True)
+        self._watchdog.start()
+        return True
+
+    def _start_capture_thread(self, reconnect: bool = False):
+        self._thread = threading.Thread(target=self._capture_loop, args=(self._generation, reconnect),
+                                        name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the capture thread and release the camera."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._watchdog:
+            self._watchdog.join(timeout=STOP_JOIN_TIMEOUT)
+        self._watchdog = None
+        thread, self._thread = self._thread, None
+        if thread:
+            thread.join(timeout=STOP_JOIN_TIMEOUT)
+        with self._watchdog_lock:
+            self._generation += 1
+            self._read_started = None
+            if thread is not None and thread.is_alive():
+                # Still blocked in read(): as with the watchdog, the abandoned thread releases
+                # its own handle if the read ever returns
+                self.cap = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self.state = CAMERA_STOPPED
+
+    def _open(self) -> bool:
+        """Open the camera (looked up again from camera_path) and apply the capture profile."""
+        source = resolve_camera_source(self.camera_id, self.camera_path)
+        if source is None:
+            return False
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        apply_capture_profile(cap, self.profile)
+        self.negotiated_mode = read_capture_mode(cap)
+        self.source = source
+        self.cap = cap
+        return True
+
+    def _reconnect(self) -> bool:
+        """
+        Release the camera and reopen it, waiting longer after every failed attempt.
+
+        Returns:
+            bool: True once the camera is open again, False if the grabber was stopped first.
+        """
+        self.state = CAMERA_RECONNECTING
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        delay = RECONNECT_INITIAL_DELAY
+        self.reconnect_attempts = 0
+        while True:
+            self._next_retry = time.monotonic() + delay
+            if self._stop_event.wait(delay):
+                return False
+            if self._open():
+                break
+            self.reconnect_attempts += 1
+            logger.warning("Camera %s still unavailable (attempt %d), retrying in %.1f s.",
+                           self.camera_path or self.camera_id, self.reconnect_attempts,
+                           min(delay * 2, self.max_backoff))
+            delay = min(delay * 2, self.max_backoff)
+
+        self._next_retry = None
+        self.reconnect_attempts = 0
+        self.reconnects += 1
+        self.state = CAMERA_OK
+        if self.telemetry:
+            self.telemetry.record("camera", "reconnected", source=str(self.source))
+        logger.info("Camera %s reconnected.", self.source)
+        return True
+
+    def pause(self):
+        """Stop reading frames but keep the camera open, so resume() is immediate."""
+        self._active.clear()
+
+    def resume(self):
+        # Frames still queued in the driver were taken before the pause
+        self._discard_frames = int(self.profile.get("buffer_size") or 4)
+        self._last_frame_time = None  # Not stalled while paused
+        self._active.set()
+
+    def _capture_loop(self, generation, reconnect=False):
+        """
+        Args:
+            generation (int): Identifies this thread to the watchdog; once the watchdog has
+                moved on to a newer generation, this thread only releases its camera and exits.
+            reconnect (bool): Reopen the camera first (the watchdog abandoned the previous handle).
+        """
+        if reconnect and not self._reconnect():
+            return
+        telemetry = self.telemetry
+        last_frame_time = None
+        failures = 0
+        while not self._stop_event.is_set():
+            if not self._active.is_set():
+                self._active.wait(0.1)
+                last_frame_time = None
+                continue
+            cap = self.cap
+            read_start = time.perf_counter()
+            self._read_started = read_start
+            ret, frame = cap.read()
+            frame_time = time.perf_counter()
+            with self._watchdog_lock:
+                abandoned = generation != self._generation
+                if not abandoned:
+                    self._read_started = None
+            if abandoned:
+                # Replaced by the watchdog while blocked: the handle is no longer anyone else's
+                cap.release()
+                return
+            stalled = frame_time - read_start > self.stall_timeout
+            if not ret or stalled:
+                if stalled:
+                    # The driver blocked (e.g. USB reset): a fresh handle recovers faster than waiting it out
+                    self.stalls += 1
+                    if telemetry:
+                        telemetry.record("error", "camera_stall", frame_time - read_start)
+                    logger.warning("Camera %s blocked for %.1f s.", self.source, frame_time - read_start)
+                else:
+                    failures += 1
+                    self.read_failures += 1
+                    if telemetry:
+                        telemetry.record("error", "camera_read")
+                    logger.warning("Failed to grab frame from camera %s.", self.source)
+                if stalled or failures >= READ_FAILURES_BEFORE_REOPEN:
+                    if not self._reconnect():
+                        break
+                    failures = 0
+                    last_frame_time = None
+                else:
+                    self._stop_event.wait(READ_RETRY_DELAY)
+                continue
+            failures = 0
+            self._last_frame_time = frame_time
+            if self._discard_frames > 0:
+                self._discard_frames -= 1
+                continue
+            if telemetry:
+                telemetry.record("frame", "captured",
+                                 frame_time - last_frame_time if last_frame_time is not None else None)
+            last_frame_time = frame_time
+
+            with self._condition:
+                # The previous frame was never picked up by the consumer
+                if self._frame_seq > self._consumed_seq:
+                    self.frames_dropped += 1
+                    if telemetry:
+                        telemetry.record("drop", "frame")
+                self._frame = frame
+                self._frame_time = frame_time
+                self._frame_seq += 1
+                self.frames_captured += 1
+                self._condition.notify_all()
+
+    def _watchdog_loop(self):
+        """Replace the capture thread when its read has blocked for longer than stall_timeout."""
+        interval = min(0.5, self.stall_timeout / 2)
+        while not self._stop_event.wait(interval):
+            with self._watchdog_lock:
+                read_started = self._read_started
+                if read_started is None:
+                    continue
+                blocked_for = time.perf_counter() - read_started
+                if blocked_for <= self.stall_timeout:
+                    continue
+                # Abandon the blocked thread: releasing its handle under a read in progress
+                # is not safe with every backend, so it releases the handle itself on return
+                self._generation += 1
+                self._read_started = None
+                self.cap = None
+                self.stalls += 1
+                self.state = CAMERA_RECONNECTING
+            if self.telemetry:
+                self.telemetry.record("error", "camera_stall", blocked_for)
+            logger.warning("Camera %s blocked for %.1f s, reopening it.", self.source, blocked_for)
+            self._start_capture_thread(reconnect=True)
+
+    def read_latest(self, last_seq: int = 0, timeout: float = 0.5):
+        """
+        Wait for a frame newer than `last_seq` and return it.
+
+        Args:
+            last_seq (int): Sequence number of the last frame the caller processed.
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            tuple: (seq, capture_time, frame), or None if no new frame arrived in time.
+            `capture_time` is a `time.perf_counter()` timestamp taken right after `cap.read()`.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._frame_seq > last_seq or self._stop_event.is_set(), timeout
+            ):
+                return None
+            if self._frame_seq <= last_seq:
+                return None
+            self._consumed_seq = self._frame_seq
+            return self._frame_seq, self._frame_time, self._frame
+
+    def get_health(self):
+        """
+        Capture health as seen from outside the capture thread.
+
+        Returns:
+            dict: "state" (ok, stalled, reconnecting or stopped), "source", "last_frame_age_s",
+            "reconnects", "reconnect_attempts", "stalls" and "next_retry_s" (while reconnecting).
+        """
+        state = self.state
+        now = time.perf_counter()
+        last_frame_time = self._last_frame_time
+        last_frame_age = now - last_frame_time if last_frame_time is not None else None
+        # Report a read blocked in the driver as soon as it shows, before the watchdog steps in
+        if (state == CAMERA_OK and self._active.is_set() and last_frame_age is not None
+                and last_frame_age > self.stall_timeout):
+            state = CAMERA_STALLED
+        next_retry = self._next_retry
+        return {
+            "state": state,
+            "source": self.source,
+            "last_frame_age_s": last_frame_age,
+            "reconnects": self.reconnects,
+            "reconnect_attempts": self.reconnect_attempts,
+            "stalls": self.stalls,
+            "next_retry_s": max(0.0, next_retry - time.monotonic()) if next_retry is not None else None
+        }
+
+    def get_stats(self):
+        """返回采集统计信息（帧数、丢帧数、读取失败数、协商的模式、健康状态）"""
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+            "mode": self.negotiated_mode,
+            "health": self.get_health()
+        }
@@ -0,0 +1,447 @@
+"""
+Backend-independent gesture recognition.
+
+`GestureEngine.process(timestamp, hands)` runs every gesture of `GESTURE_TABLE` on
+timestamped (21, 3) landmark arrays and returns typed `GestureEvent`s; it never
+touches the OS or reads a clock, so it runs the same live, in replays and in
+benchmarks. `apply_gesture_events()` turns the events into InputController calls.
+
+Each gesture is a small state machine with named states:
+
+    pinch         idle -> pinched -> (released quickly: click) -> idle
+                                  -> (held >= hold_threshold: down) -> holding -> (released: up) -> idle
+    v_sign        idle -> arming (V held for v_sign_frames frames: right click) -> idle
+    quick_scroll  idle -> swiping (fast wrist motion for scroll_frames frames: scroll) -> idle
+
+Clicks, right clicks and scrolls share one cooldown (`gesture_cooldown`).
+
+With several hands, `HandTracker` gives each hand a stable ID by matching it to the
+previous frame's hands by landmark proximity, and each gesture keeps its state in
+small per-slot arrays, so hands never share state and a frame costs one step per
+visible hand. Only one hand (`cursor_hand`) moves the cursor; with
+`hand_roles="split"` it does nothing else and the other hands click and scroll.
+"""
+import math
+
+import numpy as np
+
+from recognizers import hand_landmarks as hl
+
+# Event types
+MOVE = "move"
+CLICK = "click"
+DOWN = "down"
+UP = "up"
+SCROLL = "scroll"
+
+# Hand roles: which gestures a hand runs
+ROLE_ALL = 0
+ROLE_CURSOR = 1
+ROLE_ACTIONS = 2
+ROLE_NAMES = ("all", "cursor", "actions")
+ROLE_GESTURES = {
+    ROLE_ALL: None,  # Every gesture
+    ROLE_CURSOR: ("pointer",),
+    ROLE_ACTIONS: ("pinch", "quick_scroll", "v_sign"),
+}
+
+HAND_ROLES = ("shared", "split")
+CURSOR_HANDS = ("first", "left", "right")
+
+
+class GestureEvent:
+    """
+    One gesture output.
+
+    Attributes:
+        type (str): MOVE, CLICK, DOWN, UP or SCROLL.
+        timestamp (float): Timestamp of the frame that produced it.
+        x, y (float): Normalized cursor position (MOVE).
+        button (str): "left" or "right" (CLICK, DOWN, UP).
+        direction (str): "up" or "down" (SCROLL).
+        hand (int): Tracking ID of the hand that produced it.
+    """
+
+    __slots__ = ("type", "timestamp", "x", "y", "button", "direction", "hand")
+
+    def __init__(self, type, timestamp, x=None, y=None, button=None, direction=None, hand=None):
+        self.type = type
+        self.timestamp = timestamp
+        self.x = x
+        self.y = y
+        self.button = button
+        self.direction = direction
+        self.hand = hand
+
+    def __repr__(self):
+        details = {"x": self.x, "y": self.y, "button": self.button, "direction": self.direction,
+                   "hand": self.hand}
+        fields = ", ".join(f"{key}={value!r}" for key, value in details.items() if value is not None)
+        return f"GestureEvent({self.type!r}, {self.timestamp:.3f}{', ' + fields if fields else ''})"
+
+
+class PointerGesture:
+    """The index finger tip drives the cursor on every frame."""
+
+    STATES = ("tracking",)
+
+    def __init__(self, engine, slots):
+        self.engine = engine
+        self.state = np.zeros(slots, dtype=np.int8)
+
+    def step(self, slot, hand, now, events):
+        tip = hand[hl.INDEX_FINGER_TIP]
+        events.append(GestureEvent(MOVE, now, x=float(tip[0]), y=float(tip[1])))
+
+    def reset(self, slot, now, events):
+        pass
+
+
+class PinchGesture:
+    """Short pinch: left click. Pinch held for `hold_threshold` seconds: left button down until released."""
+
+    STATES = ("idle", "pinched", "holding")
+    IDLE, PINCHED, HOLDING = range(3)
+
+    def __init__(self, engine, slots):
+        self.engine = engine
+        self.state = np.zeros(slots, dtype=np.int8)
+        self.start_time = np.zeros(slots)
+
+    def step(self, slot, hand, now, events):
+        engine = self.engine
+        pinching = hl.is_pinching(hand)
+        state = self.state[slot]
+        if state == self.IDLE:
+            if pinching:
+                self.state[slot] = self.PINCHED
+                self.start_time[slot] = now
+        elif state == self.PINCHED:
+            held = now - self.start_time[slot]
+            if pinching:
+                if held >= engine.hold_threshold:
+                    self.state[slot] = self.HOLDING
+                    events.append(GestureEvent(DOWN, now, button="left"))
+            else:
+                self.state[slot] = self.IDLE
+                if held < engine.hold_threshold and engine.cooldown_elapsed(now):
+                    events.append(GestureEvent(CLICK, now, button="left"))
+                    engine.last_gesture_time = now
+        elif not pinching:  # HOLDING
+            self.state[slot] = self.IDLE
+            events.append(GestureEvent(UP, now, button="left"))
+
+    def reset(self, slot, now, events):
+        if self.state[slot] == self.HOLDING:
+            events.append(GestureEvent(UP, now, button="left"))
+        self.state[slot] = self.IDLE
+
+
+class VSignGesture:
+    """V sign held for `v_sign_frames` consecutive frames: right click."""
+
+    STATES = ("idle", "arming")
+    IDLE, ARMING = range(2)
+
+    def __init__(self, engine, slots):
+        self.engine = engine
+        self.state = np.zeros(slots, dtype=np.int8)
+        self.frames = np.zeros(slots, dtype=np.int32)
+
+    def step(self, slot, hand, now, events):
+        engine = self.engine
+        if not engine.cooldown_elapsed(now):
+            return
+        if not hl.is_v_sign(hand):
+            self.state[slot], self.frames[slot] = self.IDLE, 0
+            return
+        self.frames[slot] += 1
+        self.state[slot] = self.ARMING
+        if self.frames[slot] >= engine.v_sign_frames:
+            events.append(GestureEvent(CLICK, now, button="right"))
+            engine.last_gesture_time = now
+            self.state[slot], self.frames[slot] = self.IDLE, 0
+
+    def reset(self, slot, now, events):
+        self.state[slot], self.frames[slot] = self.IDLE, 0
+
+
+class QuickScrollGesture:
+    """Fast vertical wrist motion for `scroll_frames` frames: quick scroll up or down."""
+
+    STATES = ("idle", "swiping")
+    IDLE, SWIPING = range(2)
+
+    def __init__(self, engine, slots):
+        self.engine = engine
+        self.state = np.zeros(slots, dtype=np.int8)
+        self.frames = np.zeros(slots, dtype=np.int32)
+        self.last_y = np.full(slots, np.nan)  # NaN: no previous position
+
+    def step(self, slot, hand, now, events):
+        engine = self.engine
+        current_y = float(hand[hl.WRIST, 1])
+        last_y = self.last_y[slot]
+        self.last_y[slot] = current_y
+        if math.isnan(last_y):
+            return
+
+        # Per-frame change of the normalized wrist height (negative = moving up)
+        velocity = current_y - last_y
+        if abs(velocity) <= engine.scroll_velocity:
+            self.state[slot], self.frames[slot] = self.IDLE, 0
+            return
+        if not engine.cooldown_elapsed(now):
+            return
+        self.frames[slot] += 1
+        self.state[slot] = self.SWIPING
+        if self.frames[slot] >= engine.scroll_frames:
+            events.append(GestureEvent(SCROLL, now, direction="up" if velocity < 0 else "down"))
+            engine.last_gesture_time = now
+            self.state[slot], self.frames[slot] = self.IDLE, 0
+
+    def reset(self, slot, now, events):
+        self.state[slot], self.frames[slot], self.last_y[slot] = self.IDLE, 0, np.nan
+
+
+class HandTracker:
+    """
+    Stable IDs for the hands of consecutive frames.
+
+    Each tracked hand occupies a slot; a new frame's hands are matched to the slots
+    greedily by their mean landmark offset. A hand left over after that takes over a track
+    that was seen on the previous frame (a hand moving fast, e.g. during a quick scroll),
+    otherwise it gets a new ID. A slot that has not been matched for `timeout` seconds
+    is released.
+    """
+
+    def __init__(self, slots: int, match_distance: float = 0.2, timeout: float = 1.0):
+        """
+        Args:
+            slots (int): Maximum number of tracked hands.
+            match_distance (float): Largest mean landmark offset (normalized, per coordinate)
+                from a track's last position that still counts as the same hand.
+            timeout (float): Seconds a hand may go undetected before its track ends.
+        """
+        self.match_distance = match_distance
+        self.timeout = timeout
+        self.ids = np.full(slots, -1, dtype=np.int64)  # -1: free slot
+        self.points = np.zeros((slots, hl.NUM_LANDMARKS, 2), dtype=np.float32)
+        self.point_count = hl.NUM_LANDMARKS * 2
+        self.first_seen = np.zeros(slots)
+        self.last_seen = np.zeros(slots)
+        self.last_update = None
+        self.next_id = 0
+
+    def update(self, timestamp: float, hands):
+        """
+        Assign the hands of a frame to slots.
+
+        Args:
+            hands: Sequence of (21, 3) landmark arrays, at most one per slot.
+
+        Returns:
+            tuple: (slot of each hand, list of (slot, hand ID) whose track ended).
+        """
+        ended = []
+        tracked = []
+        for slot in range(len(self.ids)):
+            if self.ids[slot] < 0:
+                continue
+            if timestamp - self.last_seen[slot] > self.timeout:
+                ended.append((slot, int(self.ids[slot])))
+                self.ids[slot] = -1
+            else:
+                tracked.append(slot)
+
+        previous_update, self.last_update = self.last_update, timestamp
+        count = len(hands)
+        assigned = [-1] * count
+        if count == 0:
+            return assigned, ended
+
+        if count == 1 and len(tracked) == 1 and self.last_seen[tracked[0]] == previous_update:
+            # The usual single-hand case: nothing to disambiguate
+            assigned[0] = tracked[0]
+        elif tracked:
+            # Mean offset of every (hand, track) pair, matched greedily, closest pairs first
+            points = np.stack([hand[:, :2] for hand in hands])
+            distances = (np.abs(points[:, None] - self.points[tracked][None]).sum(axis=(2, 3))
+                         / self.point_count).tolist()
+            pairs = sorted((distance, hand_index, slot)
+                           for hand_index, row in enumerate(distances) for distance, slot in zip(row, tracked))
+            taken = set()
+            for distance, hand_index, slot in pairs:
+                if assigned[hand_index] >= 0 or slot in taken:
+                    continue
+                if distance <= self.match_distance or self.last_seen[slot] == previous_update:
+                    assigned[hand_index] = slot
+                    taken.add(slot)
+
+        for hand_index in range(count):
+            if assigned[hand_index] >= 0:
+                continue
+            free = [slot for slot in range(len(self.ids)) if self.ids[slot] < 0]
+            if free:
+                slot = free[0]
+            else:
+                # No free slot: take over the track that has gone unseen the longest
+                candidates = [slot for slot in range(len(self.ids)) if slot not in assigned]
+                slot = min(candidates, key=lambda candidate: self.last_seen[candidate])
+                ended.append((slot, int(self.ids[slot])))
+            assigned[hand_index] = slot
+            self.ids[slot] = self.next_id
+            self.next_id += 1
+            self.first_seen[slot] = timestamp
+
+        for hand, slot in zip(hands, assigned):
+            self.points[slot] = hand[:, :2]
+            self.last_seen[slot] = timestamp
+        return assigned, ended
+
+    def reset(self):
+        self.ids[:] = -1
+        self.last_update = None
+
+
+# Gestures run on each hand (those its role allows), in this order
+GESTURE_TABLE = (
+    ("pointer", PointerGesture),
+    ("pinch", PinchGesture),
+    ("quick_scroll", QuickScrollGesture),
+    ("v_sign", VSignGesture),
+)
+
+
+class GestureEngine:
+    def __init__(self, hold_threshold: float = 1.0, gesture_cooldown: float = 0.5, v_sign_frames: int = 3,
+                 scroll_velocity: float = 0.05, scroll_frames: int = 2, max_hands: int = 1,
+                 hand_roles: str = "shared", cursor_hand: str = "right", gestures=GESTURE_TABLE):
+        """
+        Args:
+            hold_threshold (float): Seconds a pinch must last to become a button hold.
+            gesture_cooldown (float): Minimum seconds between clicks, right clicks and scrolls.
+            v_sign_frames (int): Consecutive V-sign frames for a right click.
+            scroll_velocity (float): Per-frame wrist movement (normalized) that counts as a swipe.
+            scroll_frames (int): Consecutive swipe frames for a quick scroll.
+            max_hands (int): Number of hands tracked at once; further hands are ignored.
+            hand_roles (str): With two or more hands only the cursor hand moves the cursor.
+                "shared": every hand clicks and scrolls. "split": the cursor hand only
+                moves the cursor and the other hands click and scroll.
+            cursor_hand (str): "first" (the hand tracked longest), or the hand furthest
+                "left" / "right" as seen on screen.
+            gestures: (name, class) rows to run, see GESTURE_TABLE.
+        """
+        self.hold_threshold = hold_threshold
+        self.gesture_cooldown = gesture_cooldown
+        self.v_sign_frames = v_sign_frames
+        self.scroll_velocity = scroll_velocity
+        self.scroll_frames = scroll_frames
+        self.hand_roles = hand_roles
+        self.cursor_hand = cursor_hand
+        # No cooldown before the first gesture, however soon after start-up it comes
+        self.last_gesture_time = -math.inf
+        self.max_hands = max_hands
+        self.tracker = HandTracker(max_hands)
+        self.roles = np.zeros(max_hands, dtype=np.int8)
+        self.gestures = [(name, gesture_class(self, max_hands)) for name, gesture_class in gestures]
+        # Gestures run by each role, in table order
+        self._role_gestures = {
+            role: [gesture for name, gesture in self.gestures if names is None or name in names]
+            for role, names in ROLE_GESTURES.items()
+        }
+
+    def process(self, timestamp: float, hands):
+        """
+        Advance every gesture by one frame.
+
+        Args:
+            timestamp (float): Frame time in seconds (any monotonic clock).
+            hands: Sequence of (21, 3) normalized landmark arrays.
+
+        Returns:
+            list: GestureEvents, in the order they should be applied.
+        """
+        events = []
+        hands = hands[:self.max_hands]
+        slots, ended = self.tracker.update(timestamp, hands)
+        for slot, hand_id in ended:
+            self._reset_slot(slot, hand_id, timestamp, events)
+
+        roles = self._assign_roles(slots, hands)
+        for slot, hand, role in zip(slots, hands, roles):
+            hand_id = int(self.tracker.ids[slot])
+            first_event = len(events)
+            previous_role = int(self.roles[slot])
+            if role != previous_role:
+                # Release what the hand's previous role was doing (e.g. a held pinch)
+                for gesture in self._role_gestures[previous_role]:
+                    if gesture not in self._role_gestures[role]:
+                        gesture.reset(slot, timestamp, events)
+                self.roles[slot] = role
+            for gesture in self._role_gestures[role]:
+                gesture.step(slot, hand, timestamp, events)
+            for event in events[first_event:]:
+                event.hand = hand_id
+        return events
+
+    def _assign_roles(self, slots, hands):
+        """Role of each hand: a single hand does everything, otherwise one hand has the cursor."""
+        if len(slots) < 2:
+            return [ROLE_ALL] * len(slots)
+        if self.cursor_hand == "first":
+            cursor = min(range(len(slots)), key=lambda index: self.tracker.first_seen[slots[index]])
+        else:
+            # Frames are not mirrored: the hand furthest right on screen has the smallest image x
+            wrists = [float(hand[hl.WRIST, 0]) for hand in hands]
+            pick = min if self.cursor_hand == "right" else max
+            cursor = pick(range(len(slots)), key=wrists.__getitem__)
+        cursor_role = ROLE_CURSOR if self.hand_roles == "split" else ROLE_ALL
+        return [cursor_role if index == cursor else ROLE_ACTIONS for index in range(len(slots))]
+
+    def _reset_slot(self, slot, hand_id, timestamp, events):
+        first_event = len(events)
+        for _, gesture in self.gestures:
+            gesture.reset(slot, timestamp, events)
+        for event in events[first_event:]:
+            event.hand = hand_id
+        self.roles[slot] = ROLE_ALL
+
+    def cooldown_elapsed(self, now: float) -> bool:
+        return now - self.last_gesture_time > self.gesture_cooldown
+
+    def reset(self, timestamp: float):
+        """Return every gesture to its initial state; returns the events that release held buttons."""
+        events = []
+        for slot in range(self.max_hands):
+            self._reset_slot(slot, int(self.tracker.ids[slot]), timestamp, events)
+        self.tracker.reset()
+        self.last_gesture_time = -math.inf
+        return events
+
+    def get_states(self):
+        """Role and gesture states of each tracked hand, e.g. {3: {"role": "all", "pinch": "holding", ...}}."""
+        states = {}
+        for slot in np.flatnonzero(self.tracker.ids >= 0):
+            hand = {"role": ROLE_NAMES[self.roles[slot]]}
+            hand.update({name: gesture.STATES[gesture.state[slot]] for name, gesture in self.gestures})
+            states[int(self.tracker.ids[slot])] = hand
+        return states
+
+
+def apply_gesture_events(input_controller, events):
+    """Perform gesture events with an InputController (or anything with the same methods)."""
+    for event in events:
+        if event.type == MOVE:
+            input_controller.move_mouse(event.x, event.y)
+        elif event.type == CLICK:
+            if event.button == "right":
+                input_controller.right_click()
+            else:
+                input_controller.left_click()
+        elif event.type == DOWN:
+            input_controller.mouse_down(event.button)
+        elif event.type == UP:
+            input_controller.mouse_up(event.button)
+        elif event.type == SCROLL:
+            input_controller.scroll(event.direction, is_quick=True)
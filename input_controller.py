@@ -1,15 +1,59 @@
-import pyautogui
+import logging
 import time
 import threading
-from collections import deque
+
+from config_manager import ConfigSubscription
+from cursor_renderer import CursorRenderer
+from input_dispatcher import InputDispatcher
+from smoothing_filters import create_filter
+
+logger = logging.getLogger(__name__)
 
 class InputController:
-    def __init__(self, sensitivity: float = 2.0, config_manager=None):
-        self.screen_width, self.screen_height = pyautogui.size()
+    # Config keys applied by apply_config_changes()
+    CONFIG_KEYS = (
+        "sensitivity", "smoothing_factor", "smoothing_filter", "one_euro_beta", "kalman_measurement_noise",
+        "max_fps", "click_stability_zone", "quick_scroll_enabled", "quick_scroll_up_sensitivity",
+        "quick_scroll_down_sensitivity", "quick_scroll_amount",
+    )
+
+    def __init__(self, sensitivity: float = 2.0, config_manager=None, latency_tracker=None,
+                 backend=None, clock=time.time, async_dispatch: bool = False, render_loop: bool = False):
+        """
+        Args:
+            backend: Object exposing the pyautogui mouse API (size, moveTo, click, mouseDown,
+                mouseUp, scroll). Defaults to pyautogui itself; benchmarks pass a recorder.
+            clock: Time source used for rate limiting and click locks. Replays pass a
+                virtual clock so that results are deterministic.
+            async_dispatch (bool): Execute backend calls on an InputDispatcher worker thread
+                instead of the calling (camera) thread.
+            render_loop (bool): Move the cursor from a CursorRenderer thread running at
+                max_fps instead of once per recognizer sample.
+        """
+        if backend is None:
+            import pyautogui
+            # Optimize pyautogui for performance
+            pyautogui.FAILSAFE = False
+            pyautogui.PAUSE = 0
+            backend = pyautogui
+        self.backend = backend
+        self.clock = clock
+        self.screen_width, self.screen_height = self.backend.size()
         self.sensitivity = sensitivity
         self.dead_zone = 0.05
         self.config_manager = config_manager
         
+        # Latency instrumentation: capture timestamp of the frame currently being handled
+        self.latency_tracker = latency_tracker
+        self.frame_capture_time = None
+        # Structured record of every click, press and scroll (None when not collecting)
+        self.telemetry = latency_tracker.telemetry if latency_tracker else None
+
+        # Asynchronous OS input dispatch
+        self.dispatcher = None
+        if async_dispatch:
+            self.dispatcher = InputDispatcher(self.backend, latency_tracker=latency_tracker)
+        
         # Movement smoothing settings
         self.current_x = self.screen_width // 2
         self.current_y = self.screen_height // 2
@@ -17,12 +61,18 @@ class InputController:
         self.target_y = self.current_y
         
         self.smoothing_factor = 0.3  # Lower value for smoother movement (0-1)
-        self.position_history = deque(maxlen=5)
-        
-        # Movement interpolation
-        self.is_moving = False
-        self.move_thread = None
-        self.stop_moving = threading.Event()
+        self.smoothing_filter = create_filter("weighted_average", self.smoothing_factor)
+        
+        # Fixed-rate cursor rendering: latest target sample and its velocity (pixels/s)
+        self._sample_lock = threading.Lock()
+        self.target_time = None
+        self.target_velocity = (0.0, 0.0)
+        self._sample_capture_time = None
+        self._last_render_time = None
+        self.max_prediction_time = 0.05  # Never extrapolate further than this ahead of a sample
+        self.stale_sample_time = 0.15  # Stop predicting when no sample arrived for this long
+        self.reference_frame_rate = 30.0  # Rate at which smoothing_factor is applied per sample
+        self.renderer = None
         
         # Frame rate control
         self.last_move_time = 0
@@ -47,18 +97,20 @@ class InputController:
         self.quick_scroll_amount = 100
         self.default_scroll_amount = 50
         
-        # Load quick scroll settings from config if available
+        # Apply the current config, then follow changes to it
+        self._config_subscription = None
         if self.config_manager:
-            self.load_quick_scroll_settings()
-        
-        print(f"Screen size: {self.screen_width}x{self.screen_height}")
+            self.apply_config({key: self.config_manager.get(key) for key in self.CONFIG_KEYS})
+            self._config_subscription = ConfigSubscription(self.config_manager, self.CONFIG_KEYS)
         
-        # Optimize pyautogui for performance
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0
+        logger.info("Screen size: %dx%d", self.screen_width, self.screen_height)
         
         self.enable_performance_mode()
 
+        if render_loop:
+            self.renderer = CursorRenderer(self)
+            self.renderer.start()
+
     def move_mouse(self, x: float, y: float):
         """
         Move mouse to normalized coordinates (0.0 to 1.0) with smoothing and stability control.
@@ -67,7 +119,7 @@ class InputController:
             x (float): Normalized x-coordinate (left to right).
             y (float): Normalized y-coordinate (top to bottom).
         """
-        current_time = time.time()
+        current_time = self.clock()
         
         # Frame rate limiting
         if current_time - self.last_move_time < self.min_move_interval:
@@ -87,19 +139,87 @@ class InputController:
                     self.is_clicking = False
                     self.click_lock_position = None
         
-        # Apply dead zone
-        original_x, original_y = x, y
-        if x < self.dead_zone:
-            x = self.dead_zone
-        elif x > 1 - self.dead_zone:
-            x = 1 - self.dead_zone
+        self._update_position_stability(x, y)
+        raw_x, raw_y = self.to_screen(x, y)
         
-        if y < self.dead_zone:
-            y = self.dead_zone
-        elif y > 1 - self.dead_zone:
-            y = 1 - self.dead_zone
+        # Calculate smoothed position
+        smoothed_x, smoothed_y = self.smoothing_filter.filter(raw_x, raw_y, current_time)
+        
+        if self.renderer:
+            self._update_target(smoothed_x, smoothed_y, current_time)
+            return
 
-        self._update_position_stability(original_x, original_y)
+        self.target_x = smoothed_x
+        self.target_y = smoothed_y
+        
+        self._smooth_move_to_target()
+
+    def _update_target(self, x: float, y: float, sample_time: float):
+        """Publish a new target sample and its velocity for the render loop."""
+        with self._sample_lock:
+            vx, vy = 0.0, 0.0
+            if self.target_time is not None:
+                dt = sample_time - self.target_time
+                if 0 < dt < self.stale_sample_time:
+                    old_vx, old_vy = self.target_velocity
+                    # Light smoothing of the velocity estimate to avoid amplifying landmark noise
+                    vx = 0.5 * (x - self.target_x) / dt + 0.5 * old_vx
+                    vy = 0.5 * (y - self.target_y) / dt + 0.5 * old_vy
+            self.target_velocity = (vx, vy)
+            self.target_x = x
+            self.target_y = y
+            self.target_time = sample_time
+            self._sample_capture_time = self.frame_capture_time
+            self.frame_capture_time = None
+
+    def render_tick(self):
+        """Advance the cursor one step towards the predicted target. Called by CursorRenderer."""
+        now = self.clock()
+        with self._sample_lock:
+            target_x, target_y = self.target_x, self.target_y
+            vx, vy = self.target_velocity
+            sample_time = self.target_time
+            capture_time = self._sample_capture_time
+            self._sample_capture_time = None
+
+        # Velocity-based prediction between recognizer samples (not while a click is locked)
+        if sample_time is not None and not self.is_clicking:
+            age = now - sample_time
+            if 0 < age < self.stale_sample_time:
+                ahead = min(age, self.max_prediction_time)
+                target_x = max(0, min(self.screen_width - 1, target_x + vx * ahead))
+                target_y = max(0, min(self.screen_height - 1, target_y + vy * ahead))
+
+        dt = self.min_move_interval if self._last_render_time is None else max(0.0, now - self._last_render_time)
+        self._last_render_time = now
+
+        # Convert the per-sample smoothing factor into a per-tick one, so that the cursor
+        # feels the same whatever max_fps is
+        factor = min(1.0, self._output_smoothing())
+        alpha = 1 - (1 - factor) ** (dt * self.reference_frame_rate)
+
+        dx = target_x - self.current_x
+        dy = target_y - self.current_y
+        previous = (int(self.current_x), int(self.current_y))
+        if dx * dx + dy * dy < 4:
+            self.current_x = target_x
+            self.current_y = target_y
+        else:
+            self.current_x += dx * alpha
+            self.current_y += dy * alpha
+
+        # Don't send the OS redundant moves while the cursor is at rest
+        if capture_time is not None or (int(self.current_x), int(self.current_y)) != previous:
+            self._move_cursor(self.current_x, self.current_y, capture_time)
+    
+    def to_screen(self, x: float, y: float):
+        """
+        Map normalized hand coordinates to raw (unsmoothed) screen pixels: dead zone,
+        mirrored x-axis, sensitivity scaling around the screen center and clamping.
+        """
+        # Apply dead zone
+        x = max(self.dead_zone, min(1 - self.dead_zone, x))
+        y = max(self.dead_zone, min(1 - self.dead_zone, y))
 
         # Mirror x-axis for intuitive control
         screen_x = self.screen_width * (1 - x)
@@ -107,49 +227,18 @@ class InputController:
         
         # Apply sensitivity scaling
         center_x, center_y = self.screen_width / 2, self.screen_height / 2
-        dist_x = screen_x - center_x
-        dist_y = screen_y - center_y
-        
-        raw_x = center_x + dist_x * self.sensitivity
-        raw_y = center_y + dist_y * self.sensitivity
+        raw_x = center_x + (screen_x - center_x) * self.sensitivity
+        raw_y = center_y + (screen_y - center_y) * self.sensitivity
 
         # Clamp to screen boundaries
         raw_x = max(0, min(self.screen_width - 1, raw_x))
         raw_y = max(0, min(self.screen_height - 1, raw_y))
-        
-        self.position_history.append((raw_x, raw_y))
-        
-        # Calculate smoothed position
-        if len(self.position_history) >= 3:
-            smoothed_x, smoothed_y = self._calculate_smoothed_position()
-        else:
-            smoothed_x, smoothed_y = raw_x, raw_y
-        
-        self.target_x = smoothed_x
-        self.target_y = smoothed_y
-        
-        self._smooth_move_to_target()
-    
-    def _calculate_smoothed_position(self):
-        """Calculate smoothed position using weighted average."""
-        if not self.position_history:
-            return self.current_x, self.current_y
-        
-        # Use exponential moving average
-        total_weight = 0
-        weighted_x = 0
-        weighted_y = 0
-        
-        for i, (x, y) in enumerate(self.position_history):
-            weight = (i + 1) ** 1.5
-            weighted_x += x * weight
-            weighted_y += y * weight
-            total_weight += weight
-        
-        if total_weight > 0:
-            return weighted_x / total_weight, weighted_y / total_weight
-        else:
-            return self.current_x, self.current_y
+        return raw_x, raw_y
+
+    def _output_smoothing(self):
+        """Interpolation factor applied after the filter (adaptive filters do their own smoothing)."""
+        factor = self.smoothing_factor if self.smoothing_filter.uses_output_lerp else 1.0
+        return factor * (0.3 if self.is_clicking else 1.0)
     
     def _update_position_stability(self, x: float, y: float):
         """Update position stability detection."""
@@ -172,10 +261,10 @@ class InputController:
     
     def _smooth_move_to_target(self):
         """Smoothly interpolate movement to target position."""
-        if self.is_clicking:
-            smoothing_multiplier = 0.3
-        else:
-            smoothing_multiplier = 1.0
+        capture_time = self.frame_capture_time
+        self.frame_capture_time = None
+
+        factor = self._output_smoothing()
         
         dx = self.target_x - self.current_x
         dy = self.target_y - self.current_y
@@ -184,60 +273,172 @@ class InputController:
         if distance < 2:
             self.current_x = self.target_x
             self.current_y = self.target_y
-            pyautogui.moveTo(int(self.current_x), int(self.current_y))
+            self._move_cursor(self.current_x, self.current_y, capture_time)
             return
         
-        self.current_x += dx * self.smoothing_factor * smoothing_multiplier
-        self.current_y += dy * self.smoothing_factor * smoothing_multiplier
+        self.current_x += dx * factor
+        self.current_y += dy * factor
         
-        pyautogui.moveTo(int(self.current_x), int(self.current_y))
+        self._move_cursor(self.current_x, self.current_y, capture_time)
+
+    def _move_cursor(self, x: float, y: float, capture_time=None):
+        """
+        Move the OS cursor and record dispatch and end-to-end latency.
+
+        `capture_time` is only passed for the first cursor update caused by a frame,
+        so that each frame counts once towards the end-to-end latency.
+        """
+        if self.dispatcher:
+            self.dispatcher.submit_move(int(x), int(y), capture_time)
+            return
+
+        start = time.perf_counter()
+        self.backend.moveTo(int(x), int(y))
+        if self.latency_tracker:
+            end = time.perf_counter()
+            self.latency_tracker.record("input_dispatch", end - start)
+            if capture_time is not None:
+                self.latency_tracker.record("end_to_end", end - capture_time)
+
+    def _dispatch(self, action: str, *args, **kwargs):
+        """Call an OS input backend function by name, either queued or directly (recording how long it blocked)."""
+        if self.dispatcher:
+            self.dispatcher.submit(action, *args, **kwargs)
+            return
+
+        start = time.perf_counter()
+        getattr(self.backend, action)(*args, **kwargs)
+        if self.latency_tracker:
+            self.latency_tracker.record("input_dispatch", time.perf_counter() - start)
+
+    def get_dispatch_stats(self):
+        """返回异步输入分发统计信息（未启用时返回 None）"""
+        if self.dispatcher:
+            return self.dispatcher.get_stats()
+        return None
+
+    def apply_config_changes(self):
+        """
+        Apply config changes made since the last call.
+
+        Called by the thread that drives this controller (the camera loop), so settings
+        never change in the middle of a move_mouse() call.
+        """
+        if self._config_subscription:
+            changes = self._config_subscription.drain()
+            if changes:
+                self.apply_config(changes)
+
+    def apply_config(self, values):
+        """Apply a batch of (already validated) config values; None values are ignored."""
+        values = {key: value for key, value in values.items() if value is not None}
+        if "sensitivity" in values:
+            self.sensitivity = values["sensitivity"]
+        if "smoothing_factor" in values:
+            self.set_smoothing_factor(values["smoothing_factor"])
+        if {"smoothing_filter", "one_euro_beta", "kalman_measurement_noise"} & values.keys():
+            self._apply_smoothing_filter_config()
+        if "max_fps" in values:
+            self.set_max_fps(values["max_fps"])
+        if "click_stability_zone" in values:
+            self.set_click_stability_zone(values["click_stability_zone"])
+        if "quick_scroll_enabled" in values:
+            self.quick_scroll_enabled = values["quick_scroll_enabled"]
+        if "quick_scroll_up_sensitivity" in values:
+            self.quick_scroll_up_sensitivity = values["quick_scroll_up_sensitivity"]
+        if "quick_scroll_down_sensitivity" in values:
+            self.quick_scroll_down_sensitivity = values["quick_scroll_down_sensitivity"]
+        if "quick_scroll_amount" in values:
+            self.quick_scroll_amount = values["quick_scroll_amount"]
+
+    def _apply_smoothing_filter_config(self):
+        name = self.config_manager.get("smoothing_filter")
+        params = {}
+        if name == "one_euro":
+            params["beta"] = float(self.config_manager.get("one_euro_beta"))
+        elif name == "kalman":
+            params["measurement_noise"] = float(self.config_manager.get("kalman_measurement_noise"))
+        self.set_smoothing_filter(name, **params)
+
+    def pause(self):
+        """暂停渲染循环（控制暂停时调用，分发线程保持运行）"""
+        if self.renderer:
+            self.renderer.stop()
+
+    def resume(self):
+        self.reset_position()
+        if self.renderer:
+            self.renderer.start()
+
+    def close(self):
+        """Stop the render loop, flush pending input commands and stop the dispatch worker."""
+        if self._config_subscription:
+            self._config_subscription.close()
+            self._config_subscription = None
+        if self.renderer:
+            self.renderer.stop()
+            self.renderer = None
+        if self.dispatcher:
+            self.dispatcher.close()
+            self.dispatcher = None
 
     def left_click(self):
         """改进的左键点击，带有位置锁定"""
         if not self.is_position_stable():
-            print("Action: Left Click (position not stable, ignored)")
+            self._record_action("click", button="left", ignored=True)
+            logger.debug("Action: Left Click (position not stable, ignored)")
             return
             
-        print("Action: Left Click")
+        self._record_action("click", button="left")
+        logger.debug("Action: Left Click")
         # 锁定当前位置
         self._lock_click_position()
-        pyautogui.click(button='left')
+        self._dispatch('click', button='left')
 
     def right_click(self):
         """改进的右键点击，带有位置锁定"""
         if not self.is_position_stable():
-            print("Action: Right Click (position not stable, ignored)")
+            self._record_action("click", button="right", ignored=True)
+            logger.debug("Action: Right Click (position not stable, ignored)")
             return
             
-        print("Action: Right Click")
+        self._record_action("click", button="right")
+        logger.debug("Action: Right Click")
         # 锁定当前位置
         self._lock_click_position()
-        pyautogui.click(button='right')
+        self._dispatch('click', button='right')
     
     def mouse_down(self, button='left'):
         """按下鼠标按钮（开始按住），带有位置锁定"""
         if not self.is_position_stable():
-            print(f"Action: Mouse Down ({button}) (position not stable, ignored)")
+            self._record_action("mouse_down", button=button, ignored=True)
+            logger.debug("Action: Mouse Down (%s) (position not stable, ignored)", button)
             return
             
-        print(f"Action: Mouse Down ({button})")
+        self._record_action("mouse_down", button=button)
+        logger.debug("Action: Mouse Down (%s)", button)
         # 锁定当前位置
         self._lock_click_position()
-        pyautogui.mouseDown(button=button)
+        self._dispatch('mouseDown', button=button)
     
     def mouse_up(self, button='left'):
         """释放鼠标按钮（结束按住）"""
-        print(f"Action: Mouse Up ({button})")
+        self._record_action("mouse_up", button=button)
+        logger.debug("Action: Mouse Up (%s)", button)
         # 解除位置锁定
         self._unlock_click_position()
-        pyautogui.mouseUp(button=button)
+        self._dispatch('mouseUp', button=button)
     
+    def _record_action(self, action, **fields):
+        if self.telemetry:
+            self.telemetry.record("input", action, **fields)
+
     def _lock_click_position(self):
         """锁定点击位置，防止抖动"""
         if hasattr(self, 'last_stable_position'):
             self.click_lock_position = self.last_stable_position
             self.is_clicking = True
-            self.click_lock_start_time = time.time()
+            self.click_lock_start_time = self.clock()
     
     def _unlock_click_position(self):
         """解除点击位置锁定"""
@@ -255,19 +456,22 @@ class InputController:
             # 使用快速滚动设置
             if direction == "up":
                 scroll_amount = int(self.quick_scroll_amount * self.quick_scroll_up_sensitivity)
-                print(f"Action: Quick Scroll Up (amount: {scroll_amount})")
-                pyautogui.scroll(scroll_amount)
+                self._record_action("quick_scroll", direction=direction, amount=scroll_amount)
+                logger.debug("Action: Quick Scroll Up (amount: %d)", scroll_amount)
+                self._dispatch('scroll', scroll_amount)
             elif direction == "down":
                 scroll_amount = int(self.quick_scroll_amount * self.quick_scroll_down_sensitivity)
-                print(f"Action: Quick Scroll Down (amount: {scroll_amount})")
-                pyautogui.scroll(-scroll_amount)
+                self._record_action("quick_scroll", direction=direction, amount=scroll_amount)
+                logger.debug("Action: Quick Scroll Down (amount: %d)", scroll_amount)
+                self._dispatch('scroll', -scroll_amount)
         else:
             # 使用默认滚动
-            print(f"Action: Scroll {direction} (amount: {self.default_scroll_amount})")
+            self._record_action("scroll", direction=direction, amount=self.default_scroll_amount)
+            logger.debug("Action: Scroll %s (amount: %d)", direction, self.default_scroll_amount)
             if direction == "up":
-                pyautogui.scroll(self.default_scroll_amount)
+                self._dispatch('scroll', self.default_scroll_amount)
             elif direction == "down":
-                pyautogui.scroll(-self.default_scroll_amount)
+                self._dispatch('scroll', -self.default_scroll_amount)
 
     def load_quick_scroll_settings(self):
         """从配置管理器加载快速滚动设置"""
@@ -277,9 +481,9 @@ class InputController:
             self.quick_scroll_up_sensitivity = settings["up_sensitivity"]
             self.quick_scroll_down_sensitivity = settings["down_sensitivity"]
             self.quick_scroll_amount = settings["scroll_amount"]
-            print(f"Loaded quick scroll settings: enabled={self.quick_scroll_enabled}, "
-                  f"up_sens={self.quick_scroll_up_sensitivity}, down_sens={self.quick_scroll_down_sensitivity}, "
-                  f"amount={self.quick_scroll_amount}")
+            logger.info("Loaded quick scroll settings: enabled=%s, up_sens=%s, down_sens=%s, amount=%s",
+                        self.quick_scroll_enabled, self.quick_scroll_up_sensitivity,
+                        self.quick_scroll_down_sensitivity, self.quick_scroll_amount)
 
     def update_quick_scroll_settings(self, enabled=None, up_sensitivity=None, 
                                    down_sensitivity=None, scroll_amount=None):
@@ -302,7 +506,7 @@ class InputController:
                 scroll_amount=scroll_amount
             )
         
-        print(f"Updated quick scroll settings: enabled={self.quick_scroll_enabled}")
+        logger.info("Updated quick scroll settings: enabled=%s", self.quick_scroll_enabled)
 
     def get_quick_scroll_info(self):
         """获取当前快速滚动设置信息"""
@@ -317,9 +521,19 @@ class InputController:
     def set_smoothing_factor(self, factor: float):
         """设置平滑因子 (0.1-1.0，值越小越平滑)"""
         self.smoothing_factor = max(0.1, min(1.0, factor))
+        self.smoothing_filter.set_smoothing_factor(self.smoothing_factor)
+
+    def set_smoothing_filter(self, name: str, **params):
+        """
+        选择平滑滤波器: "weighted_average"、"one_euro" 或 "kalman"
+
+        Extra keyword arguments are passed to the filter (e.g. beta for one_euro,
+        measurement_noise for kalman).
+        """
+        self.smoothing_filter = create_filter(name, self.smoothing_factor, **params)
         
     def set_max_fps(self, fps: int):
-        """设置最大移动帧率"""
+        """设置最大移动帧率（启用渲染循环时即为光标刷新率）"""
         self.min_move_interval = 1.0 / max(30, min(240, fps))
         
     def reset_position(self):
@@ -328,7 +542,12 @@ class InputController:
         self.current_y = self.screen_height // 2
         self.target_x = self.current_x
         self.target_y = self.current_y
-        self.position_history.clear()
+        self.smoothing_filter.reset()
+        with self._sample_lock:
+            self.target_time = None
+            self.target_velocity = (0.0, 0.0)
+            self._sample_capture_time = None
+        self._last_render_time = None
         
         # 重置稳定性状态
         self.stable_position_frames = 0
@@ -341,12 +560,12 @@ class InputController:
         try:
             # 在macOS上，可以尝试使用更直接的鼠标移动方法
             import platform
-            if platform.system() == "Darwin":  # macOS
+            if platform.system() == "Darwin" and hasattr(self.backend, 'MINIMUM_DURATION'):  # macOS
                 # 尝试禁用鼠标加速等系统干预
-                pyautogui.MINIMUM_DURATION = 0
-                pyautogui.MINIMUM_SLEEP = 0
+                self.backend.MINIMUM_DURATION = 0
+                self.backend.MINIMUM_SLEEP = 0
         except Exception as e:
-            print(f"Warning: Could not enable performance mode: {e}")
+            logger.warning("Could not enable performance mode: %s", e)
     
     def set_click_stability_zone(self, zone_size: float):
         """设置点击稳定区域大小"""
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class InputDispatcher:
+    """
+    Executes OS input backend calls on a dedicated worker thread.
+
+    Commands go through a bounded queue so the recognition loop never blocks on a
+    slow X11/Wayland/Win32 round trip. Consecutive cursor moves collapse to the
+    latest target; clicks, button presses and scrolls are always kept in order.
+    When the queue is full the oldest pending move is discarded to make room, and
+    only if there is none is the new command dropped.
+    """
+
+    MOVE = "moveTo"
+
+    def __init__(self, backend, max_queue: int = 32, latency_tracker=None):
+        self.backend = backend
+        self.max_queue = max_queue
+        self.latency_tracker = latency_tracker
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+
+        # Counters
+        self.submitted_events = 0
+        self.dispatched_events = 0
+        self.coalesced_moves = 0
+        self.dropped_events = 0
+        self.failed_events = 0
+
+        self._thread = threading.Thread(target=self._worker, name="InputDispatcher", daemon=True)
+        self._thread.start()
+
+    def submit_move(self, x: int, y: int, capture_time=None):
+        """Queue a cursor move; replaces a move that is still waiting at the end of the queue."""
+        command = (self.MOVE, (x, y), {}, capture_time, time.perf_counter())
+        with self._condition:
+            self.submitted_events += 1
+            if self._queue and self._queue[-1][0] == self.MOVE:
+                pending_capture_time = self._queue[-1][3]
+                if pending_capture_time is not None and (capture_time is None or pending_capture_time < capture_time):
+                    # Keep the oldest frame's timestamp: render ticks carry none, and under load
+                    # the end-to-end sample would otherwise be lost with the replaced move
+                    command = command[:3] + (pending_capture_time,) + command[4:]
+                self._queue[-1] = command
+                self.coalesced_moves += 1
+                return
+            self._enqueue(command)
+
+    def submit(self, action: str, *args, **kwargs):
+        """Queue any other backend call (click, mouseDown, mouseUp, scroll, ...)."""
+        command = (action, args, kwargs, None, time.perf_counter())
+        with self._condition:
+            self.submitted_events += 1
+            self._enqueue(command)
+
+    def _enqueue(self, command):
+        if len(self._queue) >= self.max_queue:
+            for index, queued in enumerate(self._queue):
+                if queued[0] == self.MOVE:
+                    del self._queue[index]
+                    break
+            else:
+                self._count_drop(command[0])
+                return
+            self._count_drop(self.MOVE)
+        self._queue.append(command)
+        self._condition.notify()
+
+    def _count_drop(self, action):
+        self.dropped_events += 1
+        telemetry = self.latency_tracker.telemetry if self.latency_tracker else None
+        if telemetry:
+            telemetry.record("drop", "input", action=action)
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stop_event.is_set())
+                if not self._queue:
+                    return
+                action, args, kwargs, capture_time, queued_at = self._queue.popleft()
+
+            start = time.perf_counter()
+            try:
+                getattr(self.backend, action)(*args, **kwargs)
+            except Exception as e:
+                self.failed_events += 1
+                if self.latency_tracker and self.latency_tracker.telemetry:
+                    self.latency_tracker.telemetry.record("error", "input_backend", action=action, error=str(e))
+                logger.warning("Input backend call %s failed: %s", action, e)
+                continue
+            end = time.perf_counter()
+            self.dispatched_events += 1
+
+            tracker = self.latency_tracker
+            if tracker:
+                tracker.record("input_queue", start - queued_at)
+                tracker.record("input_dispatch", end - start)
+                if capture_time is not None:
+                    tracker.record("end_to_end", end - capture_time)
+
+    def close(self, timeout: float = 1.0):
+        """Execute the commands that are still queued (e.g. a pending mouseUp) and stop the worker."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._thread.join(timeout=timeout)
+
+    def get_stats(self):
+        """返回输入分发统计信息"""
+        with self._condition:
+            pending = len(self._queue)
+        return {
+            "submitted": self.submitted_events,
+            "dispatched": self.dispatched_events,
+            "coalesced_moves": self.coalesced_moves,
+            "dropped": self.dropped_events,
+            "failed": self.failed_events,
+            "pending": pending
+        }
@@ -0,0 +1,158 @@
+"""
+Compact on-disk recordings of hand landmarks and deterministic gesture replay.
+
+A recording is a directory of plain NumPy files, so it can be memory-mapped and
+sliced without loading it into memory:
+
+    landmarks.npy    float32 (N, H, 21, 3)  normalized x, y, z of up to H hands per frame
+    hand_counts.npy  uint8   (N,)           number of valid hands in each frame
+    timestamps.npy   float64 (N,)           seconds since the first recorded frame
+    meta.json        format version, max hands and frame count
+
+Frames without a hand are recorded too (hand count 0) so that replays reproduce
+the exact timing the gesture logic saw live.
+"""
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from recognizers.hand_landmarks import NUM_LANDMARKS, landmarks_to_array
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+class LandmarkRecorder:
+    """Appends per-frame hand landmarks and writes them as a recording on close()."""
+
+    def __init__(self, path, max_hands: int = 1, chunk_size: int = 1024):
+        self.path = path
+        self.max_hands = max_hands
+        self.chunk_size = chunk_size
+        self.start_time = None
+        self.frame_count = 0
+
+        self._chunks = []
+        self._new_chunk()
+
+    def _new_chunk(self):
+        self._landmarks = np.zeros((self.chunk_size, self.max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._hand_counts = np.zeros(self.chunk_size, dtype=np.uint8)
+        self._timestamps = np.zeros(self.chunk_size, dtype=np.float64)
+        self._fill = 0
+
+    def _seal_chunk(self):
+        if self._fill:
+            self._chunks.append((self._landmarks[:self._fill], self._hand_counts[:self._fill],
+                                 self._timestamps[:self._fill]))
+
+    def append(self, timestamp: float, hands):
+        """
+        Record one frame.
+
+        Args:
+            timestamp (float): Time the frame was processed, in seconds.
+            hands: Sequence of (21, 3) arrays or MediaPipe landmark lists (may be empty).
+        """
+        if self.start_time is None:
+            self.start_time = timestamp
+        if self._fill == self.chunk_size:
+            self._seal_chunk()
+            self._new_chunk()
+
+        index = self._fill
+        count = 0
+        for hand in hands[:self.max_hands] if hands is not None and len(hands) else ():
+            if not isinstance(hand, np.ndarray):
+                hand = landmarks_to_array(hand)
+            self._landmarks[index, count] = hand
+            count += 1
+        self._hand_counts[index] = count
+        self._timestamps[index] = timestamp - self.start_time
+        self._fill += 1
+        self.frame_count += 1
+
+    def close(self):
+        """Write the recording to disk. Returns the recording path."""
+        self._seal_chunk()
+        self._new_chunk()
+        if self._chunks:
+            landmarks, hand_counts, timestamps = (np.concatenate(parts) for parts in zip(*self._chunks))
+        else:
+            landmarks = np.zeros((0, self.max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+            hand_counts = np.zeros(0, dtype=np.uint8)
+            timestamps = np.zeros(0, dtype=np.float64)
+        self._chunks = []
+
+        os.makedirs(self.path, exist_ok=True)
+        np.save(os.path.join(self.path, "landmarks.npy"), landmarks)
+        np.save(os.path.join(self.path, "hand_counts.npy"), hand_counts)
+        np.save(os.path.join(self.path, "timestamps.npy"), timestamps)
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump({
+                "format_version": FORMAT_VERSION,
+                "max_hands": self.max_hands,
+                "frames": int(len(timestamps))
+            }, f, indent=4)
+        logger.info("Saved %d landmark frames to %s", len(timestamps), self.path)
+        return self.path
+
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a recording written by LandmarkRecorder."""
+
+    def __init__(self, path, mmap: bool = True):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), 'r') as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported landmark recording version: {self.meta.get('format_version')}")
+
+        mmap_mode = 'r' if mmap else None
+        self.landmarks = np.load(os.path.join(path, "landmarks.npy"), mmap_mode=mmap_mode)
+        self.hand_counts = np.load(os.path.join(path, "hand_counts.npy"), mmap_mode=mmap_mode)
+        self.timestamps = np.load(os.path.join(path, "timestamps.npy"), mmap_mode=mmap_mode)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1]) if len(self) else 0.0
+
+    def __iter__(self):
+        """Yield (timestamp, hands) where hands is a (count, 21, 3) array view."""
+        for index in range(len(self)):
+            yield float(self.timestamps[index]), self.landmarks[index, :self.hand_counts[index]]
+
+
+def replay(recording, recognizer, clock=None, speed: float = 0.0):
+    """
+    Drive the recognizer's gesture handling from a recording, skipping inference.
+
+    Args:
+        recording (LandmarkRecording): The recording to replay.
+        recognizer: A recognizer exposing `handle_landmarks(hands)`.
+        clock: Virtual clock (with a writable `now`) shared by the recognizer and the
+            input controller; it is set to each frame's timestamp before handling it.
+        speed (float): 1.0 replays in real time, 2.0 twice as fast, 0 as fast as possible.
+
+    Returns:
+        int: Number of frames replayed.
+    """
+    started = time.perf_counter()
+    frames = 0
+    for timestamp, hands in recording:
+        if speed > 0:
+            delay = started + timestamp / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if clock is not None:
+            clock.now = timestamp
+        recognizer.handle_landmarks(hands)
+        frames += 1
+    return frames
@@ -0,0 +1,87 @@
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """
+    Rolling per-stage latency histograms for the capture → cursor pipeline.
+
+    Each stage keeps the most recent `window` samples; percentiles are computed
+    on demand from that window, so recording stays O(1) on the hot path.
+    Components that get the tracker also find the application's Telemetry store
+    on it (`telemetry`, None when not collecting); samples are forwarded there.
+    """
+
+    # Pipeline stages in the order a frame passes through them
+    STAGES = (
+        "queue_wait",       # cap.read() returned -> inference thread picked the frame up
+        "color_convert",    # BGR -> RGB conversion
+        "inference",        # hands.process / model forward pass
+        "ipc",              # shared-memory worker round trip, excluding the worker's own processing
+        "gestures",         # gesture handling, including input calls
+        "input_queue",      # time a command waited in the asynchronous input dispatch queue
+        "input_dispatch",   # time spent inside the OS input backend
+        "end_to_end",       # cap.read() returned -> cursor moved by the OS backend
+    )
+
+    def __init__(self, window: int = 300, telemetry=None):
+        self.window = window
+        self.telemetry = telemetry
+        self._lock = threading.Lock()
+        self._samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+
+    def record(self, stage: str, seconds: float):
+        """Record one latency sample (in seconds) for a stage."""
+        if self.telemetry:
+            self.telemetry.record("latency", stage, seconds)
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def reset(self):
+        """清空所有阶段的统计数据"""
+        with self._lock:
+            for samples in self._samples.values():
+                samples.clear()
+
+    def get_stats(self):
+        """
+        Return the rolling statistics of every stage that has samples.
+
+        Returns:
+            dict: {stage: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}
+        """
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items() if samples}
+
+        stats = {}
+        for stage, values in snapshot.items():
+            count = len(values)
+            stats[stage] = {
+                "count": count,
+                "mean_ms": sum(values) / count * 1000,
+                "p50_ms": self._percentile(values, 50) * 1000,
+                "p95_ms": self._percentile(values, 95) * 1000,
+                "p99_ms": self._percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000
+            }
+        return stats
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        """Nearest-rank percentile of an already sorted, non-empty list."""
+        rank = int(round(percent / 100 * (len(sorted_values) - 1)))
+        return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+    def format_stats(self):
+        """Human readable, one line per stage (used by the settings window)."""
+        stats = self.get_stats()
+        lines = []
+        for stage in self.STAGES:
+            if stage in stats:
+                s = stats[stage]
+                lines.append(f"{stage:<15} p50 {s['p50_ms']:6.1f}  p95 {s['p95_ms']:6.1f}  "
+                             f"p99 {s['p99_ms']:6.1f} ms  (n={s['count']})")
+        return "\n".join(lines) if lines else "No samples yet."
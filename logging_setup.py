@@ -0,0 +1,131 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+LOG_FORMAT = "%(levelname)s: %(message)s"
+FILE_LOG_FORMAT = "%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"
+
+_listener = None
+_queue_handler = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let each message through at most `burst` times per `interval` seconds.
+
+    Messages are told apart by logger, level and format string (not the formatted
+    text), so `logger.warning("Failed to grab frame from camera %d.", camera_id)`
+    in a failure loop is printed a few times per interval, and the next one that
+    gets through carries a count of the repeats suppressed in between. Runs in
+    the caller's thread on the QueueHandler, so a suppressed record is dropped
+    before it is formatted or queued.
+    """
+
+    def __init__(self, interval: float = 5.0, burst: int = 5, clock=time.monotonic):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._windows = {}  # (logger, level, msg) -> [window start, records let through, suppressed]
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = self.clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 1024:
+                    # Forget messages whose window has ended
+                    self._windows = {k: w for k, w in self._windows.items()
+                                     if now - w[0] < self.interval or w[2]}
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = window[2]
+                window[2] = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+
+def setup_logging(level="INFO", log_file=None, rate_limit_interval: float = 5.0, rate_limit_burst: int = 5,
+                  stream=None):
+    """
+    Route all log records through a queue to a background writer thread.
+
+    Threads that log (camera, inference, input dispatch) only enqueue the record;
+    formatting and the console / file writes happen on the QueueListener thread,
+    so a slow terminal never stalls the pipeline. Calling it again replaces the
+    previous configuration (e.g. after the log level changed).
+
+    Args:
+        level (str | int): Minimum level, one of LOG_LEVELS or a logging level number.
+        log_file (str): Also append log records to this file (rotated at 1 MB).
+        rate_limit_interval, rate_limit_burst: At most `rate_limit_burst` repeats of the
+            same message per `rate_limit_interval` seconds (interval 0 disables rate limiting).
+        stream: Console stream (default: stdout).
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper()) if level.upper() in LOG_LEVELS else logging.INFO
+
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = [console]
+    file_error = None
+    if log_file:
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=1_000_000, backupCount=3,
+                                                                encoding='utf-8')
+        except OSError as e:
+            file_error = e
+        else:
+            file_handler.setFormatter(logging.Formatter(FILE_LOG_FORMAT))
+            handlers.append(file_handler)
+
+    # Unbounded: enqueueing never blocks, and the rate limit bounds what a failure loop can add
+    records = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    if rate_limit_interval > 0:
+        _queue_handler.addFilter(RateLimitFilter(rate_limit_interval, rate_limit_burst))
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    if file_error:
+        logging.getLogger(__name__).warning("Could not open log file %s: %s", log_file, file_error)
+
+
+def set_log_level(level):
+    """Change the minimum level at runtime."""
+    if isinstance(level, str):
+        if level.upper() not in LOG_LEVELS:
+            return
+        level = logging.getLevelName(level.upper())
+    logging.getLogger().setLevel(level)
+
+
+def shutdown_logging():
+    """Write out the queued records and stop the writer thread (also needed before os._exit)."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
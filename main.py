@@ -1,21 +1,57 @@
-import cv2
+import logging
+import multiprocessing
 import os
+import queue
 import sys
 import threading
-import queue
-from PIL import Image, UnidentifiedImageError
-from pystray import Icon as TrayIcon, Menu, MenuItem
+import time
+
+from startup_profile import StartupProfiler
+
+# --profile-startup prints how long each import stage takes (not in inference worker processes,
+# which re-import this module)
+startup_profiler = StartupProfiler(enabled="--profile-startup" in sys.argv
+                                   and multiprocessing.parent_process() is None)
+
+with startup_profiler.measure("tray (pystray, Pillow)"):
+    from PIL import Image, UnidentifiedImageError
+    from pystray import Icon as TrayIcon, Menu, MenuItem
 
-from config_manager import ConfigManager
-from autostart_manager import AutostartManager
-from input_controller import InputController
-from recognizers.mediapipe_recognizer import MediapipeRecognizer
-from recognizers.gpu_recognizer import GpuRecognizer
-from app_gui import AppGUI
+with startup_profiler.measure("config, autostart, recognizer registry"):
+    from config_manager import ConfigManager, ConfigSubscription
+    from autostart_manager import AutostartManager
+    from latency_tracker import LatencyTracker
+    from logging_setup import set_log_level, setup_logging, shutdown_logging
+    from telemetry import Telemetry
+    import recognizers
+
+logger = logging.getLogger(__name__)
+
+# OpenCV, NumPy, MediaPipe, pyautogui and customtkinter are imported on first use (or by
+# prewarm_modules() in the background), so the tray icon appears without waiting for them
+
+def get_cli_option(name, default=None):
+    """Return the value following `name` on the command line, e.g. `--record-landmarks DIR`."""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
 
 class PalmControlApp:
+    # Settings the camera loop applies itself, without restarting the pipeline
+    CAMERA_CONFIG_KEYS = ("camera_id", "camera_path", "capture_width", "capture_height", "capture_fps",
+                          "capture_fourcc", "capture_buffer_size", "capture_auto_probe", "capture_stall_timeout",
+                          "capture_max_backoff")
+    # Settings that make the camera loop build a new recognizer (those of every registered backend)
+    RECOGNIZER_CONFIG_KEYS = ("recognizer",) + recognizers.recognizer_config_keys()
+
     def __init__(self):
         self.config_manager = ConfigManager()
+        # Console / file output goes through a queue to a writer thread (--log-level overrides log_level)
+        setup_logging(level=get_cli_option("--log-level") or self.config_manager.get("log_level"),
+                      log_file=self.config_manager.get("log_file") or None)
+        self.config_manager.subscribe(lambda changes: set_log_level(changes["log_level"]), ("log_level",))
         self.autostart_manager = AutostartManager()
         self.input_controller = None
         self.recognizer = None
@@ -25,110 +61,454 @@ class PalmControlApp:
         self.is_control_active = False
         self.is_camera_view_visible = False
         self.camera_thread = None
+        self.frame_grabber = None
+
+        # Warm pause: the camera thread parks with the camera and model loaded while paused,
+        # and releases them itself after warm_idle_timeout seconds
+        self._control_condition = threading.Condition()
+        self.is_paused = False
+        self._idle_released = False
+        # The recognizer last switched away from, kept loaded for an instant switch back until
+        # it has been unused for warm_idle_timeout seconds: {recognizer key: (recognizer, unused since)}
+        self.recognizer_pool = {}
+        self.recognizer_key = None
+        # Structured records of frames, stage latencies, gestures and drops, for the metrics
+        # endpoint (metrics_port) and --telemetry-dump FILE
+        self.telemetry = Telemetry(capacity=int(self.config_manager.get("telemetry_buffer_size")))
+        self.telemetry_server = None
+        self.telemetry_dump_path = get_cli_option("--telemetry-dump")
+        self.latency_tracker = LatencyTracker(telemetry=self.telemetry)
+        self.preview_buffer = None  # Created with the first camera frame, see get_preview_buffer()
         self.stop_event = threading.Event()
 
-    def run(self):
-        # Create GUI first, as it initializes tkinter
-        self.gui = AppGUI(self)
+        # Settings window, built on first show when starting silently. Until then the main
+        # thread runs tray requests from this queue instead of the Tk event loop.
+        self._main_thread_calls = queue.Queue()
+        self._main_thread_lock = threading.Lock()
+        self._window_requested = False
+        self.status_text = "Stopped"
+
+        # Optional directory for recording hand landmarks during live use (--record-landmarks DIR)
+        self.landmark_recording_dir = get_cli_option("--record-landmarks")
 
-        # Setup tray icon (but don't run it yet)
+    def run(self):
+        # The tray icon comes first: it only needs pystray and Pillow
         self.setup_tray_icon()
-        
-        # Start tray icon in a separate thread
         tray_thread = threading.Thread(target=self.tray_icon.run, daemon=True)
         tray_thread.start()
+        startup_profiler.mark("tray icon started")
+
+        if self.config_manager.get("prewarm_modules"):
+            threading.Thread(target=self.prewarm_modules, name="Prewarm", daemon=True).start()
+        self.start_telemetry_server()
 
-        # Handle silent start
+        # Handle silent start: the settings window is only built once it is first shown
         if self.config_manager.get("start_silently") and not "--show" in sys.argv:
-            self.gui.withdraw() # Hide the window
-        
+            if not self.run_until_window_requested():
+                return
+        self.create_gui()
+
         # Start the main GUI loop
         self.gui.protocol("WM_DELETE_WINDOW", self.on_close_window)
         self.gui.mainloop()
 
+    def create_gui(self):
+        with startup_profiler.measure("settings window (customtkinter)"):
+            from app_gui import AppGUI
+            gui = AppGUI(self)
+        startup_profiler.mark("settings window created")
+        with self._main_thread_lock:
+            self.gui = gui
+            # Tray requests that arrived while the window was being built
+            while not self._main_thread_calls.empty():
+                call = self._main_thread_calls.get_nowait()
+                if call is not None:
+                    gui.after(0, call)
+        self.update_status(self.status_text)
+        self.update_gui_state()
+
+    def run_until_window_requested(self):
+        """
+        Run tray requests on the main thread until the settings window is first shown.
+
+        Returns:
+            bool: True when the window should be built, False on exit.
+        """
+        while not self._window_requested:
+            call = self._main_thread_calls.get()
+            if call is None:
+                return False
+            call()
+        return True
+
+    def call_on_main_thread(self, func):
+        """Run `func` on the main thread: through Tk once the window exists, through the queue before."""
+        with self._main_thread_lock:
+            if self.gui is not None:
+                self.gui.after(0, func)
+            else:
+                self._main_thread_calls.put(func)
+
+    def prewarm_modules(self):
+        """Import the vision, input and GUI modules in the background so first use is fast."""
+        with startup_profiler.measure("input_controller"):
+            import input_controller
+        with startup_profiler.measure("frame_grabber, preview_buffer (OpenCV, NumPy)"):
+            import frame_grabber
+            import preview_buffer
+        recognizer_name = self.config_manager.get("recognizer")
+        with startup_profiler.measure(f"{recognizer_name} recognizer"):
+            try:
+                recognizers.get_recognizer_class(recognizer_name)
+            except Exception as e:
+                logger.warning("Could not preload the %s recognizer: %s", recognizer_name, e)
+        with startup_profiler.measure("pyautogui"):
+            try:
+                import pyautogui
+            except Exception as e:
+                # Reported again, with context, when control starts
+                logger.warning("Could not preload pyautogui: %s", e)
+        startup_profiler.mark("prewarm finished")
+        startup_profiler.summary()
+
     def setup_tray_icon(self):
         try:
             image = Image.open("icon.png")
+        except FileNotFoundError:
+            logger.warning("icon.png not found. Creating a placeholder icon.")
+            image = Image.new('RGB', (32, 32), color = 'blue')
+            image.save('icon.png')
         except UnidentifiedImageError:
-            print("Warning: icon.png is corrupted or not a valid image. Recreating.")
+            logger.warning("icon.png is corrupted or not a valid image. Recreating.")
             os.remove("icon.png")
             image = Image.new('RGB', (32, 32), color = 'blue')
             image.save('icon.png')
         menu = Menu(
             MenuItem('Start Control', self.toggle_control_from_tray, checked=lambda item: self.is_control_active),
-            MenuItem('Show Settings', self.show_window),
+            MenuItem('Show Settings', lambda: self.call_on_main_thread(self.show_window)),
             Menu.SEPARATOR,
             MenuItem('Exit', self.exit_app)
         )
         self.tray_icon = TrayIcon("PalmControl", image, "PalmControl", menu)
 
     def load_recognizer(self):
+        with startup_profiler.measure("input_controller"):
+            from input_controller import InputController
+        if self.input_controller:
+            self.input_controller.close()
+        # Smoothing, FPS, click stability and quick scroll settings are read from the config
+        self.input_controller = InputController(sensitivity=float(self.config_manager.get("sensitivity")),
+                                                config_manager=self.config_manager,
+                                                latency_tracker=self.latency_tracker,
+                                                async_dispatch=bool(self.config_manager.get("async_input_dispatch")),
+                                                render_loop=bool(self.config_manager.get("cursor_render_loop")))
+
+        self.release_recognizers()
+        self.recognizer = self.create_recognizer()
+
+    def create_recognizer(self):
+        """Build the configured recognizer around the current input controller (or reuse a pooled one)."""
         recognizer_name = self.config_manager.get("recognizer")
-        device = self.config_manager.get("device")
-        sensitivity = float(self.config_manager.get("sensitivity") or 2.0)
-        self.input_controller = InputController(sensitivity=sensitivity, config_manager=self.config_manager)
-        
-        # Configure smoothing and FPS
-        smoothing_factor = float(self.config_manager.get("smoothing_factor") or 0.3)
-        max_fps = int(self.config_manager.get("max_fps") or 120)
-        self.input_controller.set_smoothing_factor(smoothing_factor)
-        self.input_controller.set_max_fps(max_fps)
-        
-        # Configure click stability
-        click_stability_zone = float(self.config_manager.get("click_stability_zone") or 0.02)
-        self.input_controller.set_click_stability_zone(click_stability_zone)
-
-        if self.recognizer:
-            try:
-                self.recognizer.close()
-            except Exception as e:
-                print(f"Warning: Error closing recognizer: {e}")
-            finally:
-                self.recognizer = None
-
-        if recognizer_name == "gpu":
-            self.recognizer = GpuRecognizer(self.input_controller, device=device or "cpu")
-        else:
-            self.recognizer = MediapipeRecognizer(self.input_controller)
-            # Configure hold threshold
-            hold_threshold = float(self.config_manager.get("hold_threshold") or 1.0)
-            self.recognizer.set_hold_threshold(hold_threshold)
-        print(f"INFO: Switched to {recognizer_name} recognizer.")
-
-    def camera_loop(self):
-        camera_id = int(self.config_manager.get("camera_id") or 0)
-        cap = cv2.VideoCapture(camera_id)
-        if not cap.isOpened():
-            print(f"Error: Could not open camera with ID {camera_id}.")
+        self.recognizer_key = self.get_recognizer_key()
+        pooled = self.recognizer_pool.pop(self.recognizer_key, None)
+        if pooled is not None:
+            logger.info("Switched to warm %s recognizer.", recognizer_name)
+            return pooled[0]
+
+        recognizer = recognizers.create_recognizer(recognizer_name, self.input_controller,
+                                                   config_manager=self.config_manager,
+                                                   latency_tracker=self.latency_tracker)
+        if self.landmark_recording_dir and recognizer.supports_landmark_recording:
+            session_name = time.strftime("landmarks-%Y%m%d-%H%M%S")
+            recognizer.start_landmark_recording(os.path.join(self.landmark_recording_dir, session_name))
+        logger.info("Switched to %s recognizer.", recognizer_name)
+        return recognizer
+
+    def get_recognizer_key(self):
+        """The configured backend and its construction-time settings (pooled recognizers must match)."""
+        recognizer_name = self.config_manager.get("recognizer")
+        return (recognizer_name,) + tuple(
+            self.config_manager.get(key) for key in recognizers.recognizer_config_keys(recognizer_name))
+
+    def open_camera(self):
+        """Create and start a FrameGrabber for the configured camera. Returns False if it cannot be opened."""
+        with startup_profiler.measure("frame_grabber (OpenCV)"):
+            from frame_grabber import FrameGrabber
+        camera_id = int(self.config_manager.get("camera_id"))
+        camera_path = self.config_manager.get("camera_path") or ""
+        self.frame_grabber = FrameGrabber(camera_id, profile=self.get_capture_profile(),
+                                          auto_probe=bool(self.config_manager.get("capture_auto_probe")),
+                                          target_fps=float(self.config_manager.get("capture_fps") or 30),
+                                          telemetry=self.telemetry, camera_path=camera_path,
+                                          stall_timeout=float(self.config_manager.get("capture_stall_timeout")),
+                                          max_backoff=float(self.config_manager.get("capture_max_backoff")))
+        if not self.frame_grabber.start():
+            logger.error("Could not open camera %s.", camera_path or f"with ID {camera_id}")
             self.update_status("Error: Camera not found")
             self.is_control_active = False
             self.update_gui_state()
-            return
+            return False
+        return True
+
+    def apply_pipeline_changes(self, changes):
+        """
+        Apply camera / recognizer / preview changes on the camera thread.
+
+        The recognizer is swapped in place and the camera reopened without touching
+        the rest of the pipeline. Returns False if the new camera could not be opened.
+        """
+        if "preview_fps" in changes and self.preview_buffer:
+            self.preview_buffer.set_fps(changes["preview_fps"])
+
+        # Settings of other backends do not affect the running one
+        if set(self.RECOGNIZER_CONFIG_KEYS) & changes.keys() and self.get_recognizer_key() != self.recognizer_key:
+            old_key = self.recognizer_key
+            try:
+                new_recognizer = self.create_recognizer()
+            except Exception as e:
+                logger.error("Error switching recognizer: %s", e)
+                self.recognizer_key = old_key
+            else:
+                # Keep the previous recognizer loaded in case the user switches back; only that
+                # one, since each holds a model (or worker processes)
+                old_recognizer, self.recognizer = self.recognizer, new_recognizer
+                old_recognizer.pause()
+                self.close_recognizers(self.take_pooled_recognizers())
+                self.recognizer_pool[old_key] = (old_recognizer, time.monotonic())
+
+        if set(self.CAMERA_CONFIG_KEYS) & changes.keys():
+            self.frame_grabber.stop()
+            self.get_preview_buffer().clear()
+            if not self.open_camera():
+                return False
+            self.input_controller.reset_position()
+        return True
 
-        while not self.stop_event.is_set():
-            ret, frame = cap.read()
-            if not ret:
-                print("Warning: Failed to grab frame.")
-                time.sleep(0.1)
-                continue
+    def camera_loop(self):
+        """Inference stage: always processes the freshest frame from the capture thread."""
+        subscription = ConfigSubscription(self.config_manager,
+                                          self.CAMERA_CONFIG_KEYS + self.RECOGNIZER_CONFIG_KEYS + ("preview_fps",))
+        try:
+            if not self.open_camera():
+                return
+
+            last_seq = 0
+            camera_state = "ok"
+            while not self.stop_event.is_set():
+                if self.is_paused:
+                    if not self.wait_while_paused():
+                        break
+                    continue
+
+                changes = subscription.drain()
+                if changes:
+                    if not self.apply_pipeline_changes(changes):
+                        return
+                    if set(self.CAMERA_CONFIG_KEYS) & changes.keys():
+                        last_seq = 0  # The new grabber numbers its frames from 1 again
+                if self.recognizer_pool:
+                    self.release_idle_recognizers()
+                if not self.recognizer.drives_input_controller:
+                    self.input_controller.apply_config_changes()
+
+                latest = self.frame_grabber.read_latest(last_seq, timeout=0.5)
+                if latest is None:
+                    camera_state = self.report_camera_health(camera_state)
+                    continue
+                if camera_state != "ok":
+                    camera_state = self.report_camera_health(camera_state)
+                last_seq, capture_time, frame = latest
 
+                try:
+                    self.recognizer.process_frame(frame, capture_time=capture_time)
+                    # Downscaled once here, at preview_fps, into a reused buffer
+                    if self.is_camera_view_visible and self.gui:
+                        preview = self.get_preview_buffer()
+                        if preview.due():
+                            preview.submit(frame)
+                except Exception as e:
+                    self.telemetry.record("error", "frame_processing", error=str(e))
+                    logger.error("Error during frame processing: %s", e)
+
+            self.frame_grabber.stop()
+            if self._idle_released:
+                self.release_recognizers()
+                self.input_controller.close()
+                self.update_status("Stopped")
+            logger.info("Camera loop stopped.")
+        finally:
+            subscription.close()
+
+    def report_camera_health(self, reported_state):
+        """Show a lost or recovered camera in the status line. Returns the state now shown."""
+        health = self.frame_grabber.get_health()
+        state = health["state"]
+        if state == reported_state:
+            return state
+        status = {"ok": "Running", "reconnecting": "Camera lost, reconnecting...",
+                  "stalled": "Camera not responding"}.get(state)
+        if status:
+            # Runs on the camera thread; Tk widgets are only touched from the main thread
+            self.call_on_main_thread(lambda: self.update_status(status))
+        return state
+
+    def wait_while_paused(self):
+        """
+        Park the pipeline while control is paused, keeping the camera open and the model loaded.
+
+        Returns:
+            bool: True when control is resumed; False when the loop should exit, either
+            because control was stopped or because it stayed paused for warm_idle_timeout.
+        """
+        self.frame_grabber.pause()
+        self.recognizer.pause()
+        self.input_controller.pause()
+
+        timeout = float(self.config_manager.get("warm_idle_timeout"))
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._control_condition:
+                # Wake up early to close a pooled recognizer that times out during the pause
+                wake_up = min([deadline] + [since + timeout for _, since in self.recognizer_pool.values()])
+                self._control_condition.wait_for(lambda: not self.is_paused or self.stop_event.is_set(),
+                                                 max(0.0, wake_up - time.monotonic()))
+                if self.stop_event.is_set():
+                    return False
+                if not self.is_paused:
+                    break
+                if time.monotonic() >= deadline:
+                    logger.info("Paused for %g s, releasing camera and recognizer.", timeout)
+                    self._idle_released = True
+                    return False
+            self.release_idle_recognizers(timeout)
+
+        self.input_controller.resume()
+        self.frame_grabber.resume()
+        return True
+
+    def release_recognizers(self):
+        """Close the active recognizer and every pooled one."""
+        recognizers = self.take_pooled_recognizers()
+        if self.recognizer:
+            recognizers.append(self.recognizer)
+            self.recognizer = None
+        self.close_recognizers(recognizers)
+
+    def release_idle_recognizers(self, timeout=None):
+        """Close pooled recognizers that have not been used for `timeout` (default: warm_idle_timeout) seconds."""
+        if timeout is None:
+            timeout = float(self.config_manager.get("warm_idle_timeout"))
+        now = time.monotonic()
+        expired = [key for key, (_, since) in self.recognizer_pool.items() if now - since >= timeout]
+        if expired:
+            logger.info("Releasing %d recognizer(s) unused for %g s.", len(expired), timeout)
+            self.close_recognizers([self.recognizer_pool.pop(key)[0] for key in expired])
+
+    def take_pooled_recognizers(self):
+        """Empty the pool and return the recognizers it held."""
+        recognizers = [recognizer for recognizer, _ in self.recognizer_pool.values()]
+        self.recognizer_pool.clear()
+        return recognizers
+
+    @staticmethod
+    def close_recognizers(recognizers):
+        for recognizer in recognizers:
+            # Releases any held mouse button and saves an active landmark recording
             try:
-                self.recognizer.process_frame(frame)
-                if self.is_camera_view_visible and self.gui:
-                    # Reduce frame size for performance
-                    small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-                    if not self.gui.frame_queue.full():
-                        self.gui.frame_queue.put(small_frame)
+                recognizer.close()
             except Exception as e:
-                print(f"Error during frame processing: {e}")
+                logger.warning("Error closing recognizer: %s", e)
+
+    def get_preview_buffer(self):
+        """The settings-window preview buffer, created on first use (it needs OpenCV)."""
+        if self.preview_buffer is None:
+            from preview_buffer import PreviewBuffer
+            self.preview_buffer = PreviewBuffer(fps=float(self.config_manager.get("preview_fps") or 15))
+        return self.preview_buffer
+
+    def get_capture_profile(self):
+        """Requested capture mode from config.json (0 / empty keeps the driver default)."""
+        return {
+            "width": int(self.config_manager.get("capture_width") or 0),
+            "height": int(self.config_manager.get("capture_height") or 0),
+            "fps": float(self.config_manager.get("capture_fps") or 0),
+            "fourcc": self.config_manager.get("capture_fourcc") or "",
+            "buffer_size": int(self.config_manager.get("capture_buffer_size") or 0)
+        }
+
+    def get_capture_stats(self):
+        """返回摄像头采集统计信息（帧数、丢帧数、读取失败数）"""
+        if self.frame_grabber:
+            return self.frame_grabber.get_stats()
+        return None
+
+    def get_performance_stats(self):
+        """
+        Return pipeline performance: capture counters, recognizer throughput and
+        rolling p50/p95/p99 latency per stage (capture → cursor move).
+        """
+        stats = {
+            "capture": self.get_capture_stats(),
+            "latency": self.latency_tracker.get_stats()
+        }
+        recognizer = self.recognizer
+        if recognizer and hasattr(recognizer, 'get_performance_stats'):
+            stats["recognizer"] = recognizer.get_performance_stats()
+        if self.input_controller:
+            stats["input"] = self.input_controller.get_dispatch_stats()
+        return stats
 
-        cap.release()
-        print("Camera loop stopped.")
+    def start_telemetry_server(self):
+        """Serve /metrics, /records and /stats on metrics_host:metrics_port (0 = disabled)."""
+        port = int(self.config_manager.get("metrics_port") or 0)
+        if not port:
+            return
+        from telemetry import TelemetryServer
+        host = self.config_manager.get("metrics_host") or "127.0.0.1"
+        try:
+            self.telemetry_server = TelemetryServer(self.telemetry, host=host, port=port,
+                                                    gauges=self.get_metric_gauges,
+                                                    stats=self.get_performance_stats).start()
+        except OSError as e:
+            logger.warning("Could not serve metrics on %s:%d: %s", host, port, e)
+
+    def get_metric_gauges(self):
+        """Current pipeline counters and rates for the metrics endpoint."""
+        stats = self.get_performance_stats()
+        capture = stats.get("capture") or {}
+        recognizer = stats.get("recognizer") or {}
+        tracking = recognizer.get("tracking") or {}
+        input_stats = stats.get("input") or {}
+        health = capture.get("health") or {}
+        return {
+            "palmcontrol_control_active": ("1 while control is running (not paused).",
+                                           int(self.is_control_active and not self.is_paused)),
+            "palmcontrol_camera_up": ("1 while the camera delivers frames, 0 while it is stalled or reconnecting.",
+                                      int(health["state"] == "ok") if health else None),
+            "palmcontrol_camera_reconnects": ("Times the camera was reopened after a failure.",
+                                              health.get("reconnects")),
+            "palmcontrol_camera_last_frame_age_seconds": ("Seconds since the last frame was captured.",
+                                                          health.get("last_frame_age_s")),
+            "palmcontrol_frames_captured": ("Frames read from the camera since it was opened.",
+                                            capture.get("frames_captured")),
+            "palmcontrol_frames_dropped": ("Captured frames replaced before the recognizer picked them up.",
+                                           capture.get("frames_dropped")),
+            "palmcontrol_camera_read_failures": ("Failed camera reads since the camera was opened.",
+                                                 capture.get("read_failures")),
+            "palmcontrol_processed_fps": ("Frames per second that ran hand detection.",
+                                          recognizer.get("processed_fps")),
+            "palmcontrol_detector_calls_per_second": ("Full hand detector runs per second.",
+                                                      tracking.get("detector_calls_per_s")),
+            "palmcontrol_input_dropped": ("Input commands dropped by the dispatch queue.",
+                                          input_stats.get("dropped"))
+        }
 
     def toggle_control(self):
         self.is_control_active = not self.is_control_active
         if self.is_control_active:
             self.start_control()
+        elif float(self.config_manager.get("warm_idle_timeout")) > 0:
+            self.pause_control()
         else:
             self.stop_control()
         self.update_gui_state()
@@ -136,27 +516,64 @@ class PalmControlApp:
     def toggle_control_from_tray(self):
         # This function is called from the tray, which runs in a different thread.
         # It's safer to schedule the GUI update on the main thread.
-        self.gui.after(0, self.toggle_control)
+        self.call_on_main_thread(self.toggle_control)
 
     def start_control(self):
-        if self.camera_thread and self.camera_thread.is_alive():
+        with self._control_condition:
+            if self.camera_thread and self.camera_thread.is_alive() and not self._idle_released:
+                # Resume a warm pipeline: the next camera frame is processed right away
+                if self.is_paused:
+                    self.is_paused = False
+                    self._control_condition.notify_all()
+                    self.update_status("Running")
+                    logger.info("Control resumed.")
+                return
+            self.is_paused = False
+        if self.camera_thread:
+            # The camera thread is finishing an idle release
+            self.camera_thread.join(timeout=2)
+        self._idle_released = False
+
+        try:
+            self.load_recognizer()
+        except Exception as e:
+            # e.g. missing ONNX model files or onnxruntime not installed
+            logger.error("Could not load recognizer: %s", e)
+            self.is_control_active = False
+            self.update_status("Error: Recognizer failed")
+            self.update_gui_state()
             return
-        
-        self.load_recognizer()
+        self.latency_tracker.reset()
         self.stop_event.clear()
         self.camera_thread = threading.Thread(target=self.camera_loop, daemon=True)
         self.camera_thread.start()
         self.update_status("Running")
-        print("Control started.")
+        logger.info("Control started.")
+
+    def pause_control(self):
+        """Pause control but keep the camera and model warm, so resuming is instant."""
+        with self._control_condition:
+            self.is_paused = True
+            self._control_condition.notify_all()
+        self.update_status("Paused")
+        logger.info("Control paused.")
 
     def stop_control(self):
-        self.stop_event.set()
+        with self._control_condition:
+            self.stop_event.set()
+            self.is_paused = False
+            self._control_condition.notify_all()
         if self.camera_thread:
             self.camera_thread.join(timeout=2) # Wait for thread to finish
         self.camera_thread = None
+        self.release_recognizers()
+        if self.input_controller:
+            self.input_controller.close()
         self.update_status("Stopped")
-        print("Control stopped.")
+        logger.info("Control stopped.")
         # Clear the video feed when stopping
+        if self.preview_buffer:
+            self.preview_buffer.clear()
         if self.gui and self.is_camera_view_visible:
             self.gui.video_label.config(image='', text="Camera feed stopped.")
             self.gui.current_photo = None
@@ -167,10 +584,13 @@ class PalmControlApp:
             self.gui.toggle_video_visibility(self.is_camera_view_visible)
             if not self.is_camera_view_visible:
                  # Clear the video feed when hiding
+                if self.preview_buffer:
+                    self.preview_buffer.clear()
                 self.gui.video_label.config(image='', text="Camera feed hidden.")
                 self.gui.current_photo = None
 
     def update_status(self, status_text):
+        self.status_text = status_text
         if self.gui:
             self.gui.status_label.configure(text=f"Status: {status_text}")
 
@@ -184,195 +604,57 @@ class PalmControlApp:
         if self.tray_icon:
             self.tray_icon.update_menu()
 
+    # --- Settings Methods ---
+    def set_autostart(self, enable):
+        if enable:
+            self.autostart_manager.enable()
+        else:
+            self.autostart_manager.disable()
+        self.config_manager.set("autostart", enable)
+        logger.info("Autostart set to %s", enable)
+
+    # --- Window and App Lifecycle ---
     def show_window(self):
-        if self.gui:
-            self.gui.deiconify()
-            self.gui.lift()
-            self.gui.focus_force()
+        if self.gui is None:
+            # Silent start: run() builds the window on the main thread
+            self._window_requested = True
+            return
+        self.gui.deiconify()
+        self.gui.lift()
+        self.gui.focus_force()
 
     def on_close_window(self):
         # Instead of closing, hide the window to the tray
         self.gui.withdraw()
 
     def exit_app(self):
-        print("Exiting application...")
+        logger.info("Exiting application...")
         self.stop_control()
+        if self.telemetry_dump_path:
+            try:
+                count = self.telemetry.dump_jsonl(self.telemetry_dump_path)
+                logger.info("Wrote %d telemetry records to %s", count, self.telemetry_dump_path)
+            except OSError as e:
+                logger.warning("Could not write telemetry to %s: %s", self.telemetry_dump_path, e)
+        if self.telemetry_server:
+            self.telemetry_server.stop()
         if self.tray_icon:
             self.tray_icon.stop()
         if self.gui:
             self.gui.quit()
             self.gui.destroy()
+        # os._exit skips atexit handlers, so write pending settings and queued log records explicitly
+        self.config_manager.flush()
+        shutdown_logging()
         # A more forceful exit might be needed if threads are stuck
         os._exit(0)
 
 if __name__ == "__main__":
+    # Needed for inference worker processes in a frozen executable
+    multiprocessing.freeze_support()
     # This allows the app to find its files when run from an executable
     if getattr(sys, 'frozen', False):
         os.chdir(sys._MEIPASS)
         
     app = PalmControlApp()
     app.run()
-
-    def camera_loop(self):
-        camera_id = int(self.config_manager.get("camera_id") or 0)
-        cap = cv2.VideoCapture(camera_id)
-        if not cap.isOpened():
-            print("Error: Cannot open camera.")
-            if hasattr(self, 'gui') and self.gui is not None:
-                self.gui.status_label.configure(text="Error: Camera not found.")
-            return
-
-        while not self.stop_event.is_set():
-            ret, frame = cap.read()
-            if not ret:
-                print("Warning: Could not read frame from camera. Skipping.")
-                continue
-            
-            # Make a copy of the original frame for video display
-            display_frame = frame.copy()
-            
-            if self.is_control_active:
-                # Process frame for gesture recognition but don't modify display_frame
-                self.recognizer.process_frame(frame)
-
-            if self.is_camera_view_visible:
-                try:
-                    # Only put the original frame in the queue for display
-                    self.gui.frame_queue.put_nowait(display_frame)
-                except queue.Full:
-                    # If the queue is full, just skip this frame
-                    pass
-            
-        cap.release()
-        print("INFO: Camera thread stopped.")
-
-    # --- Control Methods ---
-    def toggle_control(self):
-        self.is_control_active = not self.is_control_active
-        if self.is_control_active:
-            self.start_control_sequence()
-        else:
-            self.stop_control_sequence()
-
-    def toggle_control_from_tray(self):
-        # This runs in the tray thread, so we schedule the GUI update
-        self.gui.after(0, self.toggle_control)
-
-    def start_control_sequence(self):
-        self.load_recognizer()
-        self.stop_event.clear()
-        self.camera_thread = threading.Thread(target=self.camera_loop, daemon=True)
-        self.camera_thread.start()
-        
-        # 只有在GUI存在时才更新GUI状态
-        if hasattr(self, 'gui') and self.gui is not None:
-            self.gui.status_label.configure(text="Status: Running", text_color="#2ECC71")
-            self.gui.toggle_button.configure(text="Stop Control")
-        
-        print("INFO: Control started.")
-
-    def stop_control_sequence(self):
-        self.stop_event.set()
-        if self.camera_thread:
-            self.camera_thread.join(timeout=1)
-        if self.recognizer:
-            try:
-                self.recognizer.close()
-            except Exception as e:
-                print(f"Warning: Error closing recognizer during stop: {e}")
-            finally:
-                self.recognizer = None
-        
-        # 只有在GUI存在时才更新GUI状态
-        if hasattr(self, 'gui') and self.gui is not None:
-            self.gui.status_label.configure(text="Status: Stopped", text_color="#E74C3C")
-            self.gui.toggle_button.configure(text="Start Control")
-        
-        print("INFO: Control stopped.")
-
-    def toggle_camera_view(self):
-        self.is_camera_view_visible = not self.is_camera_view_visible
-        self.gui.toggle_video_visibility(self.is_camera_view_visible)
-
-    # --- Settings Methods ---
-    def set_autostart(self, enable):
-        if enable:
-            self.autostart_manager.enable()
-        else:
-            self.autostart_manager.disable()
-        self.config_manager.set("autostart", enable)
-        print(f"INFO: Autostart set to {enable}")
-
-    def set_sensitivity(self, value):
-        self.config_manager.set("sensitivity", value)
-        if self.input_controller:
-            self.input_controller.sensitivity = value
-
-    def set_recognizer(self, choice):
-        self.config_manager.set("recognizer", choice)
-        if self.is_control_active: # Reload if running
-            try:
-                self.stop_control_sequence()
-                self.start_control_sequence()
-            except Exception as e:
-                print(f"Error switching recognizer: {e}")
-                # 确保状态一致
-                self.is_control_active = False
-                if hasattr(self, 'gui') and self.gui:
-                    self.gui.status_label.configure(text="Status: Error", text_color="#E74C3C")
-                    self.gui.toggle_button.configure(text="Start Control")
-
-    def set_camera(self, cam_id):
-        self.config_manager.set("camera_id", cam_id)
-        if self.is_control_active: # Restart to use new camera
-            self.stop_control_sequence()
-            self.start_control_sequence()
-
-    def set_smoothing_factor(self, value):
-        """设置平滑因子"""
-        self.config_manager.set("smoothing_factor", value)
-        if self.input_controller:
-            self.input_controller.set_smoothing_factor(value)
-
-    def set_max_fps(self, value):
-        """设置最大FPS"""
-        self.config_manager.set("max_fps", value)
-        if self.input_controller:
-            self.input_controller.set_max_fps(value)
-
-    # --- Window and App Lifecycle ---
-    def show_window(self):
-        self.gui.after(0, self.gui.deiconify) # Bring window to front
-
-    def on_close_window(self):
-        # Instead of closing, hide the window
-        self.gui.withdraw()
-
-    def exit_app(self):
-        print("INFO: Exiting application...")
-        try:
-            self.stop_control_sequence()
-        except Exception as e:
-            print(f"Warning: Error during stop sequence: {e}")
-        
-        try:
-            if self.tray_icon:
-                self.tray_icon.stop()
-        except Exception as e:
-            print(f"Warning: Error stopping tray icon: {e}")
-        
-        try:
-            self.gui.quit()
-        except Exception as e:
-            print(f"Warning: Error quitting GUI: {e}")
-
-if __name__ == "__main__":
-    # A simple check for an icon file
-    if not os.path.exists("icon.png"):
-        print("Warning: icon.png not found. Please create a 32x32 PNG for the tray icon.")
-        # Create a placeholder icon
-        img = Image.new('RGB', (32, 32), color = 'blue')
-        img.save('icon.png')
-
-    app = PalmControlApp()
-    app.run()
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class PreviewBuffer:
+    """
+    Hands downscaled camera frames from the camera thread to the settings window.
+
+    The producer downsamples once, straight into preallocated buffers
+    (`cv2.resize` / `cv2.cvtColor` with `dst=`), and only when a preview frame is
+    due at `fps`. The GUI thread pastes the latest buffer into a persistent
+    `ImageTk.PhotoImage`, so no per-frame image objects, encodings or copies are
+    created on either side.
+    """
+
+    def __init__(self, max_size=(560, 300), fps: float = 15):
+        self.max_width, self.max_height = max_size
+        self.set_fps(fps)
+
+        self._lock = threading.Lock()
+        self._source_shape = None
+        self._size = None        # (width, height) of the preview
+        self._scaled = None      # BGR resize target
+        self._back = None        # RGB buffer the producer writes into
+        self._front = None       # RGB buffer the consumer reads from
+        self._has_frame = False
+        self._seq = 0
+        self._next_due = 0.0
+
+    def set_fps(self, fps: float):
+        """设置预览帧率 (1-30 FPS)"""
+        self.fps = max(1.0, min(30.0, float(fps)))
+        self.interval = 1.0 / self.fps
+
+    def due(self) -> bool:
+        """True if the next preview frame should be produced now (call before submit())."""
+        return time.perf_counter() >= self._next_due
+
+    def submit(self, frame):
+        """Downscale a BGR frame into the back buffer and publish it."""
+        self._next_due = time.perf_counter() + self.interval
+        if frame.shape != self._source_shape:
+            self._allocate(frame.shape)
+
+        cv2.resize(frame, self._size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._scaled, cv2.COLOR_BGR2RGB, dst=self._back)
+        with self._lock:
+            self._front, self._back = self._back, self._front
+            self._has_frame = True
+            self._seq += 1
+
+    def _allocate(self, shape):
+        height, width = shape[:2]
+        scale = min(self.max_width / width, self.max_height / height, 1.0)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        with self._lock:
+            self._source_shape = shape
+            self._size = size
+            self._scaled = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._back = np.empty_like(self._scaled)
+            self._front = np.empty_like(self._scaled)
+            self._has_frame = False
+
+    def read_into(self, last_seq: int, consumer):
+        """
+        Call `consumer(rgb_array)` with the latest preview if it is newer than `last_seq`.
+
+        The buffer is only valid during the call (the producer reuses it afterwards),
+        so the consumer must copy it out, e.g. with `PhotoImage.paste()`.
+
+        Returns:
+            int: The sequence number of the frame that was passed to the consumer, or
+            `last_seq` if there was nothing new.
+        """
+        with self._lock:
+            if self._seq == last_seq or not self._has_frame:
+                return last_seq
+            consumer(self._front)
+            return self._seq
+
+    def clear(self):
+        """Drop the current preview so a stale frame is not shown after a restart."""
+        with self._lock:
+            self._has_frame = False
+            self._seq += 1
+        self._next_due = 0.0
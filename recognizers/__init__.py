@@ -0,0 +1,61 @@
+"""
+Recognizer backends, looked up by name.
+
+Backends are registered as "module:Class" paths and only imported when they are
+selected, so MediaPipe or ONNX Runtime are never loaded for a backend that is not
+in use. A new backend subclasses `recognizers.base.Recognizer` and registers itself
+here (or from a plugin module with `register_recognizer()`).
+"""
+import importlib
+
+# name -> (class path, config keys that need a new recognizer instance when changed)
+RECOGNIZERS = {}
+
+
+def register_recognizer(name, class_path, config_keys=()):
+    """
+    Register a recognizer backend.
+
+    Args:
+        name (str): Value of the "recognizer" setting that selects it.
+        class_path (str): "package.module:ClassName" of a `Recognizer` subclass.
+        config_keys (tuple): Settings read at construction time; changing one makes the
+            application build a new instance instead of updating the running one.
+    """
+    RECOGNIZERS[name] = (class_path, tuple(config_keys))
+
+
+def recognizer_names():
+    return tuple(RECOGNIZERS)
+
+
+def recognizer_config_keys(name=None):
+    """Construction-time config keys of one backend, or of all backends if `name` is None."""
+    names = [name] if name is not None else RECOGNIZERS
+    keys = []
+    for backend in names:
+        for key in RECOGNIZERS[backend][1]:
+            if key not in keys:
+                keys.append(key)
+    return tuple(keys)
+
+
+def get_recognizer_class(name):
+    """Import and return the class registered as `name`."""
+    if name not in RECOGNIZERS:
+        raise ValueError(f"Unknown recognizer '{name}' (available: {', '.join(RECOGNIZERS)})")
+    module_name, class_name = RECOGNIZERS[name][0].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_recognizer(name, input_controller, config_manager=None, latency_tracker=None, **options):
+    """Build the backend registered as `name`, see `Recognizer.from_config()`."""
+    recognizer_class = get_recognizer_class(name)
+    return recognizer_class.from_config(input_controller, config_manager=config_manager,
+                                        latency_tracker=latency_tracker, **options)
+
+
+register_recognizer("mediapipe", "recognizers.mediapipe_recognizer:MediapipeRecognizer",
+                    ("inference_workers", "max_num_hands"))
+register_recognizer("gpu", "recognizers.gpu_recognizer:GpuRecognizer",
+                    ("device", "onnx_palm_model", "onnx_landmark_model", "onnx_threads", "max_num_hands"))
@@ -0,0 +1,252 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+from config_manager import ConfigSubscription
+from frame_governor import FrameGovernor
+from gesture_engine import CURSOR_HANDS, HAND_ROLES, MOVE, GestureEngine, apply_gesture_events
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionResult:
+    """
+    What a recognizer did with one camera frame.
+
+    Attributes:
+        frame: The BGR frame, with landmarks drawn on it if it was processed.
+        hands (list): (21, 3) normalized landmark arrays detected in the frame.
+        gestures (list): GestureEvents emitted for the frame (see gesture_engine).
+        processed (bool): False if the frame was skipped, or handed to another thread
+            or process whose results arrive later (see `drives_input_controller`).
+    """
+
+    __slots__ = ("frame", "hands", "gestures", "processed")
+
+    def __init__(self, frame, hands=(), gestures=(), processed=False):
+        self.frame = frame
+        self.hands = list(hands)
+        self.gestures = list(gestures)
+        self.processed = processed
+
+
+class Recognizer(ABC):
+    """
+    Interface of a recognizer backend (see `recognizers.register_recognizer`).
+
+    Capability flags tell the application what a backend can do without
+    checking its type.
+    """
+
+    # Gesture handling, and therefore the InputController, runs on the recognizer's own
+    # thread, so that thread (not the camera loop) applies InputController config changes
+    drives_input_controller = False
+    # start_landmark_recording() / stop_landmark_recording() are available
+    supports_landmark_recording = False
+    # Honours the "roi_tracking" / "roi_padding" settings
+    supports_roi_tracking = False
+    # Honours the "device" setting
+    supports_devices = False
+
+    @classmethod
+    def from_config(cls, input_controller, config_manager=None, latency_tracker=None, clock=time.time, **options):
+        """
+        Build the recognizer from the application config.
+
+        Args:
+            options: Backend-specific overrides of config values (e.g. `device`).
+        """
+        return cls(input_controller, latency_tracker=latency_tracker, clock=clock,
+                   config_manager=config_manager, **options)
+
+    @abstractmethod
+    def process_frame(self, frame, capture_time=None) -> RecognitionResult:
+        """
+        Run recognition on a BGR frame and drive the input controller.
+
+        Args:
+            capture_time (float): `time.perf_counter()` timestamp of when the frame
+                was captured; used for latency instrumentation.
+        """
+
+    @abstractmethod
+    def get_performance_stats(self):
+        """返回性能统计信息（处理帧率、跳帧数、各阶段延迟等）"""
+
+    @abstractmethod
+    def close(self):
+        """Release the model and any threads or processes."""
+
+    def pause(self):
+        """Control was paused: release held buttons and reset gesture state, keep the model loaded."""
+
+    def start_landmark_recording(self, path):
+        raise NotImplementedError(f"{type(self).__name__} does not support landmark recording")
+
+    def stop_landmark_recording(self):
+        pass
+
+
+class LandmarkRecognizer(Recognizer):
+    """
+    Base for backends that detect (21, 3) hand landmarks and leave gestures to the GestureEngine.
+
+    Provides the shared parts: gesture handling, the adaptive frame-rate governor,
+    config subscription, landmark recording and throughput stats. A subclass only
+    detects hands and calls `record_landmarks()` / `handle_landmarks()` with them.
+    """
+
+    supports_landmark_recording = True
+
+    # Config keys applied by apply_config_changes()
+    CONFIG_KEYS = ("hold_threshold", "hand_roles", "cursor_hand", "adaptive_frame_rate", "inference_max_fps",
+                   "idle_fps", "idle_after", "idle_scale", "inference_cpu_budget")
+
+    def __init__(self, input_controller, latency_tracker=None, clock=time.time, config_manager=None,
+                 max_num_hands=None):
+        """
+        Args:
+            clock: Time source for frame pacing and gesture timing (virtual clock during replays).
+            config_manager: If given, the settings in CONFIG_KEYS are read from it and
+                changes are applied by apply_config_changes() on the inference thread.
+            max_num_hands (int): Hands detected and tracked at once; defaults to the
+                "max_num_hands" setting, or 1.
+        """
+        if max_num_hands is None:
+            max_num_hands = config_manager.get("max_num_hands") if config_manager else None
+        self.max_num_hands = max(1, min(4, int(max_num_hands or 1)))
+        self.input_controller = input_controller
+        self.latency_tracker = latency_tracker
+        self.telemetry = latency_tracker.telemetry if latency_tracker else None
+        self.clock = clock
+        self.gesture_engine = GestureEngine(max_hands=self.max_num_hands)
+        # Picks which frames get inference
+        self.governor = FrameGovernor()
+        self.landmark_recorder = None
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.process_times = deque(maxlen=60)
+
+        self.config_manager = config_manager
+        self._config_subscription = None
+        if config_manager:
+            self.apply_config({key: config_manager.get(key) for key in self.CONFIG_KEYS})
+            self._config_subscription = ConfigSubscription(config_manager, self.CONFIG_KEYS)
+
+    def handle_landmarks(self, hands, timestamp=None):
+        """
+        Run the gesture engine on already-detected hands and perform the resulting input.
+
+        Args:
+            hands: Sequence of (21, 3) normalized landmark arrays, e.g. from a LandmarkRecording.
+            timestamp (float): Frame time; defaults to `clock()`.
+
+        Returns:
+            list: The GestureEvents that were applied.
+        """
+        start = time.perf_counter()
+        events = self.gesture_engine.process(self.clock() if timestamp is None else timestamp, hands)
+        apply_gesture_events(self.input_controller, events)
+        if self.telemetry:
+            for event in events:
+                if event.type != MOVE:
+                    fields = {"hand": event.hand, "button": event.button, "direction": event.direction}
+                    self.telemetry.record("gesture", event.type,
+                                          **{key: value for key, value in fields.items() if value is not None})
+        if self.latency_tracker and len(hands):
+            self.latency_tracker.record("gestures", time.perf_counter() - start)
+        return events
+
+    def record_landmarks(self, timestamp, hands):
+        """Append a frame to the landmark recording, if one is running."""
+        if self.landmark_recorder:
+            self.landmark_recorder.append(timestamp, hands)
+
+    def count_processed_frame(self):
+        self.frames_processed += 1
+        self.process_times.append(time.perf_counter())
+
+    def apply_config_changes(self):
+        """Apply config changes made since the last call (runs on the inference thread)."""
+        if self._config_subscription:
+            changes = self._config_subscription.drain()
+            if changes:
+                self.apply_config(changes)
+
+    def apply_config(self, values):
+        """Apply a batch of config values; None values are ignored."""
+        values = {key: value for key, value in values.items() if value is not None}
+        if "hold_threshold" in values:
+            self.set_hold_threshold(values["hold_threshold"])
+        if "hand_roles" in values or "cursor_hand" in values:
+            self.set_hand_roles(values.get("hand_roles"), values.get("cursor_hand"))
+        self.governor.configure(enabled=values.get("adaptive_frame_rate"),
+                                max_fps=values.get("inference_max_fps"),
+                                idle_fps=values.get("idle_fps"),
+                                idle_after=values.get("idle_after"),
+                                idle_scale=values.get("idle_scale"),
+                                cpu_budget=values.get("inference_cpu_budget"))
+
+    def set_hold_threshold(self, threshold: float):
+        """设置按住阈值（秒）"""
+        self.gesture_engine.hold_threshold = max(0.5, min(3.0, threshold))
+        logger.info("Hold threshold set to %.1f seconds", self.gesture_engine.hold_threshold)
+
+    def set_hand_roles(self, hand_roles: str = None, cursor_hand: str = None):
+        """设置多手分工：shared（所有手都可点击和滚动）或 split（光标手只控制光标，其余手负责点击和滚动）"""
+        engine = self.gesture_engine
+        if hand_roles in HAND_ROLES:
+            engine.hand_roles = hand_roles
+        if cursor_hand in CURSOR_HANDS:
+            engine.cursor_hand = cursor_hand
+        logger.info("Hand roles set to %s (cursor hand: %s)", engine.hand_roles, engine.cursor_hand)
+
+    def start_landmark_recording(self, path):
+        """开始将每帧的手部关键点录制到 path 目录"""
+        from landmark_recording import LandmarkRecorder
+        self.stop_landmark_recording()
+        self.landmark_recorder = LandmarkRecorder(path, max_hands=self.max_num_hands)
+        logger.info("Recording hand landmarks to %s", path)
+
+    def stop_landmark_recording(self):
+        """停止录制并写入磁盘"""
+        recorder = self.landmark_recorder
+        self.landmark_recorder = None
+        if recorder:
+            try:
+                recorder.close()
+            except Exception as e:
+                logger.warning("Error saving landmark recording: %s", e)
+
+    def release_gestures(self):
+        """Reset all gesture state, releasing a held button."""
+        apply_gesture_events(self.input_controller, self.gesture_engine.reset(self.clock()))
+
+    def pause(self):
+        """暂停时释放按住状态并清空手势状态（模型保持加载，恢复时无需重新初始化）"""
+        self.release_gestures()
+        self.governor.reset()
+
+    def close(self):
+        if self._config_subscription:
+            self._config_subscription.close()
+            self._config_subscription = None
+        self.stop_landmark_recording()
+        self.release_gestures()
+
+    def get_performance_stats(self):
+        """返回实测性能统计信息（处理帧率、跳帧数、各阶段延迟）"""
+        processed_fps = 0.0
+        if len(self.process_times) >= 2:
+            elapsed = self.process_times[-1] - self.process_times[0]
+            if elapsed > 0:
+                processed_fps = (len(self.process_times) - 1) / elapsed
+        return {
+            "processed_fps": processed_fps,
+            "frames_processed": self.frames_processed,
+            "frames_skipped": self.frames_skipped,
+            "gestures": self.gesture_engine.get_states(),
+            "governor": self.governor.get_stats(),
+            "latency": self.latency_tracker.get_stats() if self.latency_tracker else {}
+        }
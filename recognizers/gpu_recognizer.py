@@ -1,32 +1,138 @@
+import logging
+import time
+
 import cv2
 
-class GpuRecognizer:
-    def __init__(self, input_controller, device='cuda'):
-        self.input_controller = input_controller
+from recognizers import hand_landmarks as hl
+from recognizers.base import LandmarkRecognizer, RecognitionResult
+from recognizers.onnx_hand_pipeline import OnnxHandPipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PALM_MODEL = "models/palm_detection.onnx"
+DEFAULT_LANDMARK_MODEL = "models/hand_landmark.onnx"
+
+
+class GpuRecognizer(LandmarkRecognizer):
+    """
+    Hand tracking on ONNX Runtime, with the execution provider chosen by `device`
+    ("cpu", "cuda", "tensorrt", "directml", "coreml", "openvino").
+
+    Runs the MediaPipe palm detector + hand landmark models (see OnnxHandPipeline) and
+    feeds the resulting (21, 3) arrays to the same gesture logic as MediapipeRecognizer.
+    """
+
+    supports_devices = True
+
+    # Config keys applied by apply_config_changes()
+    CONFIG_KEYS = LandmarkRecognizer.CONFIG_KEYS + ("temporal_tracking",)
+
+    def __init__(self, input_controller, device='cuda', latency_tracker=None, clock=time.time,
+                 config_manager=None, palm_model=None, landmark_model=None, threads=None, max_num_hands=None):
+        """
+        Args:
+            palm_model, landmark_model (str): ONNX model paths; default to the config values
+                ("onnx_palm_model" / "onnx_landmark_model") or the files in models/.
+            threads (int): Intra-op threads per session (0 = onnxruntime default).
+
+        Raises:
+            FileNotFoundError: A model file is missing.
+            ImportError: onnxruntime is not installed.
+            ValueError: The outputs of a model cannot be identified (see OnnxHandPipeline).
+        """
         self.device = device
-        # TODO: Load your large model here (e.g., PyTorch, TensorFlow/Keras)
-        # Example:
-        #   self.model = torch.load('path/to/your_model.pth').to(self.device)
-        #   self.model.eval()
-        print(f"INFO: GPU Recognizer initialized on device: {self.device}")
-        print("INFO: This is a placeholder. Implement model loading and processing.")
-
-    def process_frame(self, frame):
-        # TODO: Implement the frame processing logic for your large model.
-        # This will likely involve:
-        #   1. Pre-processing the frame (resize, normalize, convert to tensor).
-        #   2. Running inference: `with torch.no_grad(): output = self.model(tensor)`
-        #   3. Post-processing the output to get hand coordinates/gestures.
-        #   4. Calling the input_controller, e.g., self.input_controller.move_mouse(x, y)
-        
-        # Placeholder: Draw a rectangle and display text
-        h, w, _ = frame.shape
-        cv2.rectangle(frame, (10, 10), (w - 10, h - 10), (0, 0, 255), 2)
-        cv2.putText(frame, "GPU Recognizer (Placeholder)", (20, 40), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-        
-        return frame
+
+        def configured(value, key, default):
+            if value is None and config_manager:
+                value = config_manager.get(key)
+            return default if value is None else value
+
+        self.pipeline = OnnxHandPipeline(configured(palm_model, "onnx_palm_model", DEFAULT_PALM_MODEL),
+                                         configured(landmark_model, "onnx_landmark_model", DEFAULT_LANDMARK_MODEL),
+                                         device=device,
+                                         threads=int(configured(threads, "onnx_threads", 0)))
+        super().__init__(input_controller, latency_tracker=latency_tracker, clock=clock,
+                         config_manager=config_manager, max_num_hands=max_num_hands)
+        self.pipeline.max_hands = self.max_num_hands
+        logger.info("ONNX hand tracking on %s", ", ".join(self.pipeline.providers))
+
+    @classmethod
+    def from_config(cls, input_controller, config_manager=None, latency_tracker=None, clock=time.time,
+                    device=None, **options):
+        if device is None:
+            device = (config_manager.get("device") if config_manager else None) or "cpu"
+        return cls(input_controller, device=device, latency_tracker=latency_tracker, clock=clock,
+                   config_manager=config_manager, **options)
+
+    def process_frame(self, frame, capture_time=None):
+        """
+        Run hand tracking on a BGR frame and drive the input controller.
+
+        Args:
+            frame: BGR image from the camera.
+            capture_time (float): `time.perf_counter()` timestamp of when the frame
+                was captured; used for latency instrumentation.
+        """
+        self.apply_config_changes()
+        current_time = self.clock()
+        governor = self.governor
+        if not governor.should_process(current_time):
+            self.frames_skipped += 1
+            return RecognitionResult(frame)
+
+        tracker = self.latency_tracker
+        start = time.perf_counter()
+        if tracker and capture_time is not None:
+            tracker.record("queue_wait", start - capture_time)
+        self.input_controller.frame_capture_time = capture_time
+
+        # Idle: look for a hand on a smaller frame (landmarks are normalized either way)
+        image = frame
+        if governor.scale < 1.0:
+            image = cv2.resize(frame, None, fx=governor.scale, fy=governor.scale, interpolation=cv2.INTER_AREA)
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        color_time = time.perf_counter() - start
+
+        hands, detection_time, landmark_time = self.pipeline.process(image_rgb, current_time)
+        inference_time = detection_time + landmark_time
+        governor.record(current_time, len(hands) > 0, color_time + inference_time)
+
+        for hand in hands:
+            hl.draw_hand(frame, hand)
+        self.record_landmarks(current_time, hands)
+        gestures = self.handle_landmarks(hands, current_time)
+
+        if tracker:
+            tracker.record("color_convert", color_time)
+            tracker.record("inference", inference_time)
+        self.count_processed_frame()
+        return RecognitionResult(frame, hands, gestures, processed=True)
+
+    def apply_config(self, values):
+        super().apply_config(values)
+        if values.get("temporal_tracking") is not None:
+            self.set_temporal_tracking(values["temporal_tracking"])
+
+    def set_temporal_tracking(self, enabled: bool):
+        """启用/禁用帧间跟踪（跟踪成功时跳过手掌检测，只运行关键点模型）"""
+        self.pipeline.tracking = bool(enabled)
+        self.pipeline.tracker.reset()
+
+    def pause(self):
+        super().pause()
+        self.pipeline.tracker.reset()
+
+    def get_performance_stats(self):
+        """返回实测性能统计信息（处理帧率、跳帧数、推理后端、检测器调用频率、各阶段延迟）"""
+        stats = super().get_performance_stats()
+        stats.update({
+            "palm_detections": self.pipeline.palm_detections,
+            "tracking": self.pipeline.tracker.get_stats(),
+            "providers": list(self.pipeline.providers)
+        })
+        return stats
 
     def close(self):
-        # TODO: Add any cleanup logic for your model if necessary.
-        print("INFO: GPU Recognizer closed.")
\ No newline at end of file
+        super().close()
+        self.pipeline = None
+        logger.info("ONNX recognizer closed.")
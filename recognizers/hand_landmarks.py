@@ -0,0 +1,92 @@
+"""
+Vectorized helpers for hand landmarks stored as (21, 3) float32 arrays.
+
+Rows follow the MediaPipe hand topology (index 0 is the wrist, 4 the thumb tip,
+8 the index finger tip, ...), columns are normalized x, y, z. Every recognizer
+backend converts its output to this layout once per frame, and all gesture
+predicates operate on whole arrays instead of individual landmark attributes.
+"""
+from itertools import chain
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+WRIST = 0
+THUMB_CMC, THUMB_MCP, THUMB_IP, THUMB_TIP = 1, 2, 3, 4
+INDEX_FINGER_MCP, INDEX_FINGER_PIP, INDEX_FINGER_DIP, INDEX_FINGER_TIP = 5, 6, 7, 8
+MIDDLE_FINGER_MCP, MIDDLE_FINGER_PIP, MIDDLE_FINGER_DIP, MIDDLE_FINGER_TIP = 9, 10, 11, 12
+RING_FINGER_MCP, RING_FINGER_PIP, RING_FINGER_DIP, RING_FINGER_TIP = 13, 14, 15, 16
+PINKY_MCP, PINKY_PIP, PINKY_DIP, PINKY_TIP = 17, 18, 19, 20
+
+# Per-finger joints, ordered thumb, index, middle, ring, pinky
+THUMB, INDEX, MIDDLE, RING, PINKY = range(5)
+FINGER_TIPS = np.array([THUMB_TIP, INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP])
+FINGER_PIPS = np.array([THUMB_IP, INDEX_FINGER_PIP, MIDDLE_FINGER_PIP, RING_FINGER_PIP, PINKY_PIP])
+FINGER_MCPS = np.array([THUMB_MCP, INDEX_FINGER_MCP, MIDDLE_FINGER_MCP, RING_FINGER_MCP, PINKY_MCP])
+
+# Bones drawn by draw_hand(), as (start, end) landmark index pairs
+HAND_CONNECTIONS = np.array([
+    (WRIST, THUMB_CMC), (THUMB_CMC, THUMB_MCP), (THUMB_MCP, THUMB_IP), (THUMB_IP, THUMB_TIP),
+    (WRIST, INDEX_FINGER_MCP), (INDEX_FINGER_MCP, INDEX_FINGER_PIP), (INDEX_FINGER_PIP, INDEX_FINGER_DIP),
+    (INDEX_FINGER_DIP, INDEX_FINGER_TIP),
+    (INDEX_FINGER_MCP, MIDDLE_FINGER_MCP), (MIDDLE_FINGER_MCP, MIDDLE_FINGER_PIP),
+    (MIDDLE_FINGER_PIP, MIDDLE_FINGER_DIP), (MIDDLE_FINGER_DIP, MIDDLE_FINGER_TIP),
+    (MIDDLE_FINGER_MCP, RING_FINGER_MCP), (RING_FINGER_MCP, RING_FINGER_PIP),
+    (RING_FINGER_PIP, RING_FINGER_DIP), (RING_FINGER_DIP, RING_FINGER_TIP),
+    (RING_FINGER_MCP, PINKY_MCP), (WRIST, PINKY_MCP), (PINKY_MCP, PINKY_PIP), (PINKY_PIP, PINKY_DIP),
+    (PINKY_DIP, PINKY_TIP),
+])
+
+PINCH_THRESHOLD = 0.05
+V_SIGN_MIN_SEPARATION = 0.03
+
+
+def landmarks_to_array(hand_landmarks):
+    """Convert a MediaPipe NormalizedLandmarkList to a (21, 3) float32 array in one pass."""
+    coords = chain.from_iterable((lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark)
+    return np.fromiter(coords, dtype=np.float32, count=NUM_LANDMARKS * 3).reshape(NUM_LANDMARKS, 3)
+
+
+def draw_hand(image, hand, color=(0, 255, 0)):
+    """Draw a (21, 3) landmark array onto a BGR image in place (for backends without MediaPipe drawing)."""
+    import cv2
+    height, width = image.shape[:2]
+    points = np.rint(hand[:, :2] * (width, height)).astype(np.int32)
+    cv2.polylines(image, list(points[HAND_CONNECTIONS]), False, color, 2)
+    for x, y in points:
+        cv2.circle(image, (int(x), int(y)), 3, (0, 0, 255), -1)
+
+
+def distance(hand, a, b):
+    """2D (x, y) distance between two landmarks."""
+    dx, dy = hand[a, :2] - hand[b, :2]
+    return float(np.hypot(dx, dy))
+
+
+def finger_states(hand):
+    """
+    Return (extended, bent) boolean arrays of shape (5,), one entry per finger.
+
+    A finger is extended when its tip is above its PIP joint and the PIP joint is
+    above the MCP joint (image y grows downwards), and bent when the tip is below
+    the PIP joint.
+    """
+    ys = hand[:, 1]
+    tips, pips, mcps = ys[FINGER_TIPS], ys[FINGER_PIPS], ys[FINGER_MCPS]
+    extended = (tips < pips) & (pips < mcps)
+    bent = tips > pips
+    return extended, bent
+
+
+def is_pinching(hand, threshold: float = PINCH_THRESHOLD):
+    """Thumb tip and index finger tip touching."""
+    return distance(hand, INDEX_FINGER_TIP, THUMB_TIP) < threshold
+
+
+def is_v_sign(hand):
+    """V手势：食指和中指伸直并分开，无名指、小指和拇指弯曲"""
+    extended, bent = finger_states(hand)
+    return bool(extended[INDEX] and extended[MIDDLE] and
+                bent[RING] and bent[PINKY] and bent[THUMB] and
+                distance(hand, INDEX_FINGER_TIP, MIDDLE_FINGER_TIP) > V_SIGN_MIN_SEPARATION)
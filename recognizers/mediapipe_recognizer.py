@@ -1,249 +1,334 @@
 import cv2
+import logging
 import mediapipe as mp
 import time
-import queue
 
-class MediapipeRecognizer:
-    def __init__(self, input_controller, frame_queue=None):
-        self.input_controller = input_controller
+import numpy as np
+
+from recognizers import hand_landmarks as hl
+from recognizers.base import LandmarkRecognizer, RecognitionResult
+from recognizers.temporal_tracker import TemporalTracker
+
+logger = logging.getLogger(__name__)
+
+class MediapipeRecognizer(LandmarkRecognizer):
+    supports_roi_tracking = True
+
+    # Config keys applied by apply_config_changes()
+    CONFIG_KEYS = LandmarkRecognizer.CONFIG_KEYS + ("roi_tracking", "roi_padding", "temporal_tracking")
+
+    # Without temporal tracking: with the ROI, look at the full frame this often (in processed
+    # frames) so that a hand entering elsewhere is still found
+    ROI_RESCAN_FRAMES = 15
+
+    def __init__(self, input_controller, frame_queue=None, latency_tracker=None, clock=time.time,
+                 load_model=True, config_manager=None, max_num_hands=None):
+        """
+        Args:
+            load_model (bool): Build the MediaPipe hands graph. Landmark replays pass False,
+                since they only drive the gesture logic through handle_landmarks().
+            config_manager: If given, the settings in CONFIG_KEYS are read from it and
+                changes are applied at the start of the next process_frame() call.
+            max_num_hands (int): Hands to detect; defaults to the "max_num_hands" setting.
+        """
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        # A MediaPipe graph tracks hands from one image to the next, so inputs that are not
+        # consecutive views of the same scene get separate graphs: `hands` for the full-frame
+        # stream, and with ROI tracking `roi_hands` for the crops and `detection_hands`
+        # (static image mode: palm detection on every call) for full-frame passes in between
+        self.hands = None
+        self.roi_hands = None
+        self.detection_hands = None
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.draw_landmarks = True  # Draw detected hands onto the frame passed in
+
+        # Region-of-interest tracking: run inference on a crop around the last known hand
+        self.roi_tracking = False
+        self.roi_padding = 0.6  # Padding on each side, relative to the hand's size
+        self.roi_min_size = 0.25  # Minimum crop side, relative to the frame's shorter side
+        self.roi = None  # (x0, y0, x1, y1) in pixels
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_frame_detections = 0
+        self._roi_frames = 0  # Frames run on the ROI since the last full-frame detection
+        # Decides when the ROI result is enough and when to detect on the full frame;
+        # with temporal_tracking the ROI is also placed where the hands are heading.
+        # Without ROI tracking the full-frame graph tracks on its own and neither applies
+        self.tracker = TemporalTracker()
+        self.temporal_tracking = True
+
+        super().__init__(input_controller, latency_tracker=latency_tracker, clock=clock,
+                         config_manager=config_manager, max_num_hands=max_num_hands)
+        if load_model:
+            self.hands = self._create_hands()
+
+    def _create_hands(self, static_image_mode=False):
+        return self.mp_hands.Hands(
+            static_image_mode=static_image_mode,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7,
-            max_num_hands=1
+            max_num_hands=self.max_num_hands
         )
-        self.mp_drawing = mp.solutions.drawing_utils
 
-        # Gesture state
-        self.last_gesture_time = 0
-        self.gesture_cooldown = 0.5  # seconds
-        
-        # Performance optimization
-        self.last_process_time = 0
-        self.process_interval = 1.0 / 60  # Max 60 FPS processing
-        self.frame_skip_count = 0
-        self.max_frame_skip = 2
-        
-        # Hold gesture state
-        self.is_holding = False
-        self.hold_start_time = 0
-        self.hold_threshold = 1.0
-        self.last_pinch_state = False
-        
-        # V-gesture state
-        self.v_gesture_frames = 0
-        self.v_gesture_threshold = 3
-        
-        # Quick scroll gesture state
-        self.last_hand_y = None
-        self.gesture_velocity_threshold = 0.05  # 手势速度阈值
-        self.scroll_gesture_frames = 0
-        self.scroll_gesture_threshold = 2
-
-    def process_frame(self, frame):
+    @classmethod
+    def from_config(cls, input_controller, config_manager=None, latency_tracker=None, clock=time.time,
+                    workers=None, max_num_hands=None):
+        """
+        Args:
+            workers (int): Inference worker processes; defaults to the "inference_workers" setting.
+                With 1 or more, a WorkerPoolRecognizer is returned instead.
+        """
+        if workers is None:
+            workers = int(config_manager.get("inference_workers")) if config_manager else 0
+        if workers > 0:
+            # Inference in worker processes fed through shared memory
+            from shm_pipeline import WorkerPoolRecognizer
+            return WorkerPoolRecognizer(input_controller, workers=workers, latency_tracker=latency_tracker,
+                                        clock=clock, config_manager=config_manager, max_num_hands=max_num_hands)
+        return cls(input_controller, latency_tracker=latency_tracker, clock=clock, config_manager=config_manager,
+                   max_num_hands=max_num_hands)
+
+    def process_frame(self, frame, capture_time=None):
+        """
+        Run hand tracking on a BGR frame and drive the input controller.
+
+        Args:
+            frame: BGR image from the camera.
+            capture_time (float): `time.perf_counter()` timestamp of when the frame
+                was captured; used for latency instrumentation.
+        """
         if self.hands is None:
-            return frame
-            
-        current_time = time.time()
-        
-        # Frame rate control
-        if current_time - self.last_process_time < self.process_interval:
-            self.frame_skip_count += 1
-            if self.frame_skip_count < self.max_frame_skip:
-                return frame
-        
-        self.frame_skip_count = 0
-        self.last_process_time = current_time
-        
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(frame_rgb)
+            return RecognitionResult(frame)
 
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                self._handle_gestures(hand_landmarks)
-
-        return frame
-
-    def _handle_gestures(self, landmarks):
-        index_tip = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        thumb_tip = landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-        wrist = landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-        
-        # Mouse movement
-        self.input_controller.move_mouse(index_tip.x, index_tip.y)
-
-        # Pinch gesture detection
-        pinch_distance = self._calculate_distance(index_tip, thumb_tip)
-        is_pinching = pinch_distance < 0.05
-        
-        current_time = time.time()
-        
-        # Handle hold gesture
-        self._handle_hold_gesture(is_pinching, current_time)
-        
-        # Handle quick scroll gestures
-        self._handle_quick_scroll_gesture(wrist, current_time)
-        
-        # Handle V-gesture for right-click
-        if current_time - self.last_gesture_time > self.gesture_cooldown:
-            if self._is_v_sign(landmarks):
-                self.v_gesture_frames += 1
-                if self.v_gesture_frames >= self.v_gesture_threshold:
-                    self.input_controller.right_click()
-                    self.last_gesture_time = current_time
-                    self.v_gesture_frames = 0
+        self.apply_config_changes()
+        current_time = self.clock()
+
+        # Adaptive frame rate: idle rate without a hand, backed off when inference is too slow
+        if not self.governor.should_process(current_time):
+            self.frames_skipped += 1
+            return RecognitionResult(frame)
+
+        tracker = self.latency_tracker
+        start = time.perf_counter()
+        if tracker and capture_time is not None:
+            tracker.record("queue_wait", start - capture_time)
+        self.input_controller.frame_capture_time = capture_time
+
+        hands, color_time, inference_time = self.detect(frame, self.governor.scale, current_time)
+        self.governor.record(current_time, len(hands) > 0, color_time + inference_time)
+
+        self.record_landmarks(current_time, hands)
+        gestures = self.handle_landmarks(hands, current_time)
+
+        if tracker:
+            tracker.record("color_convert", color_time)
+            tracker.record("inference", inference_time)
+        self.count_processed_frame()
+
+        return RecognitionResult(frame, hands, gestures, processed=True)
+
+    def detect(self, frame, scale: float = 1.0, timestamp=None):
+        """
+        Detection only, without gesture handling (also used by inference worker processes).
+
+        Args:
+            scale (float): Downscale factor applied before detection; landmarks are
+                normalized, so they are valid for the full frame either way.
+            timestamp (float): Frame time for motion prediction; defaults to `clock()`.
+
+        Returns:
+            tuple: (hands, color_convert_seconds, inference_seconds), see _detect().
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        if scale >= 1.0:
+            return self._detect(frame, timestamp)
+        # Idle: look for a hand on a smaller frame
+        resize_start = time.perf_counter()
+        small_frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        resize_time = time.perf_counter() - resize_start
+        self.roi = None
+        hands, color_time, inference_time = self._detect(small_frame, timestamp)
+        self.roi = None  # In small-frame pixels, not valid for the next full-size frame
+        return hands, color_time + resize_time, inference_time
+
+    def _detect(self, frame, timestamp):
+        """
+        Detect hands in a BGR frame, on the ROI crop when tracking and on the full frame otherwise.
+
+        Returns:
+            tuple: (hands, color_convert_seconds, inference_seconds), where hands is a list of
+            (21, 3) arrays normalized to the full frame.
+        """
+        tracker = self.tracker
+        roi = self.roi if self.roi_tracking else None
+        if roi is not None and not self.temporal_tracking and self._roi_frames >= self.ROI_RESCAN_FRAMES:
+            roi = None
+        hands, color_time, inference_time = self._run_hands(frame, roi)
+        if roi is None:
+            if self.roi_tracking:
+                # Only the static graph is sure to run palm detection; without ROI tracking the
+                # stream graph decides that internally, so no detector calls are counted
+                tracker.record_detection(timestamp)
+        else:
+            if hands:
+                self.roi_hits += 1
             else:
-                self.v_gesture_frames = 0
-
-    def _handle_hold_gesture(self, is_pinching, current_time):
-        """Handles the logic for hold gestures."""
-        if is_pinching and not self.last_pinch_state:
-            # Pinch started
-            self.hold_start_time = current_time
-            self.last_pinch_state = True
-            
-        elif is_pinching and self.last_pinch_state:
-            # 持续捏合
-            hold_duration = current_time - self.hold_start_time
-            
-            if not self.is_holding and hold_duration >= self.hold_threshold:
-                # 开始按住
-                self.is_holding = True
-                self.input_controller.mouse_down('left')
-                print("开始按住")
-                
-        elif not is_pinching and self.last_pinch_state:
-            # 结束捏合
-            self.last_pinch_state = False
-            
-            if self.is_holding:
-                # 结束按住
-                self.is_holding = False
-                self.input_controller.mouse_up('left')
-                print("结束按住")
+                self.roi_misses += 1
+            if self.temporal_tracking:
+                redetect = tracker.needs_detection(timestamp, len(hands), len(tracker.hands), self.max_num_hands)
             else:
-                # 短时间捏合，执行点击
-                hold_duration = current_time - self.hold_start_time
-                if hold_duration < self.hold_threshold and current_time - self.last_gesture_time > self.gesture_cooldown:
-                    self.input_controller.left_click()
-                    self.last_gesture_time = current_time
-                    print("执行点击")
-
-    def _handle_quick_scroll_gesture(self, wrist, current_time):
-        """处理快速滚动手势"""
-        current_y = wrist.y
-        
-        # 如果这是第一次检测，保存位置
-        if self.last_hand_y is None:
-            self.last_hand_y = current_y
+                redetect = not hands
+            if redetect:
+                # Tracking lost, or a further hand may have entered the view:
+                # full-frame detection on the same frame
+                self.roi = None
+                hands, full_color_time, full_inference_time = self._run_hands(frame, None)
+                tracker.record_detection(timestamp)
+                color_time += full_color_time
+                inference_time += full_inference_time
+
+        hands = tracker.update(timestamp, hands)
+        if self.roi_tracking:
+            self._update_roi(hands, frame.shape)
+        return hands, color_time, inference_time
+
+    def _run_hands(self, frame, roi):
+        """Run MediaPipe on the whole frame or on a zero-copy crop of it."""
+        if roi is None:
+            image = frame
+            self.full_frame_detections += 1
+            self._roi_frames = 0
+        else:
+            x0, y0, x1, y1 = roi
+            image = frame[y0:y1, x0:x1]
+            self._roi_frames += 1
+
+        graph = self._graph(roi)
+        start = time.perf_counter()
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        converted = time.perf_counter()
+        results = graph.process(image_rgb)
+        inferred = time.perf_counter()
+
+        # Convert each hand to a (21, 3) array once; everything downstream works on arrays
+        hands = []
+        if results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                if self.draw_landmarks:
+                    # Drawing on the crop view draws in place on the full frame
+                    self.mp_drawing.draw_landmarks(image, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                hand = hl.landmarks_to_array(hand_landmarks)
+                if roi is not None:
+                    hand = self._crop_to_frame(hand, roi, frame.shape)
+                hands.append(hand)
+        return hands, converted - start, inferred - converted
+
+    def _graph(self, roi):
+        """The graph for a crop (`roi`) or a full frame (None); the ROI-mode graphs are built on first use."""
+        if not self.roi_tracking:
+            return self.hands
+        if roi is not None:
+            if self.roi_hands is None:
+                self.roi_hands = self._create_hands()
+            return self.roi_hands
+        if self.detection_hands is None:
+            self.detection_hands = self._create_hands(static_image_mode=True)
+        return self.detection_hands
+
+    @staticmethod
+    def _crop_to_frame(hand, roi, frame_shape):
+        """Map landmarks normalized to a crop back to full-frame normalized coordinates."""
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = roi
+        hand[:, 0] = (x0 + hand[:, 0] * (x1 - x0)) / width
+        hand[:, 1] = (y0 + hand[:, 1] * (y1 - y0)) / height
+        # z uses roughly the same scale as x
+        hand[:, 2] *= (x1 - x0) / width
+        return hand
+
+    def _update_roi(self, hands, frame_shape):
+        """Place a padded square crop around the detected hands for the next frame."""
+        if not hands:
+            self.roi = None
             return
-            
-        # 计算垂直移动速度
-        y_velocity = current_y - self.last_hand_y
-        
-        # 检测快速上挥或下挥手势
-        if abs(y_velocity) > self.gesture_velocity_threshold and current_time - self.last_gesture_time > self.gesture_cooldown:
-            self.scroll_gesture_frames += 1
-            
-            if self.scroll_gesture_frames >= self.scroll_gesture_threshold:
-                if y_velocity < -self.gesture_velocity_threshold:
-                    # 快速上挥 - 向上滚动
-                    self.input_controller.scroll("up", is_quick=True)
-                    print("检测到快速上挥手势 - 向上滚动")
-                elif y_velocity > self.gesture_velocity_threshold:
-                    # 快速下挥 - 向下滚动
-                    self.input_controller.scroll("down", is_quick=True)
-                    print("检测到快速下挥手势 - 向下滚动")
-                
-                self.last_gesture_time = current_time
-                self.scroll_gesture_frames = 0
+
+        height, width = frame_shape[:2]
+        if self.temporal_tracking:
+            # Cover where the hands are and where they are predicted to be on the next frame
+            points = np.concatenate(hands + self.tracker.predict())
         else:
-            # 重置计数器如果没有检测到快速手势
-            if abs(y_velocity) <= self.gesture_velocity_threshold:
-                self.scroll_gesture_frames = 0
-        
-        # 更新上一次的位置
-        self.last_hand_y = current_y
-
-    def _is_v_sign(self, landmarks):
-        """检测V手势（食指和中指伸直，其他手指弯曲）"""
-        # 获取关键点
-        index_tip = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        index_pip = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_PIP]
-        index_mcp = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_MCP]
-        
-        middle_tip = landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-        middle_pip = landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
-        middle_mcp = landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
-        
-        ring_tip = landmarks.landmark[self.mp_hands.HandLandmark.RING_FINGER_TIP]
-        ring_pip = landmarks.landmark[self.mp_hands.HandLandmark.RING_FINGER_PIP]
-        
-        pinky_tip = landmarks.landmark[self.mp_hands.HandLandmark.PINKY_TIP]
-        pinky_pip = landmarks.landmark[self.mp_hands.HandLandmark.PINKY_PIP]
-        
-        thumb_tip = landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-        thumb_ip = landmarks.landmark[self.mp_hands.HandLandmark.THUMB_IP]
-        
-        wrist = landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-
-        # 检查食指是否伸直（tip比pip高，pip比mcp高）
-        index_extended = (index_tip.y < index_pip.y < index_mcp.y)
-        
-        # 检查中指是否伸直
-        middle_extended = (middle_tip.y < middle_pip.y < middle_mcp.y)
-        
-        # 检查无名指是否弯曲（tip比pip低）
-        ring_bent = (ring_tip.y > ring_pip.y)
-        
-        # 检查小指是否弯曲
-        pinky_bent = (pinky_tip.y > pinky_pip.y)
-        
-        # 检查拇指是否不伸直（避免与食指形成捏合姿势）
-        thumb_not_extended = (thumb_tip.y > thumb_ip.y)
-        
-        # 检查食指和中指之间的距离，确保它们分开
-        finger_distance = self._calculate_distance(index_tip, middle_tip)
-        fingers_separated = finger_distance > 0.03  # 手指之间有一定距离
-        
-        # V手势：食指和中指伸直，其他手指弯曲，手指分开
-        is_v = (index_extended and middle_extended and 
-               ring_bent and pinky_bent and 
-               thumb_not_extended and fingers_separated)
-        
-        return is_v
-
-    def _calculate_distance(self, point1, point2):
-        return ((point1.x - point2.x)**2 + (point1.y - point2.y)**2)**0.5
-
-    def set_hold_threshold(self, threshold: float):
-        """设置按住阈值（秒）"""
-        self.hold_threshold = max(0.5, min(3.0, threshold))
-        print(f"Hold threshold set to {self.hold_threshold:.1f} seconds")
+            points = np.concatenate(hands)
+        xs, ys = points[:, 0] * width, points[:, 1] * height
+        box_x0, box_x1, box_y0, box_y1 = xs.min(), xs.max(), ys.min(), ys.max()
+
+        # Keep the crop where it is while the hand stays well inside it: a stable crop lets
+        # MediaPipe keep tracking instead of re-running palm detection
+        if self.roi is not None and self.roi != (0, 0, width, height):
+            x0, y0, x1, y1 = self.roi
+            margin = 0.1 * (x1 - x0)
+            if (box_x0 >= x0 + margin and box_x1 <= x1 - margin and
+                    box_y0 >= y0 + margin and box_y1 <= y1 - margin):
+                return
+
+        shorter_side = min(width, height)
+        size = max(box_x1 - box_x0, box_y1 - box_y0) * (1 + 2 * self.roi_padding)
+        size = int(min(max(size, self.roi_min_size * shorter_side), shorter_side))
+        if size * size >= 0.8 * width * height:
+            # The crop would be almost the whole frame anyway: keep tracking on the whole frame
+            # in the crop graph (full-frame passes in ROI mode are detections)
+            self.roi = (0, 0, width, height)
+            return
+
+        center_x, center_y = (box_x0 + box_x1) / 2, (box_y0 + box_y1) / 2
+        x0 = int(min(max(center_x - size / 2, 0), width - size))
+        y0 = int(min(max(center_y - size / 2, 0), height - size))
+        self.roi = (x0, y0, x0 + size, y0 + size)
+
+    def set_roi_tracking(self, enabled: bool, padding: float = None):
+        """启用/禁用 ROI 跟踪（只在上一帧手部附近的裁剪区域内推理）"""
+        self.roi_tracking = bool(enabled)
+        if padding is not None:
+            self.roi_padding = max(0.1, min(2.0, padding))
+        self.roi = None
+
+    def set_temporal_tracking(self, enabled: bool):
+        """启用/禁用帧间运动预测（ROI 放在手的预测位置，减少跟踪丢失和全帧检测；仅在 ROI 跟踪开启时生效）"""
+        self.temporal_tracking = bool(enabled)
+
+    def apply_config(self, values):
+        super().apply_config(values)
+        if values.get("roi_tracking") is not None or values.get("roi_padding") is not None:
+            enabled = values.get("roi_tracking")
+            self.set_roi_tracking(self.roi_tracking if enabled is None else enabled, values.get("roi_padding"))
+        if values.get("temporal_tracking") is not None:
+            self.set_temporal_tracking(values["temporal_tracking"])
+
+    def pause(self):
+        super().pause()
+        self.roi = None
+        self.tracker.reset()
 
     def close(self):
-        # 清理按住状态
-        if self.is_holding:
-            self.input_controller.mouse_up('left')
-            self.is_holding = False
-            print("关闭时释放按住状态")
-        
+        super().close()
         # 安全关闭 MediaPipe hands
-        if hasattr(self, 'hands') and self.hands is not None:
+        for graph in (self.hands, self.roi_hands, self.detection_hands):
+            if graph is None:
+                continue
             try:
-                self.hands.close()
+                graph.close()
             except Exception as e:
-                print(f"Warning: Error closing MediaPipe hands: {e}")
-            finally:
-                self.hands = None
+                logger.warning("Error closing MediaPipe hands: %s", e)
+        self.hands = self.roi_hands = self.detection_hands = None
 
     def get_performance_stats(self):
-        """返回性能统计信息"""
-        if hasattr(self, 'last_process_time'):
-            actual_fps = 1.0 / max(self.process_interval, 0.001)
-            return {
-                "target_fps": int(actual_fps),
-                "frame_skips": getattr(self, 'frame_skip_count', 0)
-            }
-        return {"target_fps": 60, "frame_skips": 0}
+        """返回实测性能统计信息（处理帧率、跳帧数、ROI 命中、全帧检测频率、各阶段延迟）"""
+        stats = super().get_performance_stats()
+        stats.update({
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "full_frame_detections": self.full_frame_detections,
+            # Detector calls are only known with ROI tracking, see _detect()
+            "tracking": self.tracker.get_stats() if self.roi_tracking else None
+        })
+        return stats
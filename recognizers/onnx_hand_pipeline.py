@@ -0,0 +1,362 @@
+"""
+MediaPipe-compatible two-stage hand pipeline on ONNX Runtime.
+
+1. Palm detector (192x192 SSD, 2016 anchors) on the letterboxed full frame, giving
+   palm boxes with 7 keypoints; decoding and NMS are vectorized NumPy.
+2. Hand landmark model (224x224) on a rotated square crop around each palm, taken
+   with one cv2.warpAffine; the 21 landmarks are mapped back with the inverse
+   transform.
+
+With `tracking` on, hands found on one frame are tracked on the next by running
+only the landmark model on a crop around their predicted position (see
+temporal_tracker); the palm detector runs when a hand is lost or may have entered.
+
+The models are ONNX conversions of MediaPipe's palm_detection and hand_landmark
+models, and hands come out in the same normalized (21, 3) layout as the MediaPipe
+recognizer, so gesture logic and benchmarks work unchanged on either backend.
+"""
+import logging
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+from recognizers.hand_landmarks import NUM_LANDMARKS
+from recognizers.temporal_tracker import TemporalTracker, landmarks_to_rect
+
+logger = logging.getLogger(__name__)
+
+# Execution providers tried for each `device` value, best first; CPU is always the fallback
+DEVICE_PROVIDERS = {
+    "cpu": [],
+    "cuda": ["CUDAExecutionProvider"],
+    "tensorrt": ["TensorrtExecutionProvider", "CUDAExecutionProvider"],
+    "directml": ["DmlExecutionProvider"],
+    "dml": ["DmlExecutionProvider"],
+    "coreml": ["CoreMLExecutionProvider"],
+    "openvino": ["OpenVINOExecutionProvider"],
+}
+
+PALM_INPUT_SIZE = 192
+LANDMARK_INPUT_SIZE = 224
+# Palm box -> hand crop: MediaPipe shifts the box towards the fingers and enlarges it
+PALM_RECT_SHIFT_Y = -0.5
+PALM_RECT_SCALE = 2.6
+# Smallest hand crop (pixels) that is tracked without running the palm detector again
+MIN_TRACKING_SIZE = 16
+
+# Output names in common conversions: tf2onnx keeps the TFLite names (Identity, Identity_1, ...),
+# PINTO's model zoo uses descriptive ones. Hand landmark model outputs, in TFLite order:
+# landmarks (63), hand presence (1), handedness (1), world landmarks (63)
+PALM_REGRESSOR_NAMES = ("Identity", "regressors")
+PALM_SCORE_NAMES = ("Identity_1", "classificators")
+LANDMARK_NAMES = ("Identity", "xyz_x21")
+PRESENCE_NAMES = ("Identity_1", "hand_score")
+
+
+def select_providers(ort, device):
+    """Execution providers for `device`, limited to those this onnxruntime build has."""
+    available = ort.get_available_providers()
+    wanted = DEVICE_PROVIDERS.get(str(device).lower())
+    if wanted is None:
+        logger.warning("Unknown device '%s', using CPU.", device)
+        wanted = []
+    missing = [provider for provider in wanted if provider not in available]
+    if missing:
+        logger.warning("%s not available in this onnxruntime build, falling back to CPU.", ", ".join(missing))
+    return [provider for provider in wanted if provider in available] + ["CPUExecutionProvider"]
+
+
+def create_session(ort, path, providers, threads=0):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"ONNX model not found: {path}")
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        options.intra_op_num_threads = int(threads)
+    return ort.InferenceSession(path, sess_options=options, providers=providers)
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -100.0, 100.0)))
+
+
+class _ImageModel:
+    """A session with one float image input in [0, 1], NHWC or NCHW."""
+
+    def __init__(self, session, default_size):
+        self.session = session
+        model_input = session.get_inputs()[0]
+        self.input_name = model_input.name
+        shape = model_input.shape
+        self.channels_first = shape[1] == 3
+        size = shape[2] if self.channels_first else shape[1]
+        self.size = size if isinstance(size, int) else default_size
+        self.outputs = session.get_outputs()
+        # Reused input buffer
+        self.input = np.zeros((self.size, self.size, 3), dtype=np.float32)
+
+    def output_index(self, elements, names, default):
+        """
+        Index of the output called one of `names`, else of the only output with `elements`
+        values per batch item, else `default` (outputs without static shapes).
+
+        Raises:
+            ValueError: No output has one of `names` and several have `elements` values
+                (e.g. hand presence and handedness are both a single score).
+        """
+        sizes = [self._elements(output) for output in self.outputs]
+        for name in names:
+            for index, output in enumerate(self.outputs):
+                if output.name == name and sizes[index] in (elements, None):
+                    return index
+        matches = [index for index, size in enumerate(sizes) if size == elements]
+        if len(matches) > 1:
+            candidates = ", ".join(self.outputs[index].name for index in matches)
+            raise ValueError(f"Ambiguous model outputs: {candidates} all have {elements} values "
+                             f"and none is named {' or '.join(names)}")
+        return matches[0] if matches else default
+
+    @staticmethod
+    def _elements(output):
+        dims = [d for d in output.shape[1:] if isinstance(d, int)]
+        return int(np.prod(dims)) if dims else None
+
+    def run(self):
+        tensor = self.input.transpose(2, 0, 1) if self.channels_first else self.input
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(tensor)[None]})
+
+
+def generate_palm_anchors(input_size=PALM_INPUT_SIZE, strides=(8, 16, 16, 16)):
+    """
+    SSD anchor centers of the MediaPipe palm detector, shape (2016, 2), normalized.
+
+    Every layer puts 2 anchors on each cell of its grid; layers with the same stride
+    share a grid, so stride 8 gives 24*24*2 and stride 16 gives 12*12*6 anchors.
+    """
+    anchors = []
+    for stride in sorted(set(strides)):
+        per_cell = 2 * strides.count(stride)
+        grid = math.ceil(input_size / stride)
+        ys, xs = np.meshgrid(np.arange(grid), np.arange(grid), indexing="ij")
+        centers = np.stack([(xs + 0.5) / grid, (ys + 0.5) / grid], axis=-1).reshape(-1, 1, 2)
+        anchors.append(np.repeat(centers, per_cell, axis=1).reshape(-1, 2))
+    return np.concatenate(anchors).astype(np.float32)
+
+
+def non_max_suppression(boxes, scores, iou_threshold, max_detections):
+    """Greedy NMS on (N, 4) [x0, y0, x1, y1] boxes; returns the kept indices, best first."""
+    x0, y0, x1, y1 = boxes.T
+    areas = (x1 - x0) * (y1 - y0)
+    order = np.argsort(-scores)
+    keep = []
+    while order.size and len(keep) < max_detections:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        overlap_w = np.clip(np.minimum(x1[best], x1[rest]) - np.maximum(x0[best], x0[rest]), 0, None)
+        overlap_h = np.clip(np.minimum(y1[best], y1[rest]) - np.maximum(y0[best], y0[rest]), 0, None)
+        intersection = overlap_w * overlap_h
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class PalmDetector:
+    def __init__(self, session, score_threshold: float = 0.5, iou_threshold: float = 0.3):
+        self.model = _ImageModel(session, PALM_INPUT_SIZE)
+        self.anchors = generate_palm_anchors(self.model.size)
+        self.score_threshold = score_threshold
+        self.iou_threshold = iou_threshold
+        self._regressor_index = self.model.output_index(18 * len(self.anchors), PALM_REGRESSOR_NAMES, 0)
+        self._score_index = self.model.output_index(len(self.anchors), PALM_SCORE_NAMES, 1)
+
+    def detect(self, rgb, max_detections: int = 1):
+        """
+        Find palms in an RGB frame.
+
+        Returns:
+            tuple: (boxes (N, 4) [x0, y0, x1, y1], keypoints (N, 7, 2), scores (N,)), all
+            normalized to the frame, best detection first.
+        """
+        size = self.model.size
+        height, width = rgb.shape[:2]
+        # Letterbox: keep the aspect ratio and pad symmetrically, like MediaPipe
+        scale = size / max(height, width)
+        new_w, new_h = max(1, round(width * scale)), max(1, round(height * scale))
+        pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+        self.model.input.fill(0.0)
+        resized = cv2.resize(rgb, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        np.multiply(resized, 1.0 / 255.0, out=self.model.input[pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+                    casting="unsafe")
+
+        outputs = self.model.run()
+        raw = outputs[self._regressor_index].reshape(-1, 18)
+        scores = sigmoid(outputs[self._score_index].reshape(-1))
+        candidates = np.flatnonzero(scores >= self.score_threshold)
+        if candidates.size == 0:
+            return np.empty((0, 4), np.float32), np.empty((0, 7, 2), np.float32), np.empty(0, np.float32)
+
+        # Decode relative to the anchors, in model-input coordinates
+        regression = raw[candidates] / size
+        anchors = self.anchors[candidates]
+        centers = regression[:, 0:2] + anchors
+        half_sizes = regression[:, 2:4] / 2
+        boxes = np.concatenate([centers - half_sizes, centers + half_sizes], axis=1)
+        keypoints = regression[:, 4:18].reshape(-1, 7, 2) + anchors[:, None, :]
+
+        keep = non_max_suppression(boxes, scores[candidates], self.iou_threshold, max_detections)
+        boxes, keypoints, scores = boxes[keep], keypoints[keep], scores[candidates][keep]
+
+        # Remove the letterbox padding
+        offset = np.array([pad_x, pad_y], dtype=np.float32)
+        extent = np.array([new_w, new_h], dtype=np.float32)
+        boxes = ((boxes.reshape(-1, 2, 2) * size - offset) / extent).reshape(-1, 4)
+        keypoints = (keypoints * size - offset) / extent
+        return boxes, keypoints, scores
+
+
+def palm_to_rect(box, keypoints, frame_width, frame_height):
+    """
+    Rotated square crop (center_x, center_y, size, rotation) in pixels around a palm.
+
+    The rotation makes the wrist -> middle finger MCP direction point up in the crop.
+    """
+    frame_size = np.array([frame_width, frame_height], dtype=np.float32)
+    wrist, middle_mcp = keypoints[0] * frame_size, keypoints[2] * frame_size
+    rotation = math.pi / 2 - math.atan2(-(middle_mcp[1] - wrist[1]), middle_mcp[0] - wrist[0])
+    rotation = (rotation + math.pi) % (2 * math.pi) - math.pi
+
+    box_w = (box[2] - box[0]) * frame_width
+    box_h = (box[3] - box[1]) * frame_height
+    center_x = (box[0] + box[2]) / 2 * frame_width - box_h * PALM_RECT_SHIFT_Y * math.sin(rotation)
+    center_y = (box[1] + box[3]) / 2 * frame_height + box_h * PALM_RECT_SHIFT_Y * math.cos(rotation)
+    return center_x, center_y, max(box_w, box_h) * PALM_RECT_SCALE, rotation
+
+
+def rect_to_affine(rect, output_size):
+    """2x3 affine transform from frame pixels to the rotated square crop."""
+    center_x, center_y, size, rotation = rect
+    half = size / 2
+    axis_x = np.array([math.cos(rotation), math.sin(rotation)]) * half
+    axis_y = np.array([-math.sin(rotation), math.cos(rotation)]) * half
+    center = np.array([center_x, center_y])
+    source = np.float32([center - axis_x - axis_y, center + axis_x - axis_y, center - axis_x + axis_y])
+    target = np.float32([[0, 0], [output_size, 0], [0, output_size]])
+    return cv2.getAffineTransform(source, target)
+
+
+class HandLandmarkModel:
+    def __init__(self, session):
+        self.model = _ImageModel(session, LANDMARK_INPUT_SIZE)
+        self._landmark_index = self.model.output_index(NUM_LANDMARKS * 3, LANDMARK_NAMES, 0)
+        self._score_index = self.model.output_index(1, PRESENCE_NAMES, 1)
+        self._crop = np.zeros((self.model.size, self.model.size, 3), dtype=np.uint8)
+
+    def run(self, rgb, rect):
+        """
+        Landmarks of the hand inside `rect`.
+
+        Returns:
+            tuple: ((21, 3) float32 array normalized to the frame, hand presence score).
+        """
+        size = self.model.size
+        height, width = rgb.shape[:2]
+        transform = rect_to_affine(rect, size)
+        cv2.warpAffine(rgb, transform, (size, size), dst=self._crop, flags=cv2.INTER_LINEAR,
+                       borderMode=cv2.BORDER_CONSTANT)
+        np.multiply(self._crop, 1.0 / 255.0, out=self.model.input, casting="unsafe")
+
+        outputs = self.model.run()
+        raw = outputs[self._landmark_index].reshape(NUM_LANDMARKS, 3)
+        score = float(outputs[self._score_index].reshape(-1)[0])
+        if not 0.0 <= score <= 1.0:
+            score = float(sigmoid(score))  # Model exported without the final sigmoid
+
+        # Crop pixels -> frame pixels -> normalized; z is scaled like x, as in MediaPipe
+        inverse = cv2.invertAffineTransform(transform)
+        points = raw[:, :2] @ inverse[:, :2].T + inverse[:, 2]
+        hand = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+        hand[:, 0] = points[:, 0] / width
+        hand[:, 1] = points[:, 1] / height
+        hand[:, 2] = raw[:, 2] * (rect[2] / size) / width
+        return hand, score
+
+
+class OnnxHandPipeline:
+    def __init__(self, palm_model_path, landmark_model_path, device="cpu", threads=0, max_hands=1,
+                 min_detection_score=0.5, min_presence_score=0.5, tracking=True):
+        # Imported here so onnxruntime is only needed when this backend is selected
+        import onnxruntime as ort
+        providers = select_providers(ort, device)
+        palm_session = create_session(ort, palm_model_path, providers, threads)
+        landmark_session = create_session(ort, landmark_model_path, providers, threads)
+        self.palm_detector = PalmDetector(palm_session, score_threshold=min_detection_score)
+        self.landmark_model = HandLandmarkModel(landmark_session)
+        self.providers = palm_session.get_providers()
+        self.max_hands = max_hands
+        self.min_presence_score = min_presence_score
+        self.tracking = tracking
+        self.tracker = TemporalTracker()
+        self.palm_detections = 0
+
+    def process(self, rgb, timestamp=None):
+        """
+        Detect or track hands in an RGB frame.
+
+        Args:
+            timestamp (float): Frame time in seconds, for motion prediction; defaults to now.
+
+        Returns:
+            tuple: (hands, detection_seconds, landmark_seconds), hands being (21, 3) arrays.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        height, width = rgb.shape[:2]
+        tracker = self.tracker
+        start = time.perf_counter()
+
+        # Landmark model only, where the tracked hands should be now
+        predicted = tracker.predict(timestamp) if self.tracking else []
+        hands = []
+        for guess in predicted:
+            rect = landmarks_to_rect(guess, width, height)
+            if rect[2] < MIN_TRACKING_SIZE:
+                continue  # Collapsed landmarks: treat the hand as lost
+            hand, score = self.landmark_model.run(rgb, rect)
+            if score >= self.min_presence_score:
+                hands.append(hand)
+        landmark_time = time.perf_counter() - start
+        detection_time = 0.0
+
+        if not self.tracking or tracker.needs_detection(timestamp, len(hands), len(predicted), self.max_hands):
+            detect_start = time.perf_counter()
+            boxes, keypoints, _ = self.palm_detector.detect(rgb, self.max_hands)
+            self.palm_detections += 1
+            tracker.record_detection(timestamp)
+            detected = time.perf_counter()
+            detection_time = detected - detect_start
+
+            for box, palm_keypoints in zip(boxes, keypoints):
+                if len(hands) >= self.max_hands:
+                    break
+                if self._is_tracked(box, hands):
+                    continue
+                hand, score = self.landmark_model.run(rgb, palm_to_rect(box, palm_keypoints, width, height))
+                if score >= self.min_presence_score:
+                    hands.append(hand)
+            landmark_time += time.perf_counter() - detected
+
+        hands = tracker.update(timestamp, hands)
+        return hands, detection_time, landmark_time
+
+    @staticmethod
+    def _is_tracked(box, hands):
+        """Whether a palm box (normalized) lies on a hand that is already tracked."""
+        center_x, center_y = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        for hand in hands:
+            low, high = hand[:, :2].min(axis=0), hand[:, :2].max(axis=0)
+            if low[0] <= center_x <= high[0] and low[1] <= center_y <= high[1]:
+                return True
+        return False
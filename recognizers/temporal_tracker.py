@@ -0,0 +1,184 @@
+"""
+Frame-to-frame hand tracking so that backends only run their hand detector on loss.
+
+`TemporalTracker` remembers the hands of the last processed frame and a smoothed
+per-landmark velocity, and predicts where each hand will be on the next frame. A
+backend runs its landmark model at the predicted positions (the ONNX pipeline on
+`landmarks_to_rect()` crops, MediaPipe on its ROI crop), validates the result and
+asks `needs_detection()` whether the expensive full-frame detection is needed:
+only when a tracked hand was lost, nothing is tracked, or a further hand may have
+entered the view (every `rescan_interval` seconds while fewer than the maximum
+number of hands are tracked).
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+# Landmarks that define the hand crop: wrist, thumb base and the two lowest joints of each finger
+# (fingertips move too much to be useful for placing the next crop)
+RECT_LANDMARKS = [0, 1, 2, 3, 5, 6, 9, 10, 13, 14, 17, 18]
+# Landmarks -> hand crop, as in MediaPipe's hand landmark tracking
+LANDMARK_RECT_SCALE = 2.0
+LANDMARK_RECT_SHIFT_Y = -0.1
+
+
+def landmarks_to_rect(hand, frame_width, frame_height):
+    """
+    Rotated square crop (center_x, center_y, size, rotation) in pixels that contains a hand,
+    computed from its landmarks (same layout as `onnx_hand_pipeline.palm_to_rect()`).
+    """
+    points = hand[RECT_LANDMARKS, :2] * np.array([frame_width, frame_height], dtype=np.float32)
+    wrist = points[0]
+    # Average of the index, middle and ring finger bases, weighted towards the middle finger
+    knuckles = (((points[4] + points[8]) / 2) + points[6]) / 2
+    rotation = math.pi / 2 - math.atan2(-(knuckles[1] - wrist[1]), knuckles[0] - wrist[0])
+    rotation = (rotation + math.pi) % (2 * math.pi) - math.pi
+
+    # Bounding box in the rotated frame
+    cos_r, sin_r = math.cos(rotation), math.sin(rotation)
+    center = (points.min(axis=0) + points.max(axis=0)) / 2
+    offsets = points - center
+    projected_x = offsets[:, 0] * cos_r + offsets[:, 1] * sin_r
+    projected_y = -offsets[:, 0] * sin_r + offsets[:, 1] * cos_r
+    width = projected_x.max() - projected_x.min()
+    height = projected_y.max() - projected_y.min()
+    box_x = (projected_x.max() + projected_x.min()) / 2
+    box_y = (projected_y.max() + projected_y.min()) / 2 + height * LANDMARK_RECT_SHIFT_Y
+
+    center_x = center[0] + box_x * cos_r - box_y * sin_r
+    center_y = center[1] + box_x * sin_r + box_y * cos_r
+    return float(center_x), float(center_y), float(max(width, height) * LANDMARK_RECT_SCALE), rotation
+
+
+class TemporalTracker:
+    """Tracked hands of the last processed frame, their velocities and detector statistics."""
+
+    # Hands of one frame closer than this (mean landmark offset) are the same hand tracked twice
+    DUPLICATE_DISTANCE = 0.02
+    # Largest mean landmark offset between frames that still counts as the same hand
+    MATCH_DISTANCE = 0.2
+    # Detector calls per second are measured over this many seconds
+    STATS_WINDOW = 5.0
+
+    def __init__(self, rescan_interval: float = 0.5, smoothing: float = 0.5, max_lookahead: float = 0.1):
+        """
+        Args:
+            rescan_interval (float): Seconds between detections while fewer hands than
+                the maximum are tracked, so that a hand entering the view is found.
+            smoothing (float): Weight of the newest measurement in the velocity estimate.
+            max_lookahead (float): Longest extrapolation in seconds (after a skipped or
+                slow frame the hand is predicted at most this far ahead).
+        """
+        self.rescan_interval = rescan_interval
+        self.smoothing = smoothing
+        self.max_lookahead = max_lookahead
+        self.hands = []
+        self.velocities = []
+        self.last_time = None
+        self.frame_interval = 0.0
+        self.last_detection = None
+
+        self.detector_calls = 0
+        self.tracked_frames = 0  # Frames that needed no detection
+        self.losses = 0
+        self._first_time = None
+        self._detection_times = deque(maxlen=512)
+
+    def predict(self, timestamp=None):
+        """Predicted (21, 3) landmarks of each tracked hand at `timestamp` (default: one frame ahead)."""
+        if not self.hands:
+            return []
+        if timestamp is None:
+            lookahead = self.frame_interval
+        else:
+            lookahead = timestamp - self.last_time
+        lookahead = min(max(lookahead, 0.0), self.max_lookahead)
+        return [hand + velocity * lookahead for hand, velocity in zip(self.hands, self.velocities)]
+
+    def needs_detection(self, timestamp, found, expected, max_hands):
+        """
+        Whether to run full detection after the landmark pass at the predicted positions.
+
+        Args:
+            found (int): Hands the landmark pass confirmed.
+            expected (int): Hands it was run for (the number of predictions).
+            max_hands (int): Most hands the backend reports.
+        """
+        if found < expected:
+            self.losses += 1
+            return True
+        if found == 0:
+            return True
+        if found < max_hands and (self.last_detection is None or
+                                  timestamp - self.last_detection >= self.rescan_interval):
+            return True
+        self.tracked_frames += 1
+        return False
+
+    def record_detection(self, timestamp):
+        """Count a full detector run."""
+        self.detector_calls += 1
+        self.last_detection = timestamp
+        self._detection_times.append(timestamp)
+
+    def update(self, timestamp, hands):
+        """
+        Remember the hands of a processed frame and update their velocities.
+
+        Returns:
+            list: `hands` without duplicates (two tracks that converged onto one hand).
+        """
+        if self._first_time is None:
+            self._first_time = timestamp
+        elapsed = timestamp - self.last_time if self.last_time is not None else 0.0
+        if elapsed > 0:
+            self.frame_interval = elapsed
+
+        unique = []
+        velocities = []
+        for hand in hands:
+            if any(np.abs(hand[:, :2] - other[:, :2]).mean() < self.DUPLICATE_DISTANCE for other in unique):
+                continue
+            velocity = np.zeros_like(hand)
+            previous = self._closest(hand)
+            if previous is not None and 0 < elapsed <= self.max_lookahead * 2:
+                measured = (hand - self.hands[previous]) / elapsed
+                velocity = self.smoothing * measured + (1 - self.smoothing) * self.velocities[previous]
+            unique.append(hand)
+            velocities.append(velocity)
+
+        self.hands = unique
+        self.velocities = velocities
+        self.last_time = timestamp
+        return unique
+
+    def _closest(self, hand):
+        best, best_distance = None, self.MATCH_DISTANCE
+        for index, previous in enumerate(self.hands):
+            distance = np.abs(hand[:, :2] - previous[:, :2]).mean()
+            if distance < best_distance:
+                best, best_distance = index, distance
+        return best
+
+    def reset(self):
+        """Forget the tracked hands (e.g. after a pause); the counters are kept."""
+        self.hands = []
+        self.velocities = []
+        self.last_time = None
+        self.last_detection = None
+
+    def get_stats(self):
+        detector_rate = 0.0
+        if self.last_time is not None:
+            span = min(self.STATS_WINDOW, self.last_time - self._first_time)
+            if span > 0:
+                recent = sum(1 for t in self._detection_times if t > self.last_time - span)
+                detector_rate = recent / span
+        return {
+            "tracked_hands": len(self.hands),
+            "detector_calls": self.detector_calls,
+            "detector_calls_per_s": detector_rate,
+            "tracked_frames": self.tracked_frames,
+            "losses": self.losses
+        }
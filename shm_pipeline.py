@@ -0,0 +1,401 @@
+"""
+Optional multi-process inference (config "inference_workers" > 0).
+
+The camera thread copies each frame it wants processed into a slot of a
+``multiprocessing.shared_memory`` ring (one slot per worker) and sends the worker
+just a sequence number. Each worker process runs MediaPipe detection on its slot
+and sends back an (H, 21, 3) landmark array, so frames never cross a pipe and
+inference never holds the main process' GIL. Gesture handling and input stay in
+the main process, on the recognizer's result thread.
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from logging_setup import setup_logging, shutdown_logging
+from recognizers import hand_landmarks as hl
+from recognizers.base import LandmarkRecognizer, RecognitionResult
+from recognizers.mediapipe_recognizer import MediapipeRecognizer
+
+logger = logging.getLogger(__name__)
+
+EMPTY_HANDS = np.zeros((0, hl.NUM_LANDMARKS, 3), dtype=np.float32)
+
+
+def _attach_shared_memory(name):
+    """Attach to the block created by the main process, which stays responsible for unlinking it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: spawned workers share the main process' resource tracker, where the
+        # block is already registered, so attaching normally does not add a second owner
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(shm_name, slot_shape, slot, generation, tasks, results, roi_tracking, roi_padding,
+                 max_num_hands=1, temporal_tracking=True, log_level=logging.INFO):
+    """Entry point of an inference worker process: detect hands in its slot on request."""
+    setup_logging(log_level)
+    shm = _attach_shared_memory(shm_name)
+    frame_bytes = int(np.prod(slot_shape))
+    frame = np.ndarray(slot_shape, dtype=np.uint8, buffer=shm.buf, offset=slot * frame_bytes)
+    detector = MediapipeRecognizer(None, max_num_hands=max_num_hands)
+    # The slot is a copy: the main process draws the returned landmarks on the frame it shows
+    detector.draw_landmarks = False
+    detector.set_roi_tracking(roi_tracking, roi_padding)
+    detector.set_temporal_tracking(temporal_tracking)
+    results.put(("ready", generation, slot))
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            if task[0] == "roi":
+                detector.set_roi_tracking(task[1], task[2])
+                detector.set_temporal_tracking(task[3])
+                continue
+            _, seq, scale = task
+            hands, color_time, inference_time = detector.detect(frame, scale)
+            hands = np.stack(hands) if hands else EMPTY_HANDS
+            results.put(("result", generation, slot, seq, hands, color_time, inference_time))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.close()
+        del frame
+        shm.close()
+        shutdown_logging()
+
+
+class _Worker:
+    def __init__(self, process, tasks):
+        self.process = process
+        self.tasks = tasks
+
+
+class WorkerPoolRecognizer(LandmarkRecognizer):
+    """
+    MediaPipe recognition in worker processes, with the same interface as MediapipeRecognizer.
+
+    A frame is only submitted when a worker is idle (otherwise it is skipped, like the
+    latest-frame policy of FrameGrabber), so with N workers up to N frames are in
+    flight. Results that finish after a newer frame's result are dropped.
+    """
+
+    # Gesture handling, and therefore InputController, runs on this recognizer's result
+    # thread, so that thread also applies InputController config changes
+    drives_input_controller = True
+    supports_roi_tracking = True
+
+    # Config keys applied by apply_config_changes(); ROI and tracking settings are forwarded to the workers
+    CONFIG_KEYS = LandmarkRecognizer.CONFIG_KEYS + ("roi_tracking", "roi_padding", "temporal_tracking")
+
+    # Seconds between checks for workers that died
+    WORKER_CHECK_INTERVAL = 0.5
+    # Landmarks older than this (seconds) are no longer drawn on the preview
+    OVERLAY_MAX_AGE = 0.5
+
+    def __init__(self, input_controller, workers: int = 1, latency_tracker=None, clock=time.time,
+                 config_manager=None, max_num_hands=None):
+        self.worker_count = max(1, min(8, int(workers)))
+        self.roi_tracking = False
+        self.roi_padding = 0.6
+        self.temporal_tracking = True
+        super().__init__(input_controller, latency_tracker=latency_tracker, clock=clock,
+                         config_manager=config_manager, max_num_hands=max_num_hands)
+
+        self._context = multiprocessing.get_context("spawn")
+        self._results = self._context.Queue()
+        self._lock = threading.Lock()
+        self._shm = None
+        self._frames = None
+        self._slot_shape = None
+        self._workers = []
+        self._generation = 0
+        self._free_slots = deque()
+        self._in_flight = {}  # slot -> (seq, submit clock time, capture_time, submit perf_counter)
+        self._restart_thread = None
+        self._roi_settings = (self.roi_tracking, self.roi_padding, self.temporal_tracking)
+
+        self._seq = 0
+        self._last_handled_seq = 0
+        self._latest_hands = (0.0, EMPTY_HANDS)  # (frame time, hands) of the newest result, for the preview
+        self.results_dropped = 0
+        self.worker_restarts = 0
+
+        self._stop_event = threading.Event()
+        self._result_thread = threading.Thread(target=self._result_loop, name="InferenceResults", daemon=True)
+        self._result_thread.start()
+        logger.info("Running hand detection in %d worker process(es).", self.worker_count)
+
+    # --- Camera thread ---
+    def process_frame(self, frame, capture_time=None):
+        """Hand the frame to an idle worker; results are handled asynchronously."""
+        if self._stop_event.is_set():
+            return RecognitionResult(frame)
+        self._submit(frame, capture_time)
+        # Only after the frame was copied for the worker, which must see it without the overlay
+        self._draw_latest_hands(frame)
+        return RecognitionResult(frame)
+
+    def _submit(self, frame, capture_time):
+        if frame.shape != self._slot_shape:
+            # Frames are skipped until the workers for this size are running
+            self._restart_workers(frame.shape)
+            self.frames_skipped += 1
+            return
+
+        current_time = self.clock()
+        governor = self.governor
+        if not governor.should_process(current_time):
+            self.frames_skipped += 1
+            return
+
+        with self._lock:
+            if not self._free_slots:
+                self.frames_skipped += 1
+                return
+            slot = self._free_slots.popleft()
+            self._seq += 1
+            seq = self._seq
+            submitted = time.perf_counter()
+            self._in_flight[slot] = (seq, current_time, capture_time, submitted)
+            worker = self._workers[slot]
+        # Paced by submission here, on the thread that asks should_process(); the result
+        # thread only reports what the frame cost and whether it had a hand
+        governor.mark_processed(current_time)
+
+        if self.latency_tracker and capture_time is not None:
+            self.latency_tracker.record("queue_wait", submitted - capture_time)
+        np.copyto(self._frames[slot], frame)
+        worker.tasks.put(("frame", seq, governor.scale))
+
+    def _draw_latest_hands(self, frame):
+        """Draw the hands of the newest result, which lags the frame by the inference time."""
+        timestamp, hands = self._latest_hands
+        if len(hands) and self.clock() - timestamp <= self.OVERLAY_MAX_AGE:
+            for hand in hands:
+                hl.draw_hand(frame, hand)
+
+    def _restart_workers(self, shape):
+        """
+        Replace the workers on a background thread: stopping the old ones can take seconds,
+        which would stall the camera thread. Until it is done `_slot_shape` is None, so the
+        camera thread skips frames and never touches the shared memory being replaced.
+        """
+        if self._restart_thread is not None and self._restart_thread.is_alive():
+            return
+        self._slot_shape = None
+        self._restart_thread = threading.Thread(target=self._start_workers, args=(shape,),
+                                                name="InferenceWorkerRestart", daemon=True)
+        self._restart_thread.start()
+
+    def _start_workers(self, shape):
+        """(Re)create the shared-memory ring and the workers for frames of `shape`."""
+        self._stop_workers()
+        if self._stop_event.is_set():
+            return
+        frame_bytes = int(np.prod(shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * self.worker_count)
+        self._frames = np.ndarray((self.worker_count,) + tuple(shape), dtype=np.uint8, buffer=self._shm.buf)
+        with self._lock:
+            self._workers = [self._spawn_worker(slot) for slot in range(self.worker_count)]
+        self._slot_shape = shape
+
+    def _spawn_worker(self, slot):
+        tasks = self._context.Queue()
+        roi_tracking, roi_padding, temporal_tracking = self._roi_settings
+        process = self._context.Process(
+            target=_worker_main, name=f"InferenceWorker-{slot}", daemon=True,
+            args=(self._shm.name, self._frames.shape[1:], slot, self._generation, tasks, self._results,
+                  roi_tracking, roi_padding, self.max_num_hands, temporal_tracking,
+                  logging.getLogger().getEffectiveLevel()))
+        process.start()
+        return _Worker(process, tasks)
+
+    def _stop_workers(self):
+        with self._lock:
+            # Messages still on their way from the old workers are ignored from now on
+            self._generation += 1
+            workers, self._workers = self._workers, []
+            self._free_slots.clear()
+            self._in_flight.clear()
+        for worker in workers:
+            worker.tasks.put(None)
+        for worker in workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        if self._shm is not None:
+            self._frames = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        self._slot_shape = None
+
+    # --- Result thread ---
+    def _result_loop(self):
+        next_check = time.monotonic() + self.WORKER_CHECK_INTERVAL
+        while not self._stop_event.is_set():
+            try:
+                message = self._results.get(timeout=self.WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                break
+            # On a deadline, not only when the queue is quiet: the surviving workers keep
+            # results coming while a dead one holds on to its slot
+            now = time.monotonic()
+            if now >= next_check:
+                next_check = now + self.WORKER_CHECK_INTERVAL
+                self._check_workers()
+            if message is None:
+                continue
+            if message[0] == "control":
+                self._run_control(*message[1:])
+                continue
+
+            kind, generation, slot = message[:3]
+            with self._lock:
+                if generation != self._generation:
+                    continue  # From workers that have been replaced
+                if kind == "ready":
+                    self._free_slots.append(slot)
+                    continue
+                submitted = self._in_flight.pop(slot, None)
+                self._free_slots.append(slot)
+            seq, hands, color_time, inference_time = message[3:]
+            if submitted is None or submitted[0] != seq:
+                continue
+            try:
+                self._handle_result(seq, hands, color_time, inference_time, submitted)
+            except Exception as e:
+                logger.error("Error during gesture handling: %s", e)
+
+    def _handle_result(self, seq, hands, color_time, inference_time, submitted):
+        received = time.perf_counter()
+        _, submit_time, capture_time, submit_perf = submitted
+
+        # This thread drives the input controller, so it applies config changes too
+        self.input_controller.apply_config_changes()
+        self.apply_config_changes()
+        self._sync_roi_settings()
+
+        # Workers run in parallel, so each costs a core only 1/N of the time
+        self.governor.record_result(submit_time, len(hands) > 0, (color_time + inference_time) / self.worker_count)
+        if seq < self._last_handled_seq:
+            self.results_dropped += 1  # A newer frame already finished
+            return
+        self._last_handled_seq = seq
+
+        tracker = self.latency_tracker
+        if tracker:
+            tracker.record("color_convert", color_time)
+            tracker.record("inference", inference_time)
+            tracker.record("ipc", max(0.0, received - submit_perf - color_time - inference_time))
+
+        self._latest_hands = (submit_time, hands)
+        self.input_controller.frame_capture_time = capture_time
+        self.record_landmarks(submit_time, list(hands))
+        self.handle_landmarks(hands, submit_time)
+        self.count_processed_frame()
+
+    def _sync_roi_settings(self):
+        settings = (self.roi_tracking, self.roi_padding, self.temporal_tracking)
+        if settings == self._roi_settings:
+            return
+        self._roi_settings = settings
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.tasks.put(("roi",) + settings)
+
+    def _check_workers(self):
+        """Restart workers that died (e.g. crashed inside the model)."""
+        with self._lock:
+            for slot, worker in enumerate(self._workers):
+                if worker.process.is_alive() or self._stop_event.is_set():
+                    continue
+                logger.warning("Inference worker %d exited (code %s), restarting.", slot, worker.process.exitcode)
+                self._in_flight.pop(slot, None)
+                if slot in self._free_slots:
+                    self._free_slots.remove(slot)
+                self._workers[slot] = self._spawn_worker(slot)
+                self.worker_restarts += 1
+
+    def _run_control(self, action, seq):
+        try:
+            if action == "pause":
+                # Results of frames submitted before the pause must not press anything again
+                self._last_handled_seq = max(self._last_handled_seq, seq + 1)
+                self._latest_hands = (0.0, EMPTY_HANDS)
+                super().pause()
+            else:
+                super().release_gestures()
+        except Exception as e:
+            logger.error("Error releasing gestures: %s", e)
+
+    def _on_result_thread(self):
+        """True where gesture state may be touched: on the result thread, or once it has stopped."""
+        thread = self._result_thread
+        return threading.current_thread() is thread or not thread.is_alive()
+
+    def release_gestures(self):
+        """Reset all gesture state, releasing a held button (done by the result thread, which drives the engine)."""
+        if self._on_result_thread():
+            super().release_gestures()
+        else:
+            self._results.put(("control", "release_gestures", self._seq))
+
+    def pause(self):
+        """暂停时释放按住状态并清空手势状态（交给结果线程执行，避免与手势处理并发）"""
+        if self._on_result_thread():
+            super().pause()
+        else:
+            self._results.put(("control", "pause", self._seq))
+
+    def apply_config(self, values):
+        super().apply_config(values)
+        if values.get("roi_tracking") is not None or values.get("roi_padding") is not None:
+            enabled = values.get("roi_tracking")
+            self.set_roi_tracking(self.roi_tracking if enabled is None else enabled, values.get("roi_padding"))
+        if values.get("temporal_tracking") is not None:
+            self.set_temporal_tracking(values["temporal_tracking"])
+
+    def set_roi_tracking(self, enabled: bool, padding: float = None):
+        """启用/禁用 ROI 跟踪（由工作进程执行，结果线程负责同步设置）"""
+        self.roi_tracking = bool(enabled)
+        if padding is not None:
+            self.roi_padding = max(0.1, min(2.0, padding))
+
+    def set_temporal_tracking(self, enabled: bool):
+        """启用/禁用帧间运动预测（由工作进程执行）"""
+        self.temporal_tracking = bool(enabled)
+
+    def close(self):
+        self._stop_event.set()
+        self._result_thread.join(timeout=1)
+        super().close()
+        if self._restart_thread is not None:
+            self._restart_thread.join()
+        self._stop_workers()
+        self._results.close()
+
+    def get_performance_stats(self):
+        """返回实测性能统计信息（处理帧率、跳帧数、工作进程状态、各阶段延迟）"""
+        stats = super().get_performance_stats()
+        with self._lock:
+            in_flight = len(self._in_flight)
+        stats.update({
+            "workers": self.worker_count,
+            "in_flight": in_flight,
+            "results_dropped": self.results_dropped,
+            "worker_restarts": self.worker_restarts
+        })
+        return stats
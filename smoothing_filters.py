@@ -0,0 +1,228 @@
+"""
+Cursor smoothing filters for InputController.
+
+Every filter takes raw screen positions with a timestamp and returns the smoothed
+position, keeping only O(1) state per sample:
+
+- ``weighted_average``: the original (i+1)**1.5-weighted average over the last 5
+  samples, followed by InputController's constant-factor interpolation.
+- ``one_euro``: One Euro filter (Casiez et al.), an adaptive low-pass whose cutoff
+  rises with speed: little jitter at rest, little lag when moving fast.
+- ``kalman``: constant-velocity Kalman filter per axis.
+
+`smoothing_factor` (0.1-1.0, lower is smoother) is mapped onto each filter's main
+parameter, so the existing slider keeps working whatever filter is selected.
+"""
+import logging
+import math
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalized_factor(smoothing_factor):
+    """Map smoothing_factor 0.1-1.0 to 0.0-1.0."""
+    return (max(0.1, min(1.0, smoothing_factor)) - 0.1) / 0.9
+
+
+class WeightedAverageFilter:
+    """原有的加权平均平滑（最近 5 个位置，权重 (i+1)**1.5）"""
+
+    # InputController still applies its smoothing_factor interpolation after this filter
+    uses_output_lerp = True
+
+    def __init__(self, smoothing_factor: float = 0.3, history: int = 5, min_samples: int = 3):
+        self.history = deque(maxlen=history)
+        self.min_samples = min_samples
+        self.weights = [(i + 1) ** 1.5 for i in range(history)]
+
+    def set_smoothing_factor(self, smoothing_factor: float):
+        # Smoothing strength is applied by InputController's interpolation step
+        pass
+
+    def reset(self):
+        self.history.clear()
+
+    def filter(self, x: float, y: float, timestamp: float):
+        self.history.append((x, y))
+        if len(self.history) < self.min_samples:
+            return x, y
+
+        total_weight = 0.0
+        weighted_x = 0.0
+        weighted_y = 0.0
+        for weight, (hx, hy) in zip(self.weights, self.history):
+            weighted_x += hx * weight
+            weighted_y += hy * weight
+            total_weight += weight
+        return weighted_x / total_weight, weighted_y / total_weight
+
+
+class _LowPass:
+    """Single-pole low-pass filter used by the One Euro filter."""
+
+    def __init__(self):
+        self.value = None
+
+    def apply(self, value, alpha):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value = alpha * value + (1 - alpha) * self.value
+        return self.value
+
+
+class OneEuroFilter:
+    """One Euro 自适应低通滤波：静止时去抖，快速移动时低延迟"""
+
+    uses_output_lerp = False
+
+    def __init__(self, smoothing_factor: float = 0.3, beta: float = 0.005, d_cutoff: float = 1.0):
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.set_smoothing_factor(smoothing_factor)
+        self.reset()
+
+    def set_smoothing_factor(self, smoothing_factor: float):
+        # 0.3 Hz (very smooth) .. 5 Hz (very responsive) cutoff at rest
+        self.min_cutoff = 0.3 + 4.7 * _normalized_factor(smoothing_factor)
+
+    def reset(self):
+        self._x, self._y = _LowPass(), _LowPass()
+        self._dx, self._dy = _LowPass(), _LowPass()
+        self._last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, x: float, y: float, timestamp: float):
+        if self._last_time is None:
+            self._last_time = timestamp
+            return self._x.apply(x, 1.0), self._y.apply(y, 1.0)
+
+        dt = timestamp - self._last_time
+        if dt <= 0:
+            dt = 1.0 / 30
+        self._last_time = timestamp
+
+        # Filtered speed drives the cutoff: faster motion -> higher cutoff -> less lag
+        alpha_d = self._alpha(self.d_cutoff, dt)
+        dx = self._dx.apply((x - self._x.value) / dt, alpha_d)
+        dy = self._dy.apply((y - self._y.value) / dt, alpha_d)
+        speed = math.hypot(dx, dy)
+        alpha = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        return self._x.apply(x, alpha), self._y.apply(y, alpha)
+
+
+class KalmanFilter:
+    """恒速模型卡尔曼滤波（x、y 轴独立）"""
+
+    uses_output_lerp = False
+
+    def __init__(self, smoothing_factor: float = 0.3, measurement_noise: float = 25.0):
+        # Measurement noise variance in px^2 (5 px standard deviation by default)
+        self.measurement_noise = measurement_noise
+        self.set_smoothing_factor(smoothing_factor)
+        self.reset()
+
+    def set_smoothing_factor(self, smoothing_factor: float):
+        # Process noise (acceleration variance, px^2/s^4): 1e4 (very smooth) .. 1e7 (very responsive)
+        self.process_noise = 10 ** (4 + 3 * _normalized_factor(smoothing_factor))
+
+    def reset(self):
+        # Per-axis state [position, velocity] and 2x2 covariance, stacked for x and y
+        self._state = None
+        self._covariance = None
+        self._last_time = None
+
+    def filter(self, x: float, y: float, timestamp: float):
+        measurement = np.array([x, y], dtype=np.float64)
+        if self._state is None:
+            self._state = np.stack([measurement, np.zeros(2)], axis=1)  # (2 axes, [pos, vel])
+            self._covariance = np.tile(np.diag([self.measurement_noise, 1e4]), (2, 1, 1))
+            self._last_time = timestamp
+            return x, y
+
+        dt = timestamp - self._last_time
+        if dt <= 0:
+            dt = 1.0 / 30
+        self._last_time = timestamp
+
+        # Predict
+        transition = np.array([[1.0, dt], [0.0, 1.0]])
+        q = self.process_noise
+        process = q * np.array([[dt ** 4 / 4, dt ** 3 / 2], [dt ** 3 / 2, dt ** 2]])
+        state = self._state @ transition.T
+        covariance = transition @ self._covariance @ transition.T + process
+
+        # Update (only the position is measured)
+        innovation = measurement - state[:, 0]
+        innovation_var = covariance[:, 0, 0] + self.measurement_noise
+        gain = covariance[:, :, 0] / innovation_var[:, None]
+        state = state + gain * innovation[:, None]
+        covariance = covariance - gain[:, :, None] * covariance[:, 0, None, :]
+
+        self._state = state
+        self._covariance = covariance
+        return float(state[0, 0]), float(state[1, 0])
+
+
+FILTERS = {
+    "weighted_average": WeightedAverageFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def create_filter(name: str, smoothing_factor: float = 0.3, **params):
+    """Create a smoothing filter by name; unknown names fall back to the weighted average."""
+    filter_class = FILTERS.get(name)
+    if filter_class is None:
+        logger.warning("Unknown smoothing filter '%s', using weighted_average.", name)
+        filter_class = WeightedAverageFilter
+    return filter_class(smoothing_factor, **params)
+
+
+def measure_filter(smoothing_filter, timestamps, positions, max_lag: float = 0.3):
+    """
+    Measure the lag and jitter a filter adds on recorded input.
+
+    Args:
+        smoothing_filter: A filter instance (it is reset first).
+        timestamps: (N,) sample times in seconds.
+        positions: (N, 2) raw screen positions in pixels.
+        max_lag (float): Largest lag considered, in seconds.
+
+    Returns:
+        dict: "lag_ms" (time shift that best aligns the filtered trace with the raw one),
+        "mean_error_px" (mean distance to the raw input) and "jitter_px" (mean magnitude of
+        the second difference of the output, i.e. frame-to-frame wobble).
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    if len(timestamps) < 3:
+        return {"lag_ms": 0.0, "mean_error_px": 0.0, "jitter_px": 0.0}
+
+    smoothing_filter.reset()
+    filtered = np.array([smoothing_filter.filter(x, y, t) for t, (x, y) in zip(timestamps, positions)])
+
+    # Find the delay d that minimizes |filtered(t) - raw(t - d)|
+    best_lag, best_error = 0.0, np.inf
+    for lag in np.arange(0.0, max_lag, 0.005):
+        shifted = np.stack([np.interp(timestamps - lag, timestamps, positions[:, axis]) for axis in range(2)], axis=1)
+        valid = timestamps - lag >= timestamps[0]
+        if not valid.any():
+            break
+        error = np.mean(np.linalg.norm(filtered[valid] - shifted[valid], axis=1))
+        if error < best_error:
+            best_lag, best_error = lag, error
+
+    return {
+        "lag_ms": best_lag * 1000,
+        "mean_error_px": float(np.mean(np.linalg.norm(filtered - positions, axis=1))),
+        "jitter_px": float(np.mean(np.linalg.norm(np.diff(filtered, n=2, axis=0), axis=1)))
+    }
@@ -0,0 +1,62 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Import-time breakdown for `python main.py --profile-startup`.
+
+    Each measured stage prints the time since the profiler was created (i.e. since
+    main.py started), how long the stage took and how many modules it imported.
+    Stages that import nothing new (a lazy import that already happened) stay silent,
+    so function-level imports can be wrapped unconditionally.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.stages = []  # (label, seconds, modules imported)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, label):
+        if not self.enabled:
+            yield
+            return
+        modules_before = len(sys.modules)
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            imported = len(sys.modules) - modules_before
+            if imported > 0:
+                self._report(label, time.perf_counter() - begin, imported)
+
+    def mark(self, label):
+        """Report a milestone, e.g. the tray icon becoming visible."""
+        if self.enabled:
+            self._report(label, None, 0)
+
+    def _report(self, label, seconds, imported):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        thread = threading.current_thread()
+        where = "" if thread is threading.main_thread() else f" [{thread.name}]"
+        with self._lock:
+            if seconds is None:
+                print(f"[startup] {elapsed_ms:8.1f} ms  -- {label}{where}")
+                return
+            self.stages.append((label, seconds, imported))
+            print(f"[startup] {elapsed_ms:8.1f} ms  {label}: {seconds * 1000:.1f} ms, "
+                  f"{imported} modules{where}")
+
+    def summary(self):
+        """Print the measured stages, slowest first."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stages = sorted(self.stages, key=lambda stage: stage[1], reverse=True)
+        print("[startup] Import time by stage:")
+        for label, seconds, imported in stages:
+            print(f"[startup]   {seconds * 1000:8.1f} ms  {label} ({imported} modules)")
@@ -0,0 +1,256 @@
+import itertools
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Record kinds
+LATENCY = "latency"  # name: pipeline stage, value: seconds (forwarded by LatencyTracker)
+FRAME = "frame"      # name: "captured", value: seconds since the previous frame
+DROP = "drop"        # name: what was dropped ("frame", "input")
+GESTURE = "gesture"  # name: GestureEvent type (cursor moves are not recorded)
+INPUT = "input"      # name: input action performed (click, mouse_down, scroll, ...)
+ERROR = "error"      # name: failing component ("camera_read", "camera_stall", "input_backend", ...)
+CAMERA = "camera"    # name: capture supervisor event ("reconnected")
+
+# Latency quantiles exported to Prometheus, computed over the records still in the buffer
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Telemetry:
+    """
+    Fixed-size ring buffer of structured telemetry records.
+
+    Writers (camera, inference, input threads) never take a lock: a record claims
+    its slot with an atomic sequence counter and overwrites the oldest record.
+    Totals per (kind, name) are accumulated by readers, which catch up on the
+    records written since the previous read (the TelemetryServer does so twice a
+    second); records overwritten before any reader saw them are counted as lost.
+    Records are
+    (seq, wall-clock time, kind, name, value, fields or None).
+    """
+
+    def __init__(self, capacity: int = 16384):
+        self.capacity = max(16, int(capacity))
+        self._buffer = [None] * self.capacity
+        self._sequence = itertools.count(1)
+
+        # Reader side, guarded by the lock
+        self._lock = threading.Lock()
+        self._read_seq = 1
+        self._totals = {}  # (kind, name) -> [count, sum of values]
+        self.records_lost = 0
+
+    def record(self, kind: str, name: str, value: float = None, **fields):
+        """Append a record (safe from any thread)."""
+        seq = next(self._sequence)
+        self._buffer[seq % self.capacity] = (seq, time.time(), kind, name, value, fields or None)
+
+    def records(self, since: int = 0, kind: str = None):
+        """Records with a sequence number above `since`, oldest first, as dicts."""
+        self.aggregate()
+        return [self._to_dict(record) for record in self._snapshot()
+                if record[0] > since and (kind is None or record[2] == kind)]
+
+    def _snapshot(self):
+        records = [record for record in list(self._buffer) if record is not None]
+        records.sort(key=lambda record: record[0])
+        return records
+
+    @staticmethod
+    def _to_dict(record):
+        seq, timestamp, kind, name, value, fields = record
+        result = {"seq": seq, "time": timestamp, "kind": kind, "name": name}
+        if value is not None:
+            result["value"] = value
+        if fields:
+            result.update(fields)
+        return result
+
+    def aggregate(self):
+        """Add the records written since the previous call to the totals."""
+        buffer, capacity = self._buffer, self.capacity
+        with self._lock:
+            seq = self._read_seq
+            while True:
+                record = buffer[seq % capacity]
+                if record is None or record[0] < seq:
+                    break  # Not written yet
+                if record[0] > seq:
+                    # Writers lapped this reader: skip to the oldest record that can still be in the buffer
+                    oldest = record[0] - capacity + 1
+                    self.records_lost += oldest - seq
+                    seq = oldest
+                    continue
+                totals = self._totals.get((record[2], record[3]))
+                if totals is None:
+                    totals = self._totals[(record[2], record[3])] = [0, 0.0]
+                totals[0] += 1
+                if record[4] is not None:
+                    totals[1] += record[4]
+                seq += 1
+            self._read_seq = seq
+
+    def get_totals(self):
+        """{(kind, name): (count, sum of values)} since start-up."""
+        self.aggregate()
+        with self._lock:
+            return {key: tuple(totals) for key, totals in self._totals.items()}
+
+    def get_stats(self):
+        """返回遥测缓冲区状态与各类记录的累计数量"""
+        totals = self.get_totals()
+        counts = {}
+        for (kind, name), (count, _) in totals.items():
+            counts.setdefault(kind, {})[name] = count
+        return {
+            "capacity": self.capacity,
+            "records_lost": self.records_lost,
+            "counts": counts
+        }
+
+    def prometheus_text(self, gauges=None):
+        """
+        Render the totals, latency quantiles and `gauges` in the Prometheus text format.
+
+        Args:
+            gauges (dict): {metric name: (help text, value)}; None values are skipped.
+        """
+        totals = self.get_totals()
+        lines = ["# HELP palmcontrol_telemetry_records_total Telemetry records by kind and name.",
+                 "# TYPE palmcontrol_telemetry_records_total counter"]
+        for (kind, name), (count, _) in sorted(totals.items()):
+            if kind != LATENCY:
+                lines.append(f'palmcontrol_telemetry_records_total{{kind="{kind}",name="{_escape(name)}"}} {count}')
+        lines += ["# HELP palmcontrol_telemetry_records_lost_total Records overwritten before they were aggregated.",
+                  "# TYPE palmcontrol_telemetry_records_lost_total counter",
+                  f"palmcontrol_telemetry_records_lost_total {self.records_lost}"]
+
+        samples = {}
+        for record in self._snapshot():
+            if record[2] == LATENCY:
+                samples.setdefault(record[3], []).append(record[4])
+        lines += ["# HELP palmcontrol_stage_latency_seconds Pipeline stage latency (quantiles over recent records).",
+                  "# TYPE palmcontrol_stage_latency_seconds summary"]
+        for (kind, stage), (count, total) in sorted(totals.items()):
+            if kind != LATENCY:
+                continue
+            values = sorted(samples.get(stage, ()))
+            for quantile in QUANTILES if values else ():
+                value = values[min(len(values) - 1, int(round(quantile * (len(values) - 1))))]
+                lines.append(f'palmcontrol_stage_latency_seconds{{stage="{_escape(stage)}",quantile="{quantile}"}} '
+                             f'{value:.6f}')
+            lines.append(f'palmcontrol_stage_latency_seconds_sum{{stage="{_escape(stage)}"}} {total:.6f}')
+            lines.append(f'palmcontrol_stage_latency_seconds_count{{stage="{_escape(stage)}"}} {count}')
+
+        for metric, (help_text, value) in (gauges or {}).items():
+            if value is None:
+                continue
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", f"{metric} {float(value):g}"]
+        return "\n".join(lines) + "\n"
+
+    def dump_jsonl(self, path, since: int = 0):
+        """Write the buffered records to a JSONL file. Returns the number of records written."""
+        records = self.records(since)
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(records)
+
+
+def _escape(label):
+    return str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class TelemetryServer:
+    """
+    Local HTTP endpoint for monitoring, served from a daemon thread:
+
+        /metrics   Prometheus text format (totals, stage latency, `gauges()`)
+        /records   Buffered records as JSONL (`?since=SEQ` and `?kind=KIND` filter them)
+        /stats     `stats()` as JSON, e.g. the application's performance stats
+    """
+
+    def __init__(self, telemetry, host: str = "127.0.0.1", port: int = 9464, gauges=None, stats=None):
+        """
+        Args:
+            gauges: Callable returning {metric name: (help text, value)} for /metrics.
+            stats: Callable returning a JSON-serializable dict for /stats.
+
+        Raises:
+            OSError: The address is in use or cannot be bound.
+        """
+        # http.server costs ~40 ms to import, so only when the endpoint is enabled
+        from http.server import ThreadingHTTPServer
+
+        self.telemetry = telemetry
+        self.gauges = gauges
+        self.stats = stats
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+
+            def service_actions(self):
+                # Runs between requests every poll interval: keeps the totals exact
+                telemetry.aggregate()
+
+        self._server = Server((host, port), _make_request_handler(self))
+        self.address = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.5,), name="TelemetryServer",
+                                        daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logger.info("Serving metrics on http://%s:%d/metrics", *self.address)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, path):
+        """Return (body, content type) for a GET request, or None for an unknown path."""
+        from urllib.parse import parse_qs, urlparse
+        url = urlparse(path)
+        if url.path == "/metrics":
+            gauges = self.gauges() if self.gauges else None
+            return self.telemetry.prometheus_text(gauges), "text/plain; version=0.0.4"
+        if url.path == "/records":
+            query = parse_qs(url.query)
+            since = int(query.get("since", ["0"])[0])
+            kind = query.get("kind", [None])[0]
+            body = "".join(json.dumps(record, ensure_ascii=False) + "\n"
+                           for record in self.telemetry.records(since, kind))
+            return body, "application/x-ndjson"
+        if url.path == "/stats":
+            stats = self.stats() if self.stats else self.telemetry.get_stats()
+            return json.dumps(stats, default=str), "application/json"
+        return None
+
+
+def _make_request_handler(owner):
+    from http.server import BaseHTTPRequestHandler
+
+    class TelemetryRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                response = owner.handle(self.path)
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+            if response is None:
+                self.send_error(404)
+                return
+            body, content_type = response
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes are not worth a line on the console
+
+    return TelemetryRequestHandler
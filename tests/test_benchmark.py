@@ -0,0 +1,66 @@
+import time
+import types
+
+import cv2
+import numpy as np
+import pytest
+
+import benchmark
+from recognizers import mediapipe_recognizer
+
+
+class SlowHands:
+    """Stands in for mp.solutions.hands.Hands: one hand moving right, `cost` seconds per call."""
+
+    cost = 0.0
+
+    def __init__(self, **options):
+        self.calls = 0
+
+    def process(self, image):
+        time.sleep(self.cost)
+        self.calls += 1
+        landmarks = [types.SimpleNamespace(x=0.3 + 0.01 * self.calls + 0.01 * (i % 5), y=0.5 + 0.01 * (i // 5), z=0.0)
+                     for i in range(21)]
+        return types.SimpleNamespace(multi_hand_landmarks=[types.SimpleNamespace(landmark=landmarks)])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def frames_dir(tmp_path, monkeypatch):
+    solutions = types.SimpleNamespace(
+        hands=types.SimpleNamespace(Hands=SlowHands, HAND_CONNECTIONS=()),
+        drawing_utils=types.SimpleNamespace(draw_landmarks=lambda *args, **kwargs: None))
+    monkeypatch.setattr(mediapipe_recognizer.mp, "solutions", solutions, raising=False)
+    for index in range(20):
+        cv2.imwrite(str(tmp_path / f"{index:03d}.png"), np.zeros((48, 64, 3), np.uint8))
+    return str(tmp_path)
+
+
+def _events(frames_dir, cost, monkeypatch):
+    monkeypatch.setattr(SlowHands, "cost", cost)
+    report = benchmark.run_benchmark(frames_dir, fps=30)
+    return report["events"]
+
+
+def test_output_does_not_depend_on_inference_cost(frames_dir, monkeypatch):
+    fast = _events(frames_dir, 0.0, monkeypatch)
+    # 40 ms per frame is over the governor's default CPU budget at 30 fps
+    slow = _events(frames_dir, 0.04, monkeypatch)
+    # Every frame after the first moves the cursor
+    assert len([event for event in fast if event["action"] == "move"]) == 19
+    assert slow == fast
+
+
+def test_detector_calls_need_roi_tracking_on_mediapipe(frames_dir, capsys):
+    report = benchmark.run_benchmark(frames_dir, fps=30)
+    assert report["tracking"] is None
+    benchmark.print_report(report)
+    assert "Detector:        n/a" in capsys.readouterr().out
+
+    report = benchmark.run_benchmark(frames_dir, fps=30, roi_tracking=True)
+    assert report["tracking"]["detector_calls"] == 1
+    benchmark.print_report(report)
+    assert "Detector:        1 calls" in capsys.readouterr().out
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import stat
+import time
+
+import pytest
+
+import config_manager
+from config_manager import CONFIG_SCHEMA, ConfigManager, ConfigSubscription, validate_config_value
+
+
+@pytest.mark.parametrize("key, value, message", [
+    ("smoothing_filter", "median", "smoothing_filter must be one of weighted_average, one_euro, kalman"),
+    ("log_level", "TRACE", "log_level must be one of"),
+    ("recognizer", "nope", "recognizer must be one of"),
+    ("sensitivity", "fast", "sensitivity must be a number"),
+    ("camera_id", None, "camera_id must be a number"),
+    ("roi_tracking", "maybe", "roi_tracking must be a boolean"),
+])
+def test_invalid_values_are_rejected(key, value, message):
+    with pytest.raises(ValueError, match=message):
+        validate_config_value(key, value)
+
+
+@pytest.mark.parametrize("key, value, expected", [
+    ("sensitivity", 99, 5.0),
+    ("sensitivity", -1, 0.5),
+    ("max_num_hands", "3", 3),
+    ("capture_stall_timeout", 0.1, 0.5),
+    ("metrics_port", 70000, 65535),
+    ("roi_tracking", "true", True),
+    ("roi_tracking", "0", False),
+    ("adaptive_frame_rate", 1, True),
+    ("camera_path", 42, "42"),
+    ("not_in_schema", [1, 2], [1, 2]),
+])
+def test_values_are_converted_and_clamped(key, value, expected):
+    result = validate_config_value(key, value)
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+def test_every_default_satisfies_the_schema(tmp_path):
+    defaults = ConfigManager(str(tmp_path / "config.json")).defaults
+    assert set(CONFIG_SCHEMA) <= set(defaults)
+    for key, value in defaults.items():
+        assert validate_config_value(key, value) == value, key
+
+
+def test_invalid_update_changes_nothing(tmp_path):
+    config = ConfigManager(str(tmp_path / "config.json"))
+    with pytest.raises(ValueError):
+        config.update({"sensitivity": 3.0, "hand_roles": "everyone"})
+    assert config.get("sensitivity") == 2.0
+
+
+def test_invalid_values_in_the_file_fall_back_to_defaults(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"smoothing_filter": "median", "sensitivity": "9", "hand_roles": "split"}))
+    config = ConfigManager(str(path))
+    assert config.get("smoothing_filter") == "weighted_average"
+    assert config.get("sensitivity") == 5.0
+    assert config.get("hand_roles") == "split"
+
+
+def test_subscription_batches_changes(tmp_path):
+    config = ConfigManager(str(tmp_path / "config.json"))
+    subscription = ConfigSubscription(config, ("sensitivity", "max_fps"))
+    config.set("sensitivity", 3.0)
+    config.update({"sensitivity": 4.0, "max_fps": 60, "autostart": True})
+    assert subscription.drain() == {"sensitivity": 4.0, "max_fps": 60}
+    assert not subscription.drain()
+    subscription.close()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_flush_keeps_the_file_mode(tmp_path):
+    path = tmp_path / "config.json"
+    config = ConfigManager(str(path))
+    os.chmod(path, 0o640)
+    config.set("sensitivity", 3.0)
+    config.flush()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert json.loads(path.read_text())["sensitivity"] == 3.0
+
+
+def test_failed_writes_back_off_and_warn_once(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "config.json"
+    config = ConfigManager(str(path), flush_delay=0.05)
+    attempts = []
+
+    def failing_mkstemp(*args, dir=None, **kwargs):
+        if dir == str(tmp_path):  # Not the flush threads of other tests' managers
+            attempts.append(time.monotonic())
+        raise OSError(28, "No space left on device")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(config_manager.tempfile, "mkstemp", failing_mkstemp)
+        config.set("sensitivity", 3.0)
+        time.sleep(1.0)
+    # Retried after 0.1, 0.2, 0.4 and 0.8 s instead of every 0.05 s
+    assert 3 <= len(attempts) <= 5
+    gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    assert all(later > earlier for earlier, later in zip(gaps, gaps[1:]))
+    warnings = [record for record in caplog.records
+                if record.levelno >= logging.WARNING and record.thread == config._flush_thread.ident]
+    assert len(warnings) == 1
+
+    # Once writing works again the pending change is saved
+    deadline = time.monotonic() + 5.0
+    while json.loads(path.read_text()).get("sensitivity") != 3.0:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
@@ -0,0 +1,84 @@
+import time
+
+from benchmark import RecordingInputBackend, VirtualClock
+from cursor_renderer import CursorRenderer
+from input_controller import InputController
+
+
+def _controller():
+    clock = VirtualClock(100.0)
+    backend = RecordingInputBackend(clock=clock)
+    controller = InputController(backend=backend, clock=clock)
+    # Ticks are driven by hand instead of by the renderer thread
+    controller.renderer = CursorRenderer(controller)
+    return controller, backend, clock
+
+
+def _tick(controller, clock, count):
+    for _ in range(count):
+        clock.now += controller.min_move_interval
+        controller.render_tick()
+
+
+def test_samples_only_set_the_target_and_ticks_move_the_cursor():
+    controller, backend, clock = _controller()
+    controller.move_mouse(0.3, 0.3)
+    assert backend.events == []
+
+    target = (controller.target_x, controller.target_y)
+    _tick(controller, clock, 1)
+    first = (backend.events[-1]["x"], backend.events[-1]["y"])
+    assert first != (960, 540) and first != tuple(int(value) for value in target)
+    # Converges on the target in small steps, with no further sample
+    _tick(controller, clock, 120)
+    assert (backend.events[-1]["x"], backend.events[-1]["y"]) == tuple(int(value) for value in target)
+
+
+def test_no_moves_are_sent_while_the_cursor_is_at_rest():
+    controller, backend, clock = _controller()
+    controller.move_mouse(0.3, 0.3)
+    _tick(controller, clock, 120)
+    moves = len(backend.events)
+    _tick(controller, clock, 30)
+    assert len(backend.events) == moves
+
+
+def test_a_steady_hand_motion_is_extrapolated_between_samples():
+    controller, backend, clock = _controller()
+    controller.smoothing_filter.filter = lambda x, y, timestamp: (x, y)
+    # Moving right on screen (mirrored x) at a constant speed, one sample per 30 fps frame
+    for step in range(5):
+        controller.move_mouse(0.6 - 0.02 * step, 0.5)
+        _tick(controller, clock, 4)
+    assert controller.target_velocity[0] > 0
+    # Between samples the cursor heads past the last sample, towards where the hand will be
+    predicted = controller.target_x + controller.target_velocity[0] * controller.max_prediction_time
+    _tick(controller, clock, 12)
+    assert controller.target_x < controller.current_x <= predicted
+    # Once the sample is stale, the cursor settles back on it
+    _tick(controller, clock, 120)
+    assert int(controller.current_x) == int(controller.target_x)
+
+
+class CountingController:
+    min_move_interval = 0.005
+
+    def __init__(self):
+        self.ticks = 0
+
+    def render_tick(self):
+        self.ticks += 1
+        if self.ticks == 2:
+            raise RuntimeError("backend went away")
+
+
+def test_renderer_thread_ticks_until_stopped_and_survives_errors():
+    controller = CountingController()
+    renderer = CursorRenderer(controller)
+    renderer.start()
+    time.sleep(0.1)
+    renderer.stop()
+    ticks = controller.ticks
+    assert ticks > 2 and renderer.ticks == ticks
+    time.sleep(0.05)
+    assert controller.ticks == ticks
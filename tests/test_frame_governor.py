@@ -0,0 +1,89 @@
+import pytest
+
+from frame_governor import FrameGovernor
+
+
+def _run(governor, start, duration, fps, hand_present, inference_time):
+    """Offer frames at `fps` for `duration` seconds; returns (processed count, end time)."""
+    processed = 0
+    now = start
+    for _ in range(int(duration * fps)):
+        if governor.should_process(now):
+            governor.record(now, hand_present, inference_time)
+            processed += 1
+        now += 1.0 / fps
+    return processed, now
+
+
+def test_goes_idle_without_a_hand_and_scales_down():
+    governor = FrameGovernor(max_fps=60, idle_fps=8, idle_after=2.0, idle_scale=0.5)
+    _, now = _run(governor, 0.0, 1.9, 120, False, 0.005)
+    assert governor.state == FrameGovernor.ACTIVE
+    assert governor.scale == 1.0
+
+    _, now = _run(governor, now, 0.2, 120, False, 0.005)
+    assert governor.state == FrameGovernor.IDLE
+    assert governor.scale == 0.5
+    processed, now = _run(governor, now, 2.0, 120, False, 0.005)
+    assert processed == pytest.approx(2.0 * 8, abs=2)
+
+
+def test_hand_recovers_the_active_rate_immediately():
+    governor = FrameGovernor(max_fps=60, idle_fps=8, idle_after=0.5)
+    _, now = _run(governor, 0.0, 1.0, 120, False, 0.005)
+    assert governor.state == FrameGovernor.IDLE
+
+    governor.record(now, True, 0.005)
+    assert governor.state == FrameGovernor.ACTIVE
+    assert governor.scale == 1.0
+    processed, _ = _run(governor, now + 1 / 120, 1.0, 120, True, 0.005)
+    assert processed == pytest.approx(60, abs=3)
+
+
+def test_slow_inference_backs_off_to_the_cpu_budget():
+    governor = FrameGovernor(max_fps=60, cpu_budget=0.5)
+    processed, now = _run(governor, 0.0, 2.0, 120, True, 0.040)
+    # 40 ms per frame within half a core: 12.5 fps
+    assert governor.target_interval == pytest.approx(0.080, rel=0.01)
+    assert processed / 2.0 == pytest.approx(12.5, rel=0.15)
+
+    # Cheaper inference raises the rate again as the cost average follows
+    _run(governor, now, 3.0, 120, True, 0.005)
+    assert governor.target_interval == pytest.approx(1 / 60)
+
+
+def test_disabled_runs_at_max_fps_whatever_the_cost():
+    governor = FrameGovernor(max_fps=30, enabled=False)
+    processed, _ = _run(governor, 0.0, 2.0, 120, False, 0.100)
+    assert processed == pytest.approx(60, abs=2)
+    assert governor.scale == 1.0
+    assert governor.get_stats()["state"] == "disabled"
+
+
+def test_reset_returns_to_active():
+    governor = FrameGovernor(idle_after=0.1)
+    _run(governor, 0.0, 0.5, 60, False, 0.005)
+    assert governor.state == FrameGovernor.IDLE
+    governor.reset()
+    assert governor.state == FrameGovernor.ACTIVE
+    assert governor.should_process(100.0)
+
+
+def test_configure_clamps_values():
+    governor = FrameGovernor()
+    governor.configure(max_fps=1000, idle_fps=0, idle_scale=2.0, cpu_budget=0.0)
+    assert (governor.max_fps, governor.idle_fps, governor.idle_scale, governor.cpu_budget) == (240.0, 1.0, 1.0, 0.05)
+
+
+def test_late_results_do_not_undo_newer_ones():
+    governor = FrameGovernor(idle_after=2.0)
+    governor.mark_processed(10.0)
+    governor.record_result(10.0, True, 0.01)
+    governor.mark_processed(10.1)
+    # An older frame's result arrives after the newer one
+    governor.record_result(7.0, False, 0.01)
+    assert governor.last_process_time == 10.1
+    assert governor.last_hand_time == 10.0
+    assert governor.state == FrameGovernor.ACTIVE
+    governor.record_result(9.5, True, 0.01)
+    assert governor.last_hand_time == 10.0
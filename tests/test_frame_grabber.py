@@ -0,0 +1,202 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+import frame_grabber
+from frame_grabber import CAMERA_OK, CAMERA_STOPPED, FrameGrabber
+from telemetry import Telemetry
+
+
+class FakeCapture:
+    """Stands in for cv2.VideoCapture; the class attributes script how the next handles behave."""
+
+    opened = []
+    block_first_read = False  # The first handle's first read hangs until `unblock` is set
+    fail_reads = 0  # Number of reads that fail, across handles
+    unblock = None
+
+    def __init__(self, source):
+        self.source = source
+        self.released = False
+        self.release_count = 0
+        self.reads = 0
+        self.index = len(FakeCapture.opened)
+        FakeCapture.opened.append(self)
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        self.released = True
+        self.release_count += 1
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: 64, cv2.CAP_PROP_FRAME_HEIGHT: 48, cv2.CAP_PROP_FPS: 30}.get(prop, 0)
+
+    def read(self):
+        self.reads += 1
+        time.sleep(0.005)
+        if self.index == 0 and self.reads == 1 and FakeCapture.block_first_read:
+            FakeCapture.unblock.wait()
+        if FakeCapture.fail_reads > 0:
+            FakeCapture.fail_reads -= 1
+            return False, None
+        return True, np.zeros((48, 64, 3), np.uint8)
+
+
+@pytest.fixture
+def capture(monkeypatch):
+    FakeCapture.opened = []
+    FakeCapture.block_first_read = False
+    FakeCapture.fail_reads = 0
+    FakeCapture.unblock = threading.Event()
+    monkeypatch.setattr(frame_grabber.cv2, "VideoCapture", FakeCapture)
+    monkeypatch.setattr(frame_grabber, "RECONNECT_INITIAL_DELAY", 0.01)
+    yield FakeCapture
+    FakeCapture.unblock.set()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_frames_are_delivered_latest_first(capture):
+    grabber = FrameGrabber(0)
+    assert grabber.start()
+    try:
+        first = grabber.read_latest(0, timeout=1.0)
+        assert first is not None
+        time.sleep(0.05)
+        second = grabber.read_latest(first[0], timeout=1.0)
+        assert second[0] > first[0] + 1  # Frames in between were replaced, not queued
+        assert grabber.frames_dropped > 0
+    finally:
+        grabber.stop()
+    assert grabber.get_health()["state"] == CAMERA_STOPPED
+
+
+def test_repeated_read_failures_reopen_the_camera(capture):
+    capture.fail_reads = frame_grabber.READ_FAILURES_BEFORE_REOPEN
+    telemetry = Telemetry()
+    grabber = FrameGrabber(0, telemetry=telemetry)
+    assert grabber.start()
+    try:
+        assert _wait_for(lambda: grabber.reconnects == 1 and grabber.frames_captured > 0)
+        assert capture.opened[0].released
+        assert grabber.read_failures == frame_grabber.READ_FAILURES_BEFORE_REOPEN
+        assert grabber.get_health()["state"] == CAMERA_OK
+    finally:
+        grabber.stop()
+    counts = telemetry.get_stats()["counts"]
+    assert counts["camera"] == {"reconnected": 1}
+    assert counts["error"]["camera_read"] == frame_grabber.READ_FAILURES_BEFORE_REOPEN
+
+
+def test_watchdog_replaces_a_capture_thread_blocked_in_read(capture):
+    capture.block_first_read = True
+    grabber = FrameGrabber(0, stall_timeout=0.2)
+    assert grabber.start()
+    try:
+        # The first read never returns on its own; the watchdog opens a second handle
+        assert grabber.read_latest(0, timeout=3.0) is not None
+        assert grabber.stalls == 1
+        assert grabber.reconnects == 1
+        assert len(capture.opened) == 2
+        assert grabber.get_health()["state"] == CAMERA_OK
+
+        # When the blocked read finally returns, the abandoned thread releases its handle and
+        # leaves the new one alone
+        blocked = capture.opened[0]
+        assert not blocked.released
+        capture.unblock.set()
+        assert _wait_for(lambda: blocked.released)
+        assert not capture.opened[1].released
+        seq = grabber.read_latest(0, timeout=1.0)[0]
+        assert grabber.read_latest(seq, timeout=1.0) is not None
+    finally:
+        grabber.stop()
+
+
+def test_stop_leaves_a_handle_blocked_in_read_to_its_thread(capture, monkeypatch):
+    monkeypatch.setattr(frame_grabber, "STOP_JOIN_TIMEOUT", 0.1)
+    capture.block_first_read = True
+    grabber = FrameGrabber(0, stall_timeout=30.0)
+    assert grabber.start()
+    blocked = capture.opened[0]
+    assert _wait_for(lambda: blocked.reads == 1)
+    grabber.stop()
+    assert grabber.cap is None
+    assert not blocked.released
+
+    capture.unblock.set()
+    assert _wait_for(lambda: blocked.released)
+    time.sleep(0.05)
+    assert blocked.release_count == 1
+
+
+class ModeCapture:
+    """A camera that supports only `modes` ({(width, height, fourcc): frames delivered?}); other requests are ignored."""
+
+    def __init__(self, modes):
+        self.modes = modes
+        self.width, self.height, self.fourcc = 320, 240, "YUYV"
+        self.requested = {}
+        self.calls = []
+
+    def set(self, prop, value):
+        self.calls.append(prop)
+        self.requested[prop] = value
+        if prop == cv2.CAP_PROP_FOURCC:
+            return True
+        fourcc = frame_grabber.decode_fourcc(self.requested.get(cv2.CAP_PROP_FOURCC, 0))
+        mode = (int(self.requested.get(cv2.CAP_PROP_FRAME_WIDTH, 0)),
+                int(self.requested.get(cv2.CAP_PROP_FRAME_HEIGHT, 0)), fourcc)
+        if mode in self.modes:
+            self.width, self.height, self.fourcc = mode
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FOURCC:
+            return cv2.VideoWriter_fourcc(*self.fourcc)
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width, cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: 30}.get(prop, 0)
+
+    def read(self):
+        delivers = self.modes.get((self.width, self.height, self.fourcc), False)
+        return delivers, None
+
+
+def test_fourcc_round_trips_and_unprintable_codes_are_empty():
+    assert frame_grabber.decode_fourcc(cv2.VideoWriter_fourcc(*"MJPG")) == "MJPG"
+    assert frame_grabber.decode_fourcc(0) == ""
+
+
+def test_pixel_format_is_requested_before_the_resolution():
+    cap = ModeCapture({})
+    frame_grabber.apply_capture_profile(cap, {"width": 640, "height": 480, "fps": 30, "fourcc": "MJPG",
+                                              "buffer_size": 1})
+    assert cap.calls == [cv2.CAP_PROP_FOURCC, cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT,
+                         cv2.CAP_PROP_FPS, cv2.CAP_PROP_BUFFERSIZE]
+    # Zero / empty values keep the driver default
+    cap = ModeCapture({})
+    frame_grabber.apply_capture_profile(cap, {"width": 0, "fourcc": ""})
+    assert cap.calls == []
+
+
+def test_probe_keeps_the_cheapest_mode_that_delivers():
+    cap = ModeCapture({(640, 360, "YUYV"): False,  # Accepted, but delivers no frames
+                       (640, 480, "MJPG"): True, (1280, 720, "MJPG"): True})
+    profile = frame_grabber.probe_capture_mode(cap, target_fps=30)
+    assert (profile["width"], profile["height"], profile["fourcc"]) == (640, 480, "MJPG")
+    assert frame_grabber.probe_capture_mode(ModeCapture({}), target_fps=30) is None
@@ -0,0 +1,165 @@
+import numpy as np
+import pytest
+
+from gesture_engine import CLICK, DOWN, MOVE, SCROLL, UP, GestureEngine, HandTracker
+from recognizers import hand_landmarks as hl
+
+FRAME = 1 / 30
+
+
+def open_hand(x=0.5, y=0.0):
+    """All fingers extended, thumb and index apart; (x, y) shifts the whole hand."""
+    hand = np.zeros((hl.NUM_LANDMARKS, 3), np.float32)
+    hand[hl.WRIST] = (0.5, 0.8, 0)
+    hand[[hl.THUMB_CMC, hl.THUMB_MCP, hl.THUMB_IP, hl.THUMB_TIP]] = [(0.42, 0.75, 0), (0.38, 0.7, 0),
+                                                                     (0.34, 0.65, 0), (0.3, 0.6, 0)]
+    for finger, finger_x in zip(range(1, 5), (0.45, 0.5, 0.55, 0.6)):
+        mcp = hl.FINGER_MCPS[finger]
+        hand[mcp:mcp + 4] = [(finger_x, 0.6, 0), (finger_x, 0.5, 0), (finger_x, 0.45, 0), (finger_x, 0.4, 0)]
+    hand[:, 0] += x - 0.5
+    hand[:, 1] += y
+    return hand
+
+
+def pinching_hand(**shift):
+    hand = open_hand(**shift)
+    hand[hl.THUMB_TIP, :2] = hand[hl.INDEX_FINGER_TIP, :2] + (0.01, 0.0)
+    return hand
+
+
+def v_sign_hand():
+    hand = open_hand()
+    for tip, pip in ((hl.RING_FINGER_TIP, hl.RING_FINGER_PIP), (hl.PINKY_TIP, hl.PINKY_PIP),
+                     (hl.THUMB_TIP, hl.THUMB_IP)):
+        hand[tip, 1] = hand[pip, 1] + 0.05
+    return hand
+
+
+def run(engine, frames, start=0.0):
+    """Feed (hands per frame) at 30 fps from `start`; returns the non-move events and the end time."""
+    events = []
+    now = start
+    for hands in frames:
+        events += [event for event in engine.process(now, hands) if event.type != MOVE]
+        now += FRAME
+    return events, now
+
+
+def test_fixtures_are_the_poses_they_claim():
+    assert not hl.is_pinching(open_hand()) and not hl.is_v_sign(open_hand())
+    assert hl.is_pinching(pinching_hand())
+    assert hl.is_v_sign(v_sign_hand())
+
+
+def test_every_frame_moves_the_cursor_to_the_index_tip():
+    events = GestureEngine().process(0.0, [open_hand()])
+    assert [(event.type, event.x, event.y) for event in events] == [(MOVE, pytest.approx(0.45), pytest.approx(0.4))]
+
+
+def test_short_pinch_clicks_on_release_even_right_after_start():
+    engine = GestureEngine()
+    events, _ = run(engine, [[pinching_hand()]] * 8 + [[open_hand()]])
+    assert [(event.type, event.button) for event in events] == [(CLICK, "left")]
+    assert events[0].timestamp == pytest.approx(8 * FRAME)
+
+
+def test_long_pinch_holds_the_button_until_released():
+    engine = GestureEngine(hold_threshold=1.0)
+    events, now = run(engine, [[pinching_hand()]] * 32)
+    assert [event.type for event in events] == [DOWN]
+    assert engine.get_states()[0]["pinch"] == "holding"
+    events, _ = run(engine, [[open_hand()]], start=now)
+    assert [event.type for event in events] == [UP]
+    assert engine.get_states()[0]["pinch"] == "idle"
+
+
+def test_cooldown_suppresses_a_second_click():
+    engine = GestureEngine(gesture_cooldown=0.5)
+    quick_pinch = [[pinching_hand()]] * 2 + [[open_hand()]]
+    events, now = run(engine, quick_pinch * 2)
+    assert [event.type for event in events] == [CLICK]
+    events, _ = run(engine, quick_pinch, start=now + 0.5)
+    assert [event.type for event in events] == [CLICK]
+
+
+def test_v_sign_held_for_v_sign_frames_right_clicks():
+    engine = GestureEngine(v_sign_frames=3)
+    events, _ = run(engine, [[v_sign_hand()]] * 2)
+    assert events == []
+    assert engine.get_states()[0]["v_sign"] == "arming"
+    events, _ = run(engine, [[v_sign_hand()]], start=2 * FRAME)
+    assert [(event.type, event.button) for event in events] == [(CLICK, "right")]
+
+
+@pytest.mark.parametrize("step, direction", [(-0.08, "up"), (0.08, "down")])
+def test_fast_wrist_motion_scrolls(step, direction):
+    engine = GestureEngine(scroll_velocity=0.05, scroll_frames=2)
+    events, _ = run(engine, [[open_hand(y=index * step)] for index in range(3)])
+    assert [(event.type, event.direction) for event in events] == [(SCROLL, direction)]
+
+
+def test_lost_hand_releases_a_held_button():
+    engine = GestureEngine(hold_threshold=0.5)
+    events, now = run(engine, [[pinching_hand()]] * 20)
+    assert [event.type for event in events] == [DOWN]
+    # The track ends once the hand has been missing for the tracker's timeout
+    events, _ = run(engine, [[]] * 40, start=now)
+    assert [event.type for event in events] == [UP]
+    assert engine.get_states() == {}
+
+
+def test_reset_releases_held_buttons_and_clears_the_cooldown():
+    engine = GestureEngine(hold_threshold=0.5)
+    _, now = run(engine, [[pinching_hand()]] * 20)
+    assert [event.type for event in engine.reset(now)] == [UP]
+    engine.last_gesture_time = now
+    engine.reset(now)
+    assert engine.cooldown_elapsed(now)
+
+
+def test_split_roles_leave_clicking_to_the_other_hand():
+    engine = GestureEngine(max_hands=2, hand_roles="split", cursor_hand="right")
+    # Frames are not mirrored: the hand with the smaller x is the user's right hand
+    right, left = open_hand(x=0.25), pinching_hand(x=0.75)
+    frames = [[right, left]] * 3 + [[right, open_hand(x=0.75)]]
+    events = []
+    for index, hands in enumerate(frames):
+        events += engine.process(index * FRAME, hands)
+    moves = [event for event in events if event.type == MOVE]
+    assert moves and all(event.x == pytest.approx(0.2) for event in moves)
+    clicks = [event for event in events if event.type == CLICK]
+    assert len(clicks) == 1
+    assert clicks[0].hand != moves[0].hand
+
+
+def test_hands_keep_their_ids_when_the_detector_reorders_them():
+    tracker = HandTracker(2)
+    left, right = open_hand(x=0.25), open_hand(x=0.75)
+    slots, _ = tracker.update(0.0, [left, right])
+    ids = [int(tracker.ids[slot]) for slot in slots]
+    assert ids == [0, 1]
+    # Both hands drift a little, and come back in the other order
+    slots, ended = tracker.update(FRAME, [open_hand(x=0.77), open_hand(x=0.27)])
+    assert [int(tracker.ids[slot]) for slot in slots] == [1, 0]
+    assert ended == []
+
+
+def test_a_hand_gone_for_longer_than_the_timeout_comes_back_with_a_new_id():
+    tracker = HandTracker(2, timeout=0.5)
+    slots, _ = tracker.update(0.0, [open_hand(x=0.25), open_hand(x=0.75)])
+    kept = int(tracker.ids[slots[0]])
+    tracker.update(0.4, [open_hand(x=0.25)])
+    slots, ended = tracker.update(0.6, [open_hand(x=0.25), open_hand(x=0.75)])
+    assert [hand_id for _, hand_id in ended] == [1]
+    assert [int(tracker.ids[slot]) for slot in slots] == [kept, 2]
+
+
+def test_events_are_tagged_with_the_hand_that_made_them():
+    engine = GestureEngine(max_hands=2, cursor_hand="right")
+    right, left = open_hand(x=0.25), open_hand(x=0.75)
+    moves = [event for event in engine.process(0.0, [left, right]) if event.type == MOVE]
+    # Only the cursor hand moves the cursor, whatever its place in the list
+    assert len(moves) == 1 and moves[0].x == pytest.approx(0.2)
+    cursor_id = moves[0].hand
+    moves = [event for event in engine.process(FRAME, [right, left]) if event.type == MOVE]
+    assert [event.hand for event in moves] == [cursor_id]
@@ -0,0 +1,34 @@
+import types
+
+import numpy as np
+
+from recognizers import hand_landmarks as hl
+
+
+def test_landmark_lists_become_21_by_3_arrays_in_order():
+    landmarks = [types.SimpleNamespace(x=i / 100, y=i / 50, z=-i / 200) for i in range(hl.NUM_LANDMARKS)]
+    hand = hl.landmarks_to_array(types.SimpleNamespace(landmark=landmarks))
+    assert hand.shape == (hl.NUM_LANDMARKS, 3) and hand.dtype == np.float32
+    np.testing.assert_allclose(hand[hl.INDEX_FINGER_TIP], (0.08, 0.16, -0.04), rtol=1e-6)
+
+
+def test_finger_states_compare_tip_pip_and_mcp_heights():
+    hand = np.zeros((hl.NUM_LANDMARKS, 3), np.float32)
+    # Index extended (tip above PIP above MCP), middle bent, the others half way
+    hand[hl.FINGER_MCPS, 1] = 0.6
+    hand[hl.FINGER_PIPS, 1] = 0.5
+    hand[hl.FINGER_TIPS, 1] = 0.5
+    hand[hl.INDEX_FINGER_TIP, 1] = 0.4
+    hand[hl.MIDDLE_FINGER_TIP, 1] = 0.55
+    extended, bent = hl.finger_states(hand)
+    assert extended.tolist() == [False, True, False, False, False]
+    assert bent.tolist() == [False, False, True, False, False]
+
+
+def test_pinch_is_a_short_thumb_to_index_distance():
+    hand = np.zeros((hl.NUM_LANDMARKS, 3), np.float32)
+    hand[hl.THUMB_TIP, :2] = (0.5, 0.5)
+    hand[hl.INDEX_FINGER_TIP, :2] = (0.5, 0.5 + hl.PINCH_THRESHOLD * 0.9)
+    assert hl.is_pinching(hand)
+    hand[hl.INDEX_FINGER_TIP, :2] = (0.5, 0.5 + hl.PINCH_THRESHOLD * 1.1)
+    assert not hl.is_pinching(hand)
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from input_dispatcher import InputDispatcher
+from latency_tracker import LatencyTracker
+from telemetry import Telemetry
+
+
+class GatedBackend:
+    """Records calls; while `gate` is clear the first call blocks, so commands pile up in the queue."""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.blocked = threading.Event()
+
+    def __getattr__(self, action):
+        def call(*args, **kwargs):
+            if not self.gate.is_set():
+                self.blocked.set()
+                self.gate.wait()
+            if action == "fail":
+                raise OSError("display gone")
+            self.calls.append((action,) + args)
+        return call
+
+
+@pytest.fixture
+def backend():
+    return GatedBackend()
+
+
+def _hold(dispatcher, backend):
+    """Park the worker inside a backend call so the following submits stay queued."""
+    backend.gate.clear()
+    dispatcher.submit("hold")
+    assert backend.blocked.wait(1.0)
+
+
+def test_moves_coalesce_and_other_commands_keep_their_order(backend):
+    dispatcher = InputDispatcher(backend)
+    _hold(dispatcher, backend)
+    dispatcher.submit_move(1, 1)
+    dispatcher.submit_move(2, 2)
+    dispatcher.submit("mouseDown", button="left")
+    dispatcher.submit_move(3, 3)
+    dispatcher.submit_move(4, 4)
+    dispatcher.submit("mouseUp", button="left")
+    backend.gate.set()
+    dispatcher.close()
+
+    assert backend.calls == [("hold",), ("moveTo", 2, 2), ("mouseDown",), ("moveTo", 4, 4), ("mouseUp",)]
+    stats = dispatcher.get_stats()
+    assert stats["coalesced_moves"] == 2
+    assert stats["dispatched"] == 5
+    assert stats["pending"] == 0
+
+
+def test_full_queue_drops_a_pending_move_before_anything_else(backend):
+    telemetry = Telemetry()
+    dispatcher = InputDispatcher(backend, max_queue=3, latency_tracker=LatencyTracker(telemetry=telemetry))
+    _hold(dispatcher, backend)
+    dispatcher.submit_move(1, 1)
+    dispatcher.submit("click")
+    dispatcher.submit("scroll", 3)
+    dispatcher.submit("click")  # Full: the move makes room
+    dispatcher.submit("scroll", -3)  # Full and no move left: dropped
+    backend.gate.set()
+    dispatcher.close()
+
+    assert [call[0] for call in backend.calls] == ["hold", "click", "scroll", "click"]
+    assert dispatcher.dropped_events == 2
+    assert [(record["name"], record["action"]) for record in telemetry.records(kind="drop")] == [
+        ("input", "moveTo"), ("input", "scroll")]
+
+
+def test_backend_failures_are_counted_and_the_worker_keeps_going(backend):
+    telemetry = Telemetry()
+    dispatcher = InputDispatcher(backend, latency_tracker=LatencyTracker(telemetry=telemetry))
+    dispatcher.submit("fail")
+    dispatcher.submit("click")
+    dispatcher.close()
+    assert dispatcher.failed_events == 1
+    assert backend.calls == [("click",)]
+    assert telemetry.records(kind="error")[0]["name"] == "input_backend"
+
+
+def test_latency_stages_are_recorded(backend):
+    tracker = LatencyTracker()
+    dispatcher = InputDispatcher(backend, latency_tracker=tracker)
+    dispatcher.submit_move(5, 5, capture_time=time.perf_counter())
+    dispatcher.close()
+    assert {"input_queue", "input_dispatch", "end_to_end"} <= tracker.get_stats().keys()
+
+
+def test_coalesced_moves_keep_the_earliest_capture_time(backend):
+    tracker = LatencyTracker()
+    dispatcher = InputDispatcher(backend, latency_tracker=tracker)
+    _hold(dispatcher, backend)
+    captured = time.perf_counter() - 1.0
+    dispatcher.submit_move(1, 1, capture_time=captured)
+    dispatcher.submit_move(2, 2, capture_time=captured + 0.5)
+    # A render tick without a frame behind it
+    dispatcher.submit_move(3, 3)
+    backend.gate.set()
+    dispatcher.close()
+
+    assert backend.calls == [("hold",), ("moveTo", 3, 3)]
+    end_to_end = tracker.get_stats()["end_to_end"]
+    assert end_to_end["count"] == 1
+    assert end_to_end["mean_ms"] >= 1000
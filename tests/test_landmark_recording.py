@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from landmark_recording import LandmarkRecorder, LandmarkRecording
+
+
+def _hands(count, value):
+    return np.full((count, 21, 3), value, np.float32)
+
+
+def test_round_trip_of_lists_stacked_arrays_and_empty_frames(tmp_path):
+    recorder = LandmarkRecorder(str(tmp_path), max_hands=2, chunk_size=2)
+    recorder.append(10.0, list(_hands(1, 0.1)))
+    recorder.append(10.1, _hands(2, 0.2))  # Stacked, as the worker pool delivers them
+    recorder.append(10.2, _hands(0, 0.0))
+    recorder.append(10.3, None)
+    recorder.append(10.4, _hands(3, 0.3))  # More than max_hands
+    recorder.close()
+
+    frames = list(LandmarkRecording(str(tmp_path)))
+    assert [timestamp for timestamp, _ in frames] == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+    assert [len(hands) for _, hands in frames] == [1, 2, 0, 0, 2]
+    np.testing.assert_allclose(frames[1][1], _hands(2, 0.2))
+    np.testing.assert_allclose(frames[4][1], _hands(2, 0.3))
@@ -0,0 +1,53 @@
+import pytest
+
+from latency_tracker import LatencyTracker
+from telemetry import Telemetry
+
+
+def test_percentiles_over_the_window():
+    tracker = LatencyTracker(window=100)
+    for millis in range(1, 101):
+        tracker.record("inference", millis / 1000)
+    stats = tracker.get_stats()["inference"]
+    assert stats["count"] == 100
+    assert stats["mean_ms"] == pytest.approx(50.5)
+    assert stats["p50_ms"] == pytest.approx(51.0)
+    assert stats["p95_ms"] == pytest.approx(95.0)
+    assert stats["p99_ms"] == pytest.approx(99.0)
+    assert stats["max_ms"] == pytest.approx(100.0)
+
+
+def test_only_the_most_recent_samples_are_kept():
+    tracker = LatencyTracker(window=10)
+    for _ in range(50):
+        tracker.record("gestures", 1.0)
+    for _ in range(10):
+        tracker.record("gestures", 0.001)
+    stats = tracker.get_stats()["gestures"]
+    assert stats["count"] == 10
+    assert stats["max_ms"] == pytest.approx(1.0)
+
+
+def test_stages_without_samples_are_left_out():
+    tracker = LatencyTracker()
+    assert tracker.get_stats() == {}
+    assert tracker.format_stats() == "No samples yet."
+    tracker.record("queue_wait", 0.002)
+    tracker.record("custom_stage", 0.003)
+    assert set(tracker.get_stats()) == {"queue_wait", "custom_stage"}
+    assert tracker.format_stats().startswith("queue_wait")
+
+
+def test_reset_clears_every_stage():
+    tracker = LatencyTracker()
+    tracker.record("inference", 0.01)
+    tracker.reset()
+    assert tracker.get_stats() == {}
+
+
+def test_samples_are_forwarded_to_telemetry():
+    telemetry = Telemetry()
+    tracker = LatencyTracker(telemetry=telemetry)
+    tracker.record("inference", 0.02)
+    tracker.record("inference", 0.04)
+    assert telemetry.get_totals()[("latency", "inference")] == (2, pytest.approx(0.06))
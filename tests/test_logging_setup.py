@@ -0,0 +1,82 @@
+import io
+import logging
+
+import pytest
+
+from logging_setup import RateLimitFilter, set_log_level, setup_logging, shutdown_logging
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _record(msg="Failed to grab frame from camera %s.", level=logging.WARNING, name="frame_grabber"):
+    return logging.LogRecord(name, level, __file__, 1, msg, (0,), None)
+
+
+def test_burst_then_suppression_within_the_interval():
+    clock = Clock()
+    rate_limit = RateLimitFilter(interval=5.0, burst=3, clock=clock)
+    passed = [rate_limit.filter(_record()) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+
+
+def test_next_message_through_carries_the_suppressed_count():
+    clock = Clock()
+    rate_limit = RateLimitFilter(interval=5.0, burst=2, clock=clock)
+    for _ in range(6):
+        rate_limit.filter(_record())
+    clock.now = 5.0
+    record = _record()
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "Failed to grab frame from camera 0. (4 similar messages suppressed)"
+    # The count is reported once
+    record = _record()
+    assert rate_limit.filter(record)
+    assert "suppressed" not in record.getMessage()
+
+
+def test_messages_are_limited_separately_by_logger_level_and_format():
+    rate_limit = RateLimitFilter(interval=5.0, burst=1, clock=Clock())
+    assert rate_limit.filter(_record())
+    assert not rate_limit.filter(_record())
+    assert rate_limit.filter(_record(level=logging.ERROR))
+    assert rate_limit.filter(_record(name="shm_pipeline"))
+    assert rate_limit.filter(_record(msg="Camera %s reconnected."))
+
+
+@pytest.fixture
+def console():
+    stream = io.StringIO()
+    yield stream
+    shutdown_logging()
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def test_setup_logging_writes_through_the_queue(console):
+    setup_logging("INFO", stream=console, rate_limit_burst=2)
+    logger = logging.getLogger("test_logging_setup")
+    logger.debug("hidden")
+    for index in range(5):
+        logger.warning("Repeated %d", index)
+    logger.info("Shown")
+    shutdown_logging()
+    assert console.getvalue().splitlines() == ["WARNING: Repeated 0", "WARNING: Repeated 1", "INFO: Shown"]
+
+
+def test_set_log_level_ignores_unknown_names(console):
+    setup_logging("WARNING", stream=console)
+    set_log_level("DEBUG")
+    assert logging.getLogger().level == logging.DEBUG
+    set_log_level("LOUD")
+    assert logging.getLogger().level == logging.DEBUG
+
+
+def test_unopenable_log_file_is_reported_not_raised(console, tmp_path):
+    setup_logging("INFO", log_file=str(tmp_path / "missing" / "app.log"), stream=console)
+    shutdown_logging()
+    assert "Could not open log file" in console.getvalue()
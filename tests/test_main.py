@@ -0,0 +1,170 @@
+import importlib
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from config_manager import ConfigManager
+from logging_setup import shutdown_logging
+
+
+class FakeRecognizer:
+    drives_input_controller = False
+    supports_landmark_recording = False
+
+    def __init__(self, key):
+        self.key = key
+        self.paused = 0
+        self.closed = False
+
+    def pause(self):
+        self.paused += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakePipelinePart:
+    """Stands in for the FrameGrabber and the InputController."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append(name)
+
+
+@pytest.fixture
+def main(monkeypatch):
+    # pystray connects to a display when imported
+    pystray = types.ModuleType("pystray")
+    pystray.Icon = pystray.Menu = pystray.MenuItem = object
+    monkeypatch.setitem(sys.modules, "pystray", pystray)
+    monkeypatch.delitem(sys.modules, "main", raising=False)
+    module = importlib.import_module("main")
+    yield module
+    sys.modules.pop("main", None)
+
+
+@pytest.fixture
+def app(main, tmp_path, monkeypatch):
+    config_path = str(tmp_path / "config.json")
+    monkeypatch.setattr(main, "ConfigManager", lambda: ConfigManager(file_path=config_path))
+    created = []
+
+    def create_recognizer(name, input_controller, config_manager=None, latency_tracker=None):
+        created.append(FakeRecognizer(main.PalmControlApp.get_recognizer_key(app)))
+        return created[-1]
+
+    monkeypatch.setattr(main.recognizers, "create_recognizer", create_recognizer)
+    app = main.PalmControlApp()
+    app.created = created
+    app.frame_grabber = FakePipelinePart()
+    app.input_controller = FakePipelinePart()
+    app.recognizer = app.create_recognizer()
+    yield app
+    app.config_manager.flush()
+    shutdown_logging()
+
+
+def _switch(app, **settings):
+    app.config_manager.update(settings)
+    assert app.apply_pipeline_changes(settings)
+    return app.recognizer
+
+
+def test_only_the_last_recognizer_stays_pooled(app):
+    first = app.recognizer
+    second = _switch(app, recognizer="gpu")
+    assert [recognizer for recognizer, _ in app.recognizer_pool.values()] == [first]
+    assert first.paused == 1 and not first.closed
+
+    third = _switch(app, device="cuda")
+    assert first.closed
+    assert [recognizer for recognizer, _ in app.recognizer_pool.values()] == [second]
+
+    # Switching back reuses the pooled instance and pools the one just left
+    assert _switch(app, device="cpu") is second
+    assert [recognizer for recognizer, _ in app.recognizer_pool.values()] == [third]
+    assert len(app.created) == 3
+
+
+def test_pooled_recognizer_is_released_after_warm_idle_timeout(app):
+    app.config_manager.set("warm_idle_timeout", 0.1)
+    first = app.recognizer
+    _switch(app, recognizer="gpu")
+    app.release_idle_recognizers()
+    assert not first.closed
+
+    time.sleep(0.15)
+    app.release_idle_recognizers()
+    assert first.closed
+    assert app.recognizer_pool == {}
+
+
+def test_pause_releases_the_pipeline_after_warm_idle_timeout(app):
+    app.config_manager.set("warm_idle_timeout", 0.1)
+    app.is_paused = True
+    started = time.monotonic()
+    assert not app.wait_while_paused()
+    assert time.monotonic() - started >= 0.1
+    assert app._idle_released
+    assert app.recognizer.paused == 1
+    assert "pause" in app.frame_grabber.calls and "resume" not in app.frame_grabber.calls
+
+
+def test_resume_during_pause_keeps_the_pipeline_warm(app):
+    app.config_manager.set("warm_idle_timeout", 10.0)
+    app.is_paused = True
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(app.wait_while_paused()))
+    waiter.start()
+    time.sleep(0.05)
+    with app._control_condition:
+        app.is_paused = False
+        app._control_condition.notify_all()
+    waiter.join(timeout=2)
+    assert result == [True]
+    assert not app._idle_released
+    assert app.frame_grabber.calls == ["pause", "resume"]
+
+
+def test_pooled_recognizer_times_out_during_a_pause(app):
+    app.config_manager.set("warm_idle_timeout", 0.3)
+    first = app.recognizer
+    _switch(app, recognizer="gpu")
+    # Switched away from 0.2 s ago: due 0.1 s into the pause, long before the pause itself times out
+    key = next(iter(app.recognizer_pool))
+    app.recognizer_pool[key] = (first, time.monotonic() - 0.2)
+    app.is_paused = True
+    waiter = threading.Thread(target=app.wait_while_paused)
+    waiter.start()
+    time.sleep(0.2)
+    assert first.closed and app.recognizer_pool == {}
+    assert app.is_paused and waiter.is_alive()
+    waiter.join(timeout=2)
+    assert app._idle_released
+
+
+class FakeGui:
+    def __init__(self):
+        self.scheduled = []
+        self.status = None
+        self.status_label = types.SimpleNamespace(configure=lambda text: setattr(self, "status", text))
+
+    def after(self, delay, func):
+        self.scheduled.append(func)
+
+
+def test_camera_health_reaches_the_status_line_through_the_main_thread(app):
+    app.gui = FakeGui()
+    app.frame_grabber = types.SimpleNamespace(get_health=lambda: {"state": "reconnecting"})
+    camera_thread = threading.Thread(target=app.report_camera_health, args=("ok",))
+    camera_thread.start()
+    camera_thread.join()
+    assert app.gui.status is None
+    for call in app.gui.scheduled:
+        call()
+    assert app.gui.status == "Status: Camera lost, reconnecting..."
@@ -0,0 +1,111 @@
+import types
+
+import numpy as np
+import pytest
+
+from recognizers import mediapipe_recognizer
+from recognizers.mediapipe_recognizer import MediapipeRecognizer
+
+
+class FakeHands:
+    """Stands in for mp.solutions.hands.Hands: reports one small hand at `hand_x` and logs its inputs."""
+
+    hand_x = 0.5
+    calls = []
+
+    def __init__(self, static_image_mode=False, **options):
+        self.static_image_mode = static_image_mode
+
+    def process(self, image):
+        FakeHands.calls.append((self, image.shape[:2]))
+        if self.hand_x is None:
+            return types.SimpleNamespace(multi_hand_landmarks=None)
+        landmarks = [types.SimpleNamespace(x=self.hand_x + 0.01 * (i % 5), y=0.5 + 0.01 * (i // 5), z=0.0)
+                     for i in range(21)]
+        return types.SimpleNamespace(multi_hand_landmarks=[types.SimpleNamespace(landmark=landmarks)])
+
+    def close(self):
+        pass
+
+
+class NullInputController:
+    frame_capture_time = None
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def recognizer(monkeypatch):
+    FakeHands.hand_x = 0.5
+    FakeHands.calls = []
+    solutions = types.SimpleNamespace(
+        hands=types.SimpleNamespace(Hands=FakeHands, HAND_CONNECTIONS=()),
+        drawing_utils=types.SimpleNamespace(draw_landmarks=lambda *args, **kwargs: None))
+    monkeypatch.setattr(mediapipe_recognizer.mp, "solutions", solutions, raising=False)
+    now = [0.0]
+    recognizer = MediapipeRecognizer(NullInputController(), clock=lambda: now[0])
+    recognizer.now = now
+    yield recognizer
+    recognizer.close()
+
+
+def _run(recognizer, frames, start=0):
+    frame = np.zeros((480, 640, 3), np.uint8)
+    for index in range(start, start + frames):
+        recognizer.now[0] = index / 30
+        recognizer.process_frame(frame)
+
+
+def test_crops_and_full_frames_use_separate_graphs(recognizer):
+    recognizer.set_roi_tracking(True)
+    _run(recognizer, 30)
+    full_frame = {graph for graph, shape in FakeHands.calls if shape == (480, 640)}
+    crops = {graph for graph, shape in FakeHands.calls if shape != (480, 640)}
+    assert full_frame and crops
+    assert not full_frame & crops
+    # Full-frame passes between crops are detections, so that graph must not track
+    assert all(graph.static_image_mode for graph in full_frame)
+    assert not any(graph.static_image_mode for graph in crops)
+
+
+def test_temporal_tracking_skips_rescans_while_all_hands_are_tracked(recognizer):
+    recognizer.set_roi_tracking(True)
+    _run(recognizer, 60)
+    assert recognizer.full_frame_detections == 1
+    assert recognizer.roi_hits == 59
+
+
+def test_without_temporal_tracking_the_roi_is_rescanned_periodically(recognizer):
+    recognizer.set_roi_tracking(True)
+    recognizer.set_temporal_tracking(False)
+    _run(recognizer, 60)
+    assert recognizer.full_frame_detections == 60 // MediapipeRecognizer.ROI_RESCAN_FRAMES
+    assert recognizer.tracker.tracked_frames == 0  # needs_detection() is not consulted
+
+
+def test_lost_hand_is_searched_on_the_same_frame(recognizer):
+    recognizer.set_roi_tracking(True)
+    _run(recognizer, 5)
+    FakeHands.hand_x = None
+    detections = recognizer.full_frame_detections
+    _run(recognizer, 1, start=5)
+    assert recognizer.roi_misses == 1
+    assert recognizer.full_frame_detections == detections + 1
+    assert recognizer.roi is None
+
+
+def test_without_roi_tracking_no_detector_calls_are_reported(recognizer):
+    _run(recognizer, 30)
+    assert {graph for graph, shape in FakeHands.calls} == {recognizer.hands}
+    assert not recognizer.hands.static_image_mode
+    assert recognizer.tracker.detector_calls == 0
+    assert recognizer.get_performance_stats()["tracking"] is None
+
+
+def test_only_detection_graph_passes_count_as_detector_calls(recognizer):
+    recognizer.set_roi_tracking(True)
+    _run(recognizer, 30)
+    detections = sum(1 for graph, shape in FakeHands.calls if graph is recognizer.detection_hands)
+    assert recognizer.tracker.detector_calls == detections == 1
+    assert recognizer.get_performance_stats()["tracking"]["detector_calls"] == 1
@@ -0,0 +1,72 @@
+import types
+
+import numpy as np
+import pytest
+
+from recognizers.onnx_hand_pipeline import HandLandmarkModel, PalmDetector
+
+
+class FakeSession:
+    """Stands in for an onnxruntime session: fixed outputs, given as {name: array} in model order."""
+
+    def __init__(self, input_shape, outputs):
+        self.input_shape = input_shape
+        self.values = outputs
+
+    def get_inputs(self):
+        return [types.SimpleNamespace(name="input", shape=self.input_shape)]
+
+    def get_outputs(self):
+        return [types.SimpleNamespace(name=name, shape=list(value.shape)) for name, value in self.values.items()]
+
+    def run(self, output_names, feeds):
+        return list(self.values.values())
+
+
+def _landmarks():
+    return np.tile(np.array([112.0, 112.0, 0.0], np.float32), (1, 21))
+
+
+def test_landmark_outputs_are_selected_by_name():
+    # Handedness comes before presence here; position alone would pick the wrong score
+    session = FakeSession([1, 224, 224, 3], {
+        "Identity_3": np.zeros((1, 63), np.float32),
+        "Identity_2": np.array([[0.1]], np.float32),
+        "Identity_1": np.array([[0.9]], np.float32),
+        "Identity": _landmarks(),
+    })
+    model = HandLandmarkModel(session)
+    hand, score = model.run(np.zeros((480, 640, 3), np.uint8), (320.0, 240.0, 224.0, 0.0))
+    assert score == pytest.approx(0.9)
+    np.testing.assert_allclose(hand[:, :2], np.tile([0.5, 0.5], (21, 1)), atol=1e-5)
+
+
+def test_descriptive_output_names_are_recognized():
+    session = FakeSession([1, 3, 224, 224], {
+        "lefthand_0_or_righthand_1": np.array([[0.2]], np.float32),
+        "hand_score": np.array([[0.8]], np.float32),
+        "xyz_x21": _landmarks(),
+    })
+    _, score = HandLandmarkModel(session).run(np.zeros((480, 640, 3), np.uint8), (320.0, 240.0, 224.0, 0.0))
+    assert score == pytest.approx(0.8)
+
+
+def test_unnamed_outputs_of_the_same_size_are_rejected():
+    session = FakeSession([1, 224, 224, 3], {
+        "landmarks": _landmarks(),
+        "score_a": np.array([[0.9]], np.float32),
+        "score_b": np.array([[0.1]], np.float32),
+    })
+    with pytest.raises(ValueError, match="score_a, score_b"):
+        HandLandmarkModel(session)
+
+
+def test_outputs_with_unique_sizes_need_no_names():
+    session = FakeSession([1, 192, 192, 3], {
+        "scores": np.full((1, 2016, 1), -10.0, np.float32),
+        "boxes": np.zeros((1, 2016, 18), np.float32),
+    })
+    detector = PalmDetector(session)
+    assert (detector._regressor_index, detector._score_index) == (1, 0)
+    boxes, keypoints, scores = detector.detect(np.zeros((480, 640, 3), np.uint8))
+    assert len(boxes) == 0
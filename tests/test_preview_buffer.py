@@ -0,0 +1,78 @@
+import numpy as np
+
+from preview_buffer import PreviewBuffer
+
+
+def _frame(width=1280, height=720):
+    frame = np.zeros((height, width, 3), np.uint8)
+    frame[..., 0] = 255  # Pure blue in BGR
+    return frame
+
+
+def _read(buffer, last_seq=0):
+    received = []
+    seq = buffer.read_into(last_seq, lambda rgb: received.append(rgb.copy()))
+    return seq, received
+
+
+def test_frames_are_downscaled_to_fit_and_converted_to_rgb():
+    buffer = PreviewBuffer(max_size=(560, 300))
+    buffer.submit(_frame())
+    seq, received = _read(buffer)
+    assert seq == 1
+    (rgb,) = received
+    # 1280x720 fits 300 px high at 16:9
+    assert rgb.shape == (300, 533, 3)
+    assert (rgb[..., 2] == 255).all() and not rgb[..., :2].any()
+
+
+def test_small_frames_are_not_upscaled():
+    buffer = PreviewBuffer(max_size=(560, 300))
+    buffer.submit(_frame(320, 240))
+    assert _read(buffer)[1][0].shape == (240, 320, 3)
+
+
+def test_only_new_previews_reach_the_consumer():
+    buffer = PreviewBuffer()
+    assert _read(buffer) == (0, [])
+    buffer.submit(_frame())
+    seq, received = _read(buffer)
+    assert len(received) == 1
+    assert _read(buffer, seq) == (seq, [])
+    buffer.submit(_frame())
+    assert _read(buffer, seq)[0] == seq + 1
+
+
+def test_buffers_are_reused_between_frames():
+    buffer = PreviewBuffer()
+    buffer.submit(_frame())
+    buffer.submit(_frame())
+    buffers = {id(buffer._front), id(buffer._back), id(buffer._scaled)}
+    for _ in range(5):
+        buffer.submit(_frame())
+    assert {id(buffer._front), id(buffer._back), id(buffer._scaled)} == buffers
+
+
+def test_a_new_frame_size_reallocates():
+    buffer = PreviewBuffer(max_size=(560, 300))
+    buffer.submit(_frame())
+    buffer.submit(_frame(320, 240))
+    assert _read(buffer)[1][0].shape == (240, 320, 3)
+
+
+def test_submissions_are_paced_at_fps():
+    buffer = PreviewBuffer(fps=10)
+    assert buffer.due()
+    buffer.submit(_frame())
+    assert not buffer.due()
+    buffer.set_fps(1000)  # Clamped to 30
+    assert buffer.fps == 30.0
+
+
+def test_clear_hides_the_last_frame_and_makes_the_next_one_due():
+    buffer = PreviewBuffer()
+    buffer.submit(_frame())
+    seq, _ = _read(buffer)
+    buffer.clear()
+    assert buffer.due()
+    assert _read(buffer, seq)[1] == []
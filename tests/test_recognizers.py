@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import recognizers
+from benchmark import RecordingInputBackend
+from input_controller import InputController
+from recognizers.base import RecognitionResult, Recognizer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class EchoRecognizer(Recognizer):
+    def __init__(self, input_controller, latency_tracker=None, clock=None, config_manager=None, scale=1):
+        self.input_controller = input_controller
+        self.scale = scale
+
+    def process_frame(self, frame, capture_time=None):
+        return RecognitionResult(frame, processed=True)
+
+    def get_performance_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(recognizers, "RECOGNIZERS", dict(recognizers.RECOGNIZERS))
+    recognizers.register_recognizer("echo", f"{__name__}:EchoRecognizer", ("scale", "max_num_hands"))
+
+
+def test_registered_backends_are_built_with_their_options(registry):
+    assert "echo" in recognizers.recognizer_names()
+    input_controller = InputController(backend=RecordingInputBackend())
+    recognizer = recognizers.create_recognizer("echo", input_controller, scale=2)
+    assert isinstance(recognizer, EchoRecognizer)
+    assert recognizer.input_controller is input_controller and recognizer.scale == 2
+
+
+def test_config_keys_are_merged_without_duplicates(registry):
+    assert recognizers.recognizer_config_keys("echo") == ("scale", "max_num_hands")
+    keys = recognizers.recognizer_config_keys()
+    assert keys.count("max_num_hands") == 1
+    assert "scale" in keys and "device" in keys
+
+
+def test_unknown_backend_names_the_available_ones():
+    with pytest.raises(ValueError, match="mediapipe"):
+        recognizers.get_recognizer_class("missing")
+
+
+def test_backends_are_not_imported_until_selected():
+    code = ("import sys, recognizers; "
+            "print(sorted(name for name in sys.modules if name.startswith('recognizers.')))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import shm_pipeline
+from benchmark import RecordingInputBackend
+from input_controller import InputController
+from shm_pipeline import EMPTY_HANDS, WorkerPoolRecognizer
+
+
+def _echo_worker(shm_name, slot_shape, slot, generation, tasks, results, *settings, hands=EMPTY_HANDS):
+    """Stands in for _worker_main without loading MediaPipe: answers every frame with `hands`."""
+    results.put(("ready", generation, slot))
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        if task[0] == "frame":
+            results.put(("result", generation, slot, task[1], hands, 0.0, 0.0))
+
+
+def _slow_exit_worker(*args):
+    """Echoes frames, but takes a second to exit when told to stop."""
+    _echo_worker(*args)
+    time.sleep(1.0)
+
+
+def _silent_worker(shm_name, slot_shape, slot, generation, tasks, results, *settings):
+    """Takes frames but never answers them."""
+    results.put(("ready", generation, slot))
+    while tasks.get() is not None:
+        pass
+
+
+def _one_hand_worker(*args):
+    # An open hand in the middle of the frame
+    hand = np.full((1, 21, 3), 0.5, np.float32)
+    hand[0, :, 0] = np.linspace(0.3, 0.7, 21)
+    _echo_worker(*args, hands=hand)
+
+
+def _wait_for(condition, timeout=20.0, frame=None, recognizer=None):
+    """Poll `condition`, feeding frames meanwhile if a recognizer is given."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        if recognizer is not None:
+            recognizer.process_frame(frame)
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def pool(monkeypatch, request):
+    monkeypatch.setattr(shm_pipeline, "_worker_main", getattr(request, "param", _echo_worker))
+    input_controller = InputController(backend=RecordingInputBackend())
+    recognizer = WorkerPoolRecognizer(input_controller, workers=2)
+    yield recognizer
+    recognizer.close()
+    input_controller.close()
+
+
+def test_results_are_handled(pool):
+    frame = np.zeros((48, 64, 3), np.uint8)
+    assert _wait_for(lambda: pool.frames_processed >= 5, frame=frame, recognizer=pool)
+    assert pool.get_performance_stats()["workers"] == 2
+
+
+def test_dead_worker_is_restarted_while_others_keep_running(pool):
+    frame = np.zeros((48, 64, 3), np.uint8)
+    assert _wait_for(lambda: pool.frames_processed >= 2, frame=frame, recognizer=pool)
+    assert _wait_for(lambda: len(pool._free_slots) == 2)
+    dead = pool._workers[0].process
+    dead.kill()
+    dead.join()
+
+    # The other worker keeps answering, so the result queue is never quiet for long
+    assert _wait_for(lambda: pool.worker_restarts == 1, frame=frame, recognizer=pool)
+    assert pool._workers[0].process is not dead
+    assert _wait_for(lambda: len(pool._free_slots) == 2)
+    processed = pool.frames_processed
+    assert _wait_for(lambda: pool.frames_processed >= processed + 10, frame=frame, recognizer=pool)
+    assert pool.worker_restarts == 1
+
+
+def test_pause_resets_gestures_on_the_result_thread(pool, monkeypatch):
+    threads = []
+    reset = pool.gesture_engine.reset
+
+    def recording_reset(timestamp):
+        threads.append(threading.current_thread().name)
+        return reset(timestamp)
+
+    monkeypatch.setattr(pool.gesture_engine, "reset", recording_reset)
+    pool.pause()
+    assert _wait_for(lambda: threads)
+    assert threads == ["InferenceResults"]
+
+
+@pytest.mark.parametrize("pool", [_one_hand_worker], indirect=True)
+def test_latest_hands_are_drawn_on_the_preview_frame_only(pool):
+    assert _wait_for(lambda: pool.frames_processed >= 1, frame=np.zeros((48, 64, 3), np.uint8), recognizer=pool)
+    frame = np.zeros((48, 64, 3), np.uint8)
+    pool.process_frame(frame)
+    assert frame.any()
+    # The copy handed to the worker stays clean
+    assert not pool._frames.any()
+
+
+@pytest.mark.parametrize("pool", [_silent_worker], indirect=True)
+def test_governor_is_paced_by_submission_not_by_results(pool):
+    frame = np.zeros((48, 64, 3), np.uint8)
+    assert _wait_for(lambda: pool._in_flight, frame=frame, recognizer=pool)
+    # The frame was only submitted, and already counts for pacing
+    assert pool.governor.last_process_time is not None
+    assert pool.frames_processed == 0
+
+
+@pytest.mark.parametrize("pool", [_slow_exit_worker], indirect=True)
+def test_frame_size_change_does_not_stall_the_camera_thread(pool):
+    small = np.zeros((48, 64, 3), np.uint8)
+    assert _wait_for(lambda: pool.frames_processed >= 2, frame=small, recognizer=pool)
+
+    large = np.zeros((96, 128, 3), np.uint8)
+    started = time.monotonic()
+    pool.process_frame(large)
+    # Stopping the old workers takes a second, on another thread
+    assert time.monotonic() - started < 0.5
+    processed = pool.frames_processed
+    assert _wait_for(lambda: pool.frames_processed >= processed + 2, frame=large, recognizer=pool)
+    assert pool._frames.shape[1:] == large.shape
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from smoothing_filters import (FILTERS, KalmanFilter, OneEuroFilter, WeightedAverageFilter, create_filter,
+                               measure_filter)
+
+RATE = 60.0
+
+
+def _step_response(smoothing_filter, steps=120, target=100.0):
+    """Filtered x after the input jumps from 0 to `target` (sampled at RATE Hz)."""
+    for index in range(10):
+        smoothing_filter.filter(0.0, 0.0, index / RATE)
+    return [smoothing_filter.filter(target, 0.0, (10 + index) / RATE)[0] for index in range(steps)]
+
+
+@pytest.mark.parametrize("name", sorted(FILTERS))
+def test_step_response_settles_on_the_new_position(name):
+    response = _step_response(create_filter(name, 0.3))
+    assert response[-1] == pytest.approx(100.0, abs=0.5)
+    assert min(response) >= -1.0
+    # The Kalman filter's velocity state carries it past a step; the low-pass filters never overshoot
+    assert max(response) <= (150.0 if name == "kalman" else 100.0 + 1e-6)
+
+
+@pytest.mark.parametrize("filter_class", [OneEuroFilter, KalmanFilter])
+def test_lower_smoothing_factor_responds_more_slowly(filter_class):
+    smooth = _step_response(filter_class(0.1), steps=6)
+    responsive = _step_response(filter_class(1.0), steps=6)
+    assert smooth[-1] < responsive[-1]
+
+
+def test_first_sample_passes_through():
+    for name in FILTERS:
+        assert create_filter(name).filter(12.0, 34.0, 0.0) == (12.0, 34.0)
+
+
+def test_weighted_average_needs_min_samples():
+    smoothing_filter = WeightedAverageFilter(min_samples=3)
+    assert smoothing_filter.filter(0.0, 0.0, 0.0) == (0.0, 0.0)
+    assert smoothing_filter.filter(10.0, 0.0, 0.1) == (10.0, 0.0)
+    x, _ = smoothing_filter.filter(10.0, 0.0, 0.2)
+    assert 0.0 < x < 10.0
+
+
+def test_reset_forgets_the_previous_position():
+    for name in FILTERS:
+        smoothing_filter = create_filter(name)
+        _step_response(smoothing_filter, steps=3)
+        smoothing_filter.reset()
+        assert smoothing_filter.filter(-50.0, 5.0, 10.0) == (-50.0, 5.0)
+
+
+def test_unknown_name_falls_back_to_weighted_average():
+    assert isinstance(create_filter("nope"), WeightedAverageFilter)
+
+
+def test_measure_filter_reports_less_jitter_than_raw_input():
+    rng = np.random.default_rng(0)
+    timestamps = np.arange(240) / RATE
+    positions = np.stack([500 + 200 * np.sin(timestamps), np.full_like(timestamps, 300.0)], axis=1)
+    noisy = positions + rng.normal(0.0, 3.0, positions.shape)
+    raw_jitter = float(np.mean(np.linalg.norm(np.diff(noisy, n=2, axis=0), axis=1)))
+    for name in ("one_euro", "kalman"):
+        stats = measure_filter(create_filter(name, 0.3), timestamps, noisy)
+        assert stats["jitter_px"] < raw_jitter
+        assert 0.0 <= stats["lag_ms"] < 300.0
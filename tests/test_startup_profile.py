@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from startup_profile import StartupProfiler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported on first use or by the prewarm thread, never by `import main`
+HEAVY_MODULES = ("cv2", "numpy", "mediapipe", "onnxruntime", "pyautogui", "customtkinter",
+                 "input_controller", "frame_grabber", "preview_buffer", "app_gui")
+
+
+def test_importing_main_loads_no_vision_input_or_gui_modules():
+    # A fresh interpreter, since other tests have imported these modules already;
+    # pystray is replaced because it connects to a display when imported
+    code = textwrap.dedent(f"""
+        import sys, types
+        pystray = types.ModuleType("pystray")
+        pystray.Icon = pystray.Menu = pystray.MenuItem = object
+        sys.modules["pystray"] = pystray
+        import main
+        print(",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+    """)
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def _write_module(tmp_path, name):
+    (tmp_path / f"{name}.py").write_text("VALUE = 1\n")
+
+
+def test_stages_that_import_something_are_reported(tmp_path, monkeypatch, capsys):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    _write_module(tmp_path, "startup_stage_module")
+    monkeypatch.delitem(sys.modules, "startup_stage_module", raising=False)
+    profiler = StartupProfiler(enabled=True)
+    with profiler.measure("stage"):
+        import startup_stage_module
+    # Already imported: a lazy import wrapped a second time stays silent
+    with profiler.measure("again"):
+        import startup_stage_module
+
+    assert [stage[0] for stage in profiler.stages] == ["stage"]
+    assert profiler.stages[0][2] >= 1
+    output = capsys.readouterr().out
+    assert "stage:" in output and "again" not in output
+
+
+def test_summary_lists_the_slowest_stage_first(capsys):
+    profiler = StartupProfiler(enabled=True)
+    profiler.stages = [("fast", 0.01, 1), ("slow", 0.5, 10)]
+    profiler.summary()
+    lines = capsys.readouterr().out.splitlines()
+    assert "slow" in lines[1] and "fast" in lines[2]
+
+
+def test_disabled_profiler_prints_nothing(tmp_path, monkeypatch, capsys):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    _write_module(tmp_path, "startup_disabled_module")
+    monkeypatch.delitem(sys.modules, "startup_disabled_module", raising=False)
+    profiler = StartupProfiler()
+    with profiler.measure("stage"):
+        import startup_disabled_module
+    profiler.mark("tray icon started")
+    profiler.summary()
+    assert profiler.stages == []
+    assert capsys.readouterr().out == ""
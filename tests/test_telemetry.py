@@ -0,0 +1,96 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from telemetry import Telemetry, TelemetryServer
+
+
+def test_records_come_back_oldest_first_with_their_fields():
+    telemetry = Telemetry()
+    telemetry.record("gesture", "click", hand=3)
+    telemetry.record("latency", "inference", 0.01)
+    records = telemetry.records()
+    assert [record["seq"] for record in records] == [1, 2]
+    assert records[0]["name"] == "click" and records[0]["hand"] == 3 and "value" not in records[0]
+    assert telemetry.records(since=1) == records[1:]
+    assert telemetry.records(kind="gesture") == records[:1]
+
+
+def test_ring_wraps_around_and_keeps_the_newest_records():
+    telemetry = Telemetry(capacity=16)
+    for index in range(40):
+        telemetry.record("frame", "captured", float(index))
+    records = telemetry.records()
+    assert len(records) == 16
+    assert [record["value"] for record in records] == [float(index) for index in range(24, 40)]
+    assert [record["seq"] for record in records] == list(range(25, 41))
+
+
+def test_records_overwritten_before_aggregation_count_as_lost():
+    telemetry = Telemetry(capacity=16)
+    for _ in range(10):
+        telemetry.record("drop", "frame")
+    telemetry.aggregate()
+    assert telemetry.records_lost == 0
+
+    for _ in range(50):
+        telemetry.record("drop", "frame")
+    totals = telemetry.get_totals()
+    # 60 written, the 10 seen by the first read plus the 16 still in the buffer are counted
+    assert telemetry.records_lost == 60 - 10 - 16
+    assert totals[("drop", "frame")] == (26, 0.0)
+    assert telemetry.get_stats()["records_lost"] == 34
+
+
+def test_aggregation_catches_up_without_losses_when_read_often():
+    telemetry = Telemetry(capacity=16)
+    for index in range(100):
+        telemetry.record("latency", "inference", 0.5)
+        if index % 10 == 9:
+            telemetry.aggregate()
+    assert telemetry.records_lost == 0
+    assert telemetry.get_totals()[("latency", "inference")] == (100, pytest.approx(50.0))
+
+
+def test_prometheus_text_has_counters_quantiles_and_gauges():
+    telemetry = Telemetry()
+    for millis in range(1, 101):
+        telemetry.record("latency", "inference", millis / 1000)
+    telemetry.record("gesture", 'cli"ck')
+    text = telemetry.prometheus_text({"palmcontrol_camera_up": ("Camera delivers frames.", 1),
+                                      "palmcontrol_unknown": ("Skipped.", None)})
+    assert 'palmcontrol_telemetry_records_total{kind="gesture",name="cli\\"ck"} 1' in text
+    assert 'palmcontrol_stage_latency_seconds{stage="inference",quantile="0.5"} 0.051000' in text
+    assert 'palmcontrol_stage_latency_seconds_count{stage="inference"} 100' in text
+    assert "palmcontrol_camera_up 1" in text
+    assert "palmcontrol_unknown" not in text
+
+
+def test_dump_jsonl(tmp_path):
+    telemetry = Telemetry()
+    telemetry.record("input", "click", button="left")
+    path = tmp_path / "telemetry.jsonl"
+    assert telemetry.dump_jsonl(str(path)) == 1
+    record = json.loads(path.read_text())
+    assert (record["kind"], record["name"], record["button"]) == ("input", "click", "left")
+
+
+def test_server_endpoints():
+    telemetry = Telemetry()
+    telemetry.record("gesture", "click")
+    server = TelemetryServer(telemetry, port=0, stats=lambda: {"ok": True}).start()
+    try:
+        base = "http://%s:%d" % server.address
+        with urllib.request.urlopen(base + "/metrics") as response:
+            assert b'kind="gesture",name="click"} 1' in response.read()
+        with urllib.request.urlopen(base + "/records?kind=gesture") as response:
+            assert json.loads(response.read().splitlines()[0])["name"] == "click"
+        with urllib.request.urlopen(base + "/stats") as response:
+            assert json.loads(response.read()) == {"ok": True}
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(base + "/nope")
+        assert error.value.code == 404
+    finally:
+        server.stop()
@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+import pytest
+
+from recognizers.temporal_tracker import TemporalTracker, landmarks_to_rect
+
+FRAME = 1 / 30
+
+
+def hand_at(x, y=0.5):
+    """A small upright hand: wrist below, fingers above, centred on (x, y)."""
+    rng = np.random.default_rng(1)
+    hand = np.zeros((21, 3), np.float32)
+    hand[:, 0] = x + rng.uniform(-0.03, 0.03, 21)
+    hand[:, 1] = np.linspace(y + 0.08, y - 0.08, 21)
+    return hand
+
+
+def test_prediction_extrapolates_the_measured_velocity():
+    tracker = TemporalTracker(smoothing=1.0)
+    tracker.update(0.0, [hand_at(0.40)])
+    tracker.update(FRAME, [hand_at(0.42)])
+    predicted = tracker.predict()[0]
+    np.testing.assert_allclose(predicted, hand_at(0.44), atol=1e-5)
+    # Never further ahead than max_lookahead
+    far = tracker.predict(FRAME + 10.0)[0]
+    np.testing.assert_allclose(far[:, 0] - hand_at(0.42)[:, 0], 0.02 / FRAME * tracker.max_lookahead, rtol=1e-4)
+
+
+def test_velocity_is_smoothed():
+    tracker = TemporalTracker(smoothing=0.5)
+    tracker.update(0.0, [hand_at(0.40)])
+    tracker.update(FRAME, [hand_at(0.42)])
+    # Half of the measured 0.02 per frame, starting from rest
+    assert tracker.velocities[0][0, 0] == pytest.approx(0.01 / FRAME, rel=1e-4)
+    tracker.update(2 * FRAME, [hand_at(0.42)])
+    assert tracker.velocities[0][0, 0] == pytest.approx(0.005 / FRAME, rel=1e-4)
+
+
+def test_no_velocity_after_a_long_gap_or_for_a_new_hand():
+    tracker = TemporalTracker()
+    tracker.update(0.0, [hand_at(0.40)])
+    tracker.update(1.0, [hand_at(0.45)])
+    assert not tracker.velocities[0].any()
+    tracker.update(1.0 + FRAME, [hand_at(0.45), hand_at(0.9)])
+    assert not tracker.velocities[1].any()
+
+
+def test_duplicate_tracks_of_one_hand_are_merged():
+    tracker = TemporalTracker()
+    hands = tracker.update(0.0, [hand_at(0.5), hand_at(0.5) + 0.001, hand_at(0.8)])
+    assert len(hands) == 2
+
+
+def test_detection_only_when_tracking_is_lost_or_a_hand_may_be_missing():
+    tracker = TemporalTracker(rescan_interval=0.5)
+    tracker.record_detection(0.0)
+    tracker.update(0.0, [hand_at(0.5)])
+    # All hands tracked (max 1): no detection
+    assert not tracker.needs_detection(FRAME, found=1, expected=1, max_hands=1)
+    # A tracked hand was not confirmed
+    assert tracker.needs_detection(2 * FRAME, found=0, expected=1, max_hands=1)
+    assert tracker.losses == 1
+    # Nothing tracked at all
+    assert tracker.needs_detection(3 * FRAME, found=0, expected=0, max_hands=1)
+    # Room for another hand: rescan once rescan_interval has passed since the last detection
+    assert not tracker.needs_detection(0.4, found=1, expected=1, max_hands=2)
+    assert tracker.needs_detection(0.5, found=1, expected=1, max_hands=2)
+    assert tracker.tracked_frames == 2
+
+
+def test_stats_count_detector_calls_per_second():
+    tracker = TemporalTracker()
+    for index in range(90):
+        now = index * FRAME
+        if index % 10 == 0:
+            tracker.record_detection(now)
+        tracker.update(now, [hand_at(0.5)])
+    stats = tracker.get_stats()
+    assert stats["detector_calls"] == 9
+    assert stats["detector_calls_per_s"] == pytest.approx(3.0, rel=0.15)
+    assert stats["tracked_hands"] == 1
+
+
+def test_reset_forgets_hands_but_keeps_counters():
+    tracker = TemporalTracker()
+    tracker.record_detection(0.0)
+    tracker.update(0.0, [hand_at(0.5)])
+    tracker.reset()
+    assert tracker.predict() == []
+    assert tracker.last_detection is None
+    assert tracker.detector_calls == 1
+
+
+def test_landmarks_to_rect_is_upright_and_contains_the_hand():
+    hand = hand_at(0.5)
+    center_x, center_y, size, rotation = landmarks_to_rect(hand, 640, 480)
+    assert rotation == pytest.approx(0.0, abs=0.3)
+    assert center_x == pytest.approx(320, abs=20)
+    extent = max(np.ptp(hand[:, 0]) * 640, np.ptp(hand[:, 1]) * 480)
+    assert size >= extent
+
+    # A hand pointing right is rotated by a quarter turn
+    turned = hand.copy()
+    turned[:, 0] = 0.5 + (0.5 - hand[:, 1]) * 480 / 640
+    turned[:, 1] = 0.5 + (hand[:, 0] - 0.5) * 640 / 480
+    assert abs(landmarks_to_rect(turned, 640, 480)[3]) == pytest.approx(math.pi / 2, abs=0.3)